@@ -8,7 +8,11 @@
 # =============================================================================
 #!/usr/bin/env python
 from .port_handler import *
+from .packet_parser import *
+from .packet_builder import *
 from .protocol_packet_handler import *
 from .group_sync_write import *
 from .group_sync_read import *
 from .scscl import *
+from .async_packet_handler import *
+from .port_emulator import *
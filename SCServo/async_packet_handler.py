@@ -0,0 +1,267 @@
+# =============================================================================
+#  async_packet_handler.py
+#  asyncio implementation of the SCS packet layer
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import asyncio
+
+from .scservo_def import *
+from .port_handler import *
+from .packet_parser import *
+from .packet_builder import *
+from .protocol_packet_handler import *
+
+ASYNC_POLL_INTERVAL = 0.0005  # seconds between reads when the port has no fd
+
+
+class AsyncPacketHandler:
+    """
+    Awaitable ping, read, write, sync_write and sync_read on an open PortHandler.
+
+    The serial fd is registered with the event loop, so while a transaction
+    waits for its status packets other tasks, e.g. BLE notifications, keep
+    running. Ports without an fd, like the emulator or serial ports on
+    Windows, are polled with short asyncio sleeps instead. Transactions are
+    serialized by a lock since the bus is half duplex.
+
+    Results use the COMM_* codes of protocol_packet_handler.
+    """
+
+    def __init__(self, portHandler, protocol_end=1, poll_interval=ASYNC_POLL_INTERVAL):
+        self.portHandler = portHandler
+        self.scs_end = protocol_end
+        self.poll_interval = poll_interval
+
+        self.rxParser = PacketParser(RXPACKET_MAX_LEN)
+        self.txBuilder = PacketBuilder(TXPACKET_MAX_LEN)
+
+        self.lock = None
+        self.loop = None
+        self.fd = None
+        self.data_event = None
+
+    async def open(self):
+        """Attach to the running event loop, called by the first transaction."""
+        if self.loop is not None:
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.lock = asyncio.Lock()
+        self.data_event = asyncio.Event()
+
+        try:
+            fd = self.portHandler.ser.fileno()
+        except (AttributeError, ValueError):
+            fd = None
+
+        if fd is not None:
+            try:
+                self.loop.add_reader(fd, self._onReadable)
+                self.fd = fd
+            except (NotImplementedError, ValueError, OSError):
+                # e.g. the proactor event loop on Windows
+                self.fd = None
+
+    async def close(self):
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.fd = None
+        self.loop = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _onReadable(self):
+        data = self.portHandler.ser.read(self.rxParser.getFreeLength())
+        if data:
+            self.rxParser.feed(data)
+            self.data_event.set()
+
+    def _deadline(self, tx_length, rx_length):
+        # same budget as PortHandler.setPacketTimeout, in event loop seconds
+        timeout = (
+            self.portHandler.tx_time_per_byte * (tx_length + rx_length + 3.0)
+            + LATENCY_TIMER
+        )
+        return self.loop.time() + timeout / 1000.0
+
+    def _send(self, txpacket):
+        if txpacket is None:
+            return COMM_TX_ERROR
+        if self.portHandler.is_using:
+            return COMM_PORT_BUSY
+
+        # drop stale bytes, then write without waiting for the port to drain
+        if self.fd is None:
+            self.portHandler.ser.read(self.rxParser.getFreeLength())
+        self.rxParser.clear()
+
+        if self.portHandler.writePort(txpacket) != len(txpacket):
+            return COMM_TX_FAIL
+        return COMM_SUCCESS
+
+    async def _receive(self, deadline):
+        # next status packet, or None and the reason when the deadline passes
+        while True:
+            frame = self.rxParser.getFrame()
+            if frame is not None:
+                return frame
+
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                result = (
+                    COMM_RX_TIMEOUT
+                    if self.rxParser.getPendingLength() == 0
+                    else COMM_RX_CORRUPT
+                )
+                self.rxParser.clear()
+                return None, result
+
+            if self.fd is None:
+                data = self.portHandler.ser.read(self.rxParser.getFreeLength())
+                if data:
+                    self.rxParser.feed(data)
+                    continue
+                await asyncio.sleep(min(self.poll_interval, remaining))
+            else:
+                self.data_event.clear()
+                try:
+                    await asyncio.wait_for(self.data_event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _transaction(self, txpacket, scs_id, rx_length):
+        # send an instruction and wait for the status packet of scs_id, the
+        # packet is copied before waiting for the lock, other tasks may build
+        # the next one into the same PacketBuilder template meanwhile
+        if txpacket is not None:
+            txpacket = bytes(txpacket)
+        await self.open()
+        async with self.lock:
+            result = self._send(txpacket)
+            if result != COMM_SUCCESS or scs_id == BROADCAST_ID:
+                return None, result
+
+            self.portHandler.is_using = True
+            try:
+                deadline = self._deadline(len(txpacket), rx_length)
+                while True:
+                    rxpacket, result = await self._receive(deadline)
+                    if rxpacket is None or rxpacket[PKT_ID] == scs_id:
+                        return rxpacket, result
+            finally:
+                self.portHandler.is_using = False
+
+    async def ping(self, scs_id):
+        """Returns (model_number, comm_result, error)."""
+        rxpacket, result = await self._transaction(
+            self.txBuilder.buildPing(scs_id), scs_id, 6
+        )
+        if result != COMM_SUCCESS:
+            return 0, result, 0
+
+        data, result, error = await self.read(scs_id, 3, 2)
+        if result != COMM_SUCCESS:
+            return 0, result, error
+        return self._word(data), result, error
+
+    async def read(self, scs_id, address, length):
+        """Returns (data, comm_result, error)."""
+        if scs_id >= BROADCAST_ID:
+            return b"", COMM_NOT_AVAILABLE, 0
+
+        rxpacket, result = await self._transaction(
+            self.txBuilder.buildRead(scs_id, address, length), scs_id, length + 6
+        )
+        if result != COMM_SUCCESS:
+            return b"", result, 0
+        return (
+            bytes(rxpacket[PKT_PARAMETER0 : PKT_PARAMETER0 + length]),
+            result,
+            rxpacket[PKT_ERROR],
+        )
+
+    async def write(self, scs_id, address, data, ack=True):
+        """
+        Returns (comm_result, error).
+
+        With ack=False the data goes out as a SYNC_WRITE to the one servo, which
+        servos do not answer, so no status packet is left on the bus.
+        """
+        if not ack and scs_id != BROADCAST_ID:
+            param = [scs_id]
+            param.extend(data)
+            return await self.sync_write(address, len(data), param), 0
+
+        txpacket = self.txBuilder.buildWrite(
+            INST_WRITE, scs_id, address, data, len(data)
+        )
+        rxpacket, result = await self._transaction(txpacket, scs_id, 6)
+        if rxpacket is None:
+            return result, 0
+        return result, rxpacket[PKT_ERROR]
+
+    async def sync_write(self, start_address, data_length, param):
+        """Returns comm_result, param holds the ID followed by data_length bytes per servo."""
+        txpacket = self.txBuilder.buildSync(
+            INST_SYNC_WRITE, start_address, data_length, param, len(param)
+        )
+        _, result = await self._transaction(txpacket, BROADCAST_ID, 0)
+        return result
+
+    async def sync_read(self, start_address, data_length, ids):
+        """
+        Returns ({id: data or None}, comm_result).
+
+        comm_result is COMM_SUCCESS only if every servo answered, servos that
+        did not answer map to None.
+        """
+        await self.open()
+        ids = list(ids)
+        data = dict.fromkeys(ids)
+
+        async with self.lock:
+            # built under the lock, the template is shared with other tasks
+            txpacket = self.txBuilder.buildSync(
+                INST_SYNC_READ, start_address, data_length, ids, len(ids)
+            )
+            result = self._send(txpacket)
+            if result != COMM_SUCCESS:
+                return data, result
+
+            self.portHandler.is_using = True
+            try:
+                deadline = self._deadline(len(txpacket), (data_length + 6) * len(ids))
+                missing = len(ids)
+                while missing:
+                    rxpacket, result = await self._receive(deadline)
+                    if rxpacket is None:
+                        break
+                    scs_id = rxpacket[PKT_ID]
+                    if (
+                        result == COMM_SUCCESS
+                        and scs_id in data
+                        and data[scs_id] is None
+                        and rxpacket[PKT_LENGTH] == data_length + 2
+                    ):
+                        data[scs_id] = bytes(
+                            rxpacket[PKT_PARAMETER0 : PKT_PARAMETER0 + data_length]
+                        )
+                        missing -= 1
+            finally:
+                self.portHandler.is_using = False
+
+        if missing == 0:
+            return data, COMM_SUCCESS
+        if result == COMM_SUCCESS:
+            result = COMM_RX_CORRUPT
+        return data, result
+
+    def _word(self, data):
+        return int.from_bytes(data[0:2], "big" if self.scs_end else "little")
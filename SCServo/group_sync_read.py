@@ -21,6 +21,12 @@ class GroupSyncRead:
         self.param = []
         self.data_dict = {}
 
+        # one slot per servo holding the error byte followed by the data
+        self.slot_length = data_length + 1
+        self.slot_dict = {}
+        self.data_buffer = bytearray()
+        self.data_view = memoryview(self.data_buffer)
+
         self.clearParam()
 
     def makeParam(self):
@@ -28,15 +34,21 @@ class GroupSyncRead:
             return
 
         self.param = []
+        self.slot_dict = {}
 
         for scs_id in self.data_dict:
+            self.slot_dict[scs_id] = len(self.param) * self.slot_length
             self.param.append(scs_id)
 
+        self.data_buffer = bytearray(len(self.param) * self.slot_length)
+        self.data_view = memoryview(self.data_buffer)
+        self.is_param_changed = False
+
     def addParam(self, scs_id):
         if scs_id in self.data_dict:  # scs_id already exist
             return False
 
-        self.data_dict[scs_id] = []  # [0] * self.data_length
+        self.data_dict[scs_id] = None
 
         self.is_param_changed = True
         return True
@@ -51,6 +63,7 @@ class GroupSyncRead:
 
     def clearParam(self):
         self.data_dict.clear()
+        self.is_param_changed = True
 
     def txPacket(self):
         if len(self.data_dict.keys()) == 0:
@@ -72,21 +85,27 @@ class GroupSyncRead:
         if len(self.data_dict.keys()) == 0:
             return COMM_NOT_AVAILABLE
 
+        if self.is_param_changed is True or not self.param:
+            self.makeParam()
+
         result, rxpacket = self.ph.syncReadRx(
             self.data_length, len(self.data_dict.keys())
         )
-        # print(rxpacket)
+
+        for scs_id in self.data_dict:
+            self.data_dict[scs_id] = None
+
         if len(rxpacket) >= (self.data_length + 6):
-            for scs_id in self.data_dict:
-                self.data_dict[scs_id], result = self.readRx(
-                    rxpacket, scs_id, self.data_length
-                )
-                if result != COMM_SUCCESS:
-                    self.last_result = False
-                # print(scs_id)
-        else:
-            self.last_result = False
-        # print(self.last_result)
+            self.demux(rxpacket)
+
+        for scs_id in self.data_dict:
+            if self.data_dict[scs_id] is None:
+                self.last_result = False
+
+        if self.last_result:
+            result = COMM_SUCCESS
+        elif result == COMM_SUCCESS:
+            result = COMM_RX_CORRUPT
         return result
 
     def txRxPacket(self):
@@ -96,50 +115,31 @@ class GroupSyncRead:
 
         return self.rxPacket()
 
-    def readRx(self, rxpacket, scs_id, data_length):
-        # print(scs_id)
-        # print(rxpacket)
-        data = []
+    def demux(self, rxpacket):
+        # index every status packet by ID in one pass over the response
+        rxpacket = bytes(rxpacket)
+        rxview = memoryview(rxpacket)
         rx_length = len(rxpacket)
-        # print(rx_length)
-        rx_index = 0
-        while (rx_index + 6 + data_length) <= rx_length:
-            headpacket = [0x00, 0x00, 0x00]
-            while rx_index < rx_length:
-                headpacket[2] = headpacket[1]
-                headpacket[1] = headpacket[0]
-                headpacket[0] = rxpacket[rx_index]
-                rx_index += 1
-                if (
-                    (headpacket[2] == 0xFF)
-                    and (headpacket[1] == 0xFF)
-                    and headpacket[0] == scs_id
-                ):
-                    # print(rx_index)
-                    break
-            # print(rx_index+3+data_length)
-            if (rx_index + 3 + data_length) > rx_length:
-                break
-            if rxpacket[rx_index] != (data_length + 2):
-                rx_index += 1
-                # print(rx_index)
+        packet_length = self.data_length + 6  # HEADER0 HEADER1 ID LEN ERR ... CHKSUM
+        slot_length = self.slot_length
+
+        rx_index = rxpacket.find(b"\xff\xff")
+        while 0 <= rx_index and rx_index + packet_length <= rx_length:
+            scs_id = rxpacket[rx_index + 2]
+            slot = self.slot_dict.get(scs_id)
+            end = rx_index + packet_length
+            if (
+                slot is None
+                or rxpacket[rx_index + 3] != self.data_length + 2
+                or rxpacket[end - 1] != (~sum(rxview[rx_index + 2 : end - 1]) & 0xFF)
+            ):
+                rx_index = rxpacket.find(b"\xff\xff", rx_index + 1)
                 continue
-            rx_index += 1
-            Error = rxpacket[rx_index]
-            rx_index += 1
-            calSum = scs_id + (data_length + 2) + Error
-            data = [Error]
-            data.extend(rxpacket[rx_index : rx_index + data_length])
-            for i in range(0, data_length):
-                calSum += rxpacket[rx_index]
-                rx_index += 1
-            calSum = ~calSum & 0xFF
-            # print(calSum)
-            if calSum != rxpacket[rx_index]:
-                return None, COMM_RX_CORRUPT
-            return data, COMM_SUCCESS
-        # print(rx_index)
-        return None, COMM_RX_CORRUPT
+
+            self.data_buffer[slot : slot + slot_length] = rxview[rx_index + 4 : end - 1]
+            self.data_dict[scs_id] = self.data_view[slot : slot + slot_length]
+
+            rx_index = rxpacket.find(b"\xff\xff", end)
 
     def isAvailable(self, scs_id, address, data_length):
         # if self.last_result is False or scs_id not in self.data_dict:
@@ -150,30 +150,35 @@ class GroupSyncRead:
             self.start_address + self.data_length - data_length < address
         ):
             return False, 0
-        if not self.data_dict[scs_id]:
-            return False, 0
-        if len(self.data_dict[scs_id]) < (data_length + 1):
+        if self.data_dict[scs_id] is None:
             return False, 0
         return True, self.data_dict[scs_id][0]
 
+    def getDataBuffer(self):
+        # error byte and data of every servo in param order, slot_length bytes each
+        return self.data_view
+
+    def getByte(self, scs_id, address):
+        return self.data_dict[scs_id][address - self.start_address + 1]
+
+    def getWord(self, scs_id, address):
+        offset = address - self.start_address + 1
+        return int.from_bytes(
+            self.data_dict[scs_id][offset : offset + 2],
+            "big" if self.ph.scs_getend() else "little",
+        )
+
+    def getDword(self, scs_id, address):
+        return self.ph.scs_makedword(
+            self.getWord(scs_id, address), self.getWord(scs_id, address + 2)
+        )
+
     def getData(self, scs_id, address, data_length):
         if data_length == 1:
-            return self.data_dict[scs_id][address - self.start_address + 1]
+            return self.getByte(scs_id, address)
         elif data_length == 2:
-            return self.ph.scs_makeword(
-                self.data_dict[scs_id][address - self.start_address + 1],
-                self.data_dict[scs_id][address - self.start_address + 2],
-            )
+            return self.getWord(scs_id, address)
         elif data_length == 4:
-            return self.ph.scs_makedword(
-                self.ph.scs_makeword(
-                    self.data_dict[scs_id][address - self.start_address + 1],
-                    self.data_dict[scs_id][address - self.start_address + 2],
-                ),
-                self.ph.scs_makeword(
-                    self.data_dict[scs_id][address - self.start_address + 3],
-                    self.data_dict[scs_id][address - self.start_address + 4],
-                ),
-            )
+            return self.getDword(scs_id, address)
         else:
             return 0
@@ -0,0 +1,129 @@
+# =============================================================================
+#  packet_builder.py
+#  Preallocated instruction packet templates for the SCS protocol
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+from .scservo_def import *
+
+TXPACKET_TEMPLATE_LEN = 260  # HEADER0 HEADER1 ID LENGTH(255) ...
+
+
+class PacketBuilder:
+    """
+    Builds instruction packets in place.
+
+    Every instruction owns a bytearray with the header, ID and instruction
+    already filled in. Building a packet only writes the variable fields and
+    the checksum, which is summed in C over the parameters. Packets are
+    sized from the data actually given, at most length bytes of it.
+
+    The returned memoryview points into the template and is overwritten by
+    the next packet of the same kind. Callers that hold a packet while
+    another one may be built, e.g. across an await, must copy it first.
+    """
+
+    def __init__(self, max_packet_length):
+        self.max_packet_length = max_packet_length
+
+        self.ping_packet = self._template(BROADCAST_ID, INST_PING, 6)
+        self.action_packet = self._template(BROADCAST_ID, INST_ACTION, 6)
+        self.read_packet = self._template(BROADCAST_ID, INST_READ, 8)
+        self.write_packet = self._template(BROADCAST_ID, INST_WRITE)
+        self.reg_write_packet = self._template(BROADCAST_ID, INST_REG_WRITE)
+        self.sync_write_packet = self._template(BROADCAST_ID, INST_SYNC_WRITE)
+        self.sync_read_packet = self._template(BROADCAST_ID, INST_SYNC_READ)
+
+        self.ping_view = memoryview(self.ping_packet)
+        self.action_view = memoryview(self.action_packet)
+        self.read_view = memoryview(self.read_packet)
+        self.write_views = {
+            INST_WRITE: memoryview(self.write_packet),
+            INST_REG_WRITE: memoryview(self.reg_write_packet),
+        }
+        self.sync_views = {
+            INST_SYNC_WRITE: memoryview(self.sync_write_packet),
+            INST_SYNC_READ: memoryview(self.sync_read_packet),
+        }
+
+        self.ping_packet[3] = 2
+        self.action_packet[3] = 2
+        self.read_packet[3] = 4
+
+    def _template(self, scs_id, instruction, length=TXPACKET_TEMPLATE_LEN):
+        packet = bytearray(length)
+        packet[0] = 0xFF
+        packet[1] = 0xFF
+        packet[2] = scs_id
+        packet[4] = instruction
+        return packet
+
+    def buildPing(self, scs_id):
+        packet = self.ping_packet
+        packet[2] = scs_id
+        packet[5] = ~(scs_id + 2 + INST_PING) & 0xFF
+        return self.ping_view
+
+    def buildAction(self, scs_id):
+        packet = self.action_packet
+        packet[2] = scs_id
+        packet[5] = ~(scs_id + 2 + INST_ACTION) & 0xFF
+        return self.action_view
+
+    def buildRead(self, scs_id, address, length):
+        packet = self.read_packet
+        packet[2] = scs_id
+        packet[5] = address
+        packet[6] = length
+        packet[7] = ~(scs_id + 4 + INST_READ + address + length) & 0xFF
+        return self.read_view
+
+    def buildWrite(self, instruction, scs_id, address, data, length):
+        data = data[0:length]
+        length = len(data)
+        # 7: HEADER0 HEADER1 ID LEN INST ADDR ... CHKSUM
+        total_packet_length = length + 7
+        if total_packet_length > self.max_packet_length:
+            return None
+
+        view = self.write_views[instruction]
+        packet = view.obj
+
+        packet[2] = scs_id
+        packet[3] = length + 3
+        packet[5] = address
+        packet[6 : 6 + length] = data
+        packet[6 + length] = (
+            ~(scs_id + length + 3 + instruction + address + sum(data)) & 0xFF
+        )
+        return view[0:total_packet_length]
+
+    def buildSync(self, instruction, start_address, data_length, param, param_length):
+        param = param[0:param_length]
+        param_length = len(param)
+        # 8: HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN ... CHKSUM
+        total_packet_length = param_length + 8
+        if total_packet_length > self.max_packet_length:
+            return None
+
+        view = self.sync_views[instruction]
+        packet = view.obj
+
+        packet[3] = param_length + 4
+        packet[5] = start_address
+        packet[6] = data_length
+        packet[7 : 7 + param_length] = param
+        packet[7 + param_length] = (
+            ~(
+                BROADCAST_ID
+                + param_length
+                + 4
+                + instruction
+                + start_address
+                + data_length
+                + sum(param)
+            )
+            & 0xFF
+        )
+        return view[0:total_packet_length]
@@ -0,0 +1,244 @@
+# =============================================================================
+#  packet_parser.py
+#  Incremental status packet parser for the SCS protocol
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+from collections import deque
+
+from .scservo_def import *
+
+RXPACKET_RING_LEN = 1024
+MIN_PACKET_LEN = 6  # HEADER0 HEADER1 ID LENGTH ERROR CHKSUM
+
+
+class PacketParser:
+    """
+    State machine that turns a byte stream into status packets.
+
+    Bytes are copied once into a preallocated ring buffer and every byte is
+    examined a bounded number of times, so parsing is amortized O(1) per byte
+    no matter how much garbage is on the bus. Several packets can be fed in
+    one call, complete packets are queued until fetched with getFrame().
+    """
+
+    def __init__(self, max_packet_length, buffer_size=RXPACKET_RING_LEN):
+        size = 1
+        while size < max(buffer_size, max_packet_length + 4):
+            size <<= 1
+
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.mask = size - 1
+        self.max_packet_length = max_packet_length
+
+        self.frames = deque()
+        self.dropped_bytes = 0
+        self.corrupt_frames = 0
+
+        self.clear()
+
+    def clear(self):
+        self.head = 0  # absolute index of the first byte of the current candidate
+        self.pos = 0  # absolute index of the next byte to examine
+        self.tail = 0  # absolute index of the next byte to write
+        self.wait_length = MIN_PACKET_LEN
+        self.checksum = 0
+        self.frames.clear()
+
+    def getPendingLength(self):
+        return self.tail - self.head
+
+    def getWaitLength(self):
+        return max(self.wait_length - (self.tail - self.head), 1)
+
+    def getFreeLength(self):
+        return self.mask + 1 - (self.tail - self.head)
+
+    def getFrame(self):
+        if self.frames:
+            return self.frames.popleft()
+        return None
+
+    def feed(self, data):
+        length = len(data)
+        if length == 0:
+            return
+
+        size = self.mask + 1
+        if length > size:
+            # only the newest bytes fit, drop everything else
+            self.dropped_bytes += (self.tail - self.head) + length - size
+            data = data[length - size :]
+            length = size
+            self.head = self.pos = self.tail
+            self._restart()
+
+        overflow = (self.tail - self.head) + length - size
+        if overflow > 0:
+            # drop the oldest bytes and rescan what is left
+            self.dropped_bytes += overflow
+            self.head += overflow
+            self.pos = self.head
+            self._restart()
+
+        start = self.tail & self.mask
+        first = min(length, size - start)
+        self.buffer[start : start + first] = data[0:first]
+        if first < length:
+            self.buffer[0 : length - first] = data[first:length]
+        self.tail += length
+
+        self._scan()
+
+    def _restart(self):
+        self.wait_length = MIN_PACKET_LEN
+        self.checksum = 0
+
+    def _find_header(self, pos, tail):
+        buffer = self.buffer
+        mask = self.mask
+
+        while pos < tail:
+            start = pos & mask
+            end = min(start + (tail - pos), mask + 1)
+            idx = buffer.find(b"\xff\xff", start, end)
+            if idx >= 0:
+                return pos + (idx - start)
+
+            pos += end - start
+            if buffer[end - 1] == 0xFF and (pos == tail or buffer[pos & mask] == 0xFF):
+                # header wraps around the end of the ring or is not complete yet
+                return pos - 1
+
+        return -1
+
+    def _sum(self, first, last):
+        start = first & self.mask
+        end = start + (last - first)
+        if end <= self.mask + 1:
+            return sum(self.view[start:end])
+        return sum(self.view[start:]) + sum(self.view[0 : end - self.mask - 1])
+
+    def _copy(self, first, last):
+        start = first & self.mask
+        end = start + (last - first)
+        if end <= self.mask + 1:
+            return bytes(self.view[start:end])
+        return bytes(self.view[start:]) + bytes(self.view[0 : end - self.mask - 1])
+
+    def _scan(self):
+        buffer = self.buffer
+        view = self.view
+        mask = self.mask
+        size = mask + 1
+        max_packet_length = self.max_packet_length
+        frames = self.frames
+
+        head = self.head
+        pos = self.pos
+        tail = self.tail
+        wait_length = self.wait_length
+        checksum = self.checksum
+        dropped = 0
+
+        while pos < tail:
+            offset = pos - head
+
+            if offset == 0:
+                pos = self._find_header(pos, tail)
+                if pos < 0:
+                    dropped += tail - head
+                    head = pos = tail
+                    break
+                dropped += pos - head
+                head = pos
+                pos = min(head + 2, tail)
+
+                # fast path, a complete packet is stored contiguously
+                start = head & mask
+                if start + MIN_PACKET_LEN <= size and tail - head >= MIN_PACKET_LEN:
+                    length = buffer[start + 3]
+                    end = start + length + 4
+                    if (
+                        buffer[start + 1] == 0xFF
+                        and buffer[start + 2] < 0xFE
+                        and 2 <= length <= max_packet_length
+                        and buffer[start + 4] <= 0x7F
+                        and end <= size
+                        and head + length + 4 <= tail
+                    ):
+                        frame = bytes(view[start:end])
+                        if frame[-1] == (~sum(view[start + 2 : end - 1]) & 0xFF):
+                            frames.append((frame, COMM_SUCCESS))
+                        else:
+                            self.corrupt_frames += 1
+                            frames.append((frame, COMM_RX_CORRUPT))
+                        head = pos = head + length + 4
+                continue
+
+            value = buffer[pos & mask]
+
+            if offset == 1:
+                if value != 0xFF:
+                    dropped += 2
+                    head = pos = pos + 1
+                    continue
+            elif offset == 2:  # ID
+                if value == 0xFF:
+                    # more than two header bytes, slide the header forward
+                    dropped += 1
+                    head += 1
+                    pos += 1
+                    continue
+                if value > 0xFD:
+                    # unavailable ID, resume the search after the first header byte
+                    dropped += 1
+                    head = pos = head + 1
+                    continue
+                checksum = value
+            elif offset == 3:  # LENGTH
+                if value > max_packet_length or value < 2:
+                    # unavailable Length
+                    dropped += 1
+                    head = pos = head + 1
+                    checksum = 0
+                    continue
+                wait_length = value + 4  # 4: HEADER0 HEADER1 ID LENGTH
+                checksum += value
+            elif offset == 4:  # ERROR
+                if value > 0x7F:
+                    # unavailable Error
+                    dropped += 1
+                    head = pos = head + 1
+                    wait_length = MIN_PACKET_LEN
+                    checksum = 0
+                    continue
+                checksum += value
+            elif offset < wait_length - 1:
+                # parameters, sum everything that has arrived in one go
+                last = min(tail, head + wait_length - 1)
+                checksum += self._sum(pos, last)
+                pos = last
+                continue
+            else:
+                frame = self._copy(head, pos + 1)
+                if value == (~checksum & 0xFF):
+                    frames.append((frame, COMM_SUCCESS))
+                else:
+                    self.corrupt_frames += 1
+                    frames.append((frame, COMM_RX_CORRUPT))
+                head = pos = pos + 1
+                wait_length = MIN_PACKET_LEN
+                checksum = 0
+                continue
+
+            pos += 1
+
+        self.head = head
+        self.pos = pos
+        self.tail = tail
+        self.wait_length = wait_length
+        self.checksum = checksum
+        self.dropped_bytes += dropped
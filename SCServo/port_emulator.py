@@ -0,0 +1,329 @@
+# =============================================================================
+#  port_emulator.py
+#  In-process emulation of a bus of SCS0009 servos
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import time
+from collections import deque
+
+from .scservo_def import *
+from .port_handler import *
+from .protocol_packet_handler import *
+from .scscl import *
+
+EMULATOR_PORT_PREFIX = "emulator://"  # e.g. "emulator://8" for servo IDs 1-8
+EMULATOR_DEFAULT_SERVOS = 8
+
+EMULATED_TABLE_LEN = 71  # up to SCSCL_PRESENT_CURRENT_H
+EMULATED_MODEL_NUMBER = 0x0500  # placeholder, not the model number of a real servo
+EMULATED_RETURN_DELAY = 0.0001  # seconds from end of instruction to start of status
+EMULATED_MAX_SPEED = 2048  # steps per second used when the goal speed is 0
+EMULATED_VOLTAGE = 50  # 0.1 V
+EMULATED_TEMPERATURE = 30  # degrees Celsius
+
+
+class EmulatedServo:
+    """
+    Control table and motion model of one SCS0009 servo.
+
+    Words are stored high byte first like the real servo. The present
+    position moves towards the goal position at the goal speed, taken as
+    position steps per second, whenever the servo is accessed.
+    """
+
+    def __init__(self, scs_id, position=512):
+        self.scs_id = scs_id
+        self.table = bytearray(EMULATED_TABLE_LEN)
+        self.error = 0  # error bits to report, e.g. ERRBIT_OVERHEAT
+        self.registered = None  # (address, data) waiting for ACTION
+        self.position = float(position)
+        self.last_update = time.monotonic()
+
+        self.setWord(SCSCL_MODEL_L, EMULATED_MODEL_NUMBER)
+        self.table[5] = scs_id  # ID
+        self.table[SCSCL_BAUD_RATE] = SCSCL_1M
+        self.setWord(SCSCL_MIN_ANGLE_LIMIT_L, 0)
+        self.setWord(SCSCL_MAX_ANGLE_LIMIT_L, 1023)
+        self.table[SCSCL_TORQUE_ENABLE] = 1
+        self.setWord(SCSCL_GOAL_POSITION_L, position)
+        self.setWord(SCSCL_PRESENT_POSITION_L, position)
+        self.table[SCSCL_PRESENT_VOLTAGE] = EMULATED_VOLTAGE
+        self.table[SCSCL_PRESENT_TEMPERATURE] = EMULATED_TEMPERATURE
+
+    def getWord(self, address):
+        return (self.table[address] << 8) | self.table[address + 1]
+
+    def setWord(self, address, value):
+        self.table[address] = (value >> 8) & 0xFF
+        self.table[address + 1] = value & 0xFF
+
+    def update(self, now):
+        dt = max(now - self.last_update, 0.0)
+        self.last_update = max(now, self.last_update)
+
+        goal = self.getWord(SCSCL_GOAL_POSITION_L)
+        speed = self.getWord(SCSCL_GOAL_SPEED_L) or EMULATED_MAX_SPEED
+        distance = goal - self.position
+
+        if self.table[SCSCL_TORQUE_ENABLE] == 0 or distance == 0:
+            moving_speed = 0
+        elif abs(distance) <= speed * dt:
+            self.position = float(goal)
+            moving_speed = 0
+        else:
+            step = speed * dt
+            self.position += step if distance > 0 else -step
+            moving_speed = speed if distance > 0 else speed | 0x8000
+
+        self.setWord(SCSCL_PRESENT_POSITION_L, int(round(self.position)))
+        self.setWord(SCSCL_PRESENT_SPEED_L, moving_speed)
+        self.table[SCSCL_MOVING] = 1 if moving_speed else 0
+
+    def read(self, address, length, now):
+        self.update(now)
+        data = bytes(self.table[address : address + length])
+        return data + bytes(length - len(data))
+
+    def write(self, address, data, now):
+        self.update(now)
+        end = min(address + len(data), EMULATED_TABLE_LEN)
+        self.table[address:end] = data[0 : end - address]
+
+        # the servo clamps goal positions outside its angle limits
+        if address <= SCSCL_GOAL_POSITION_H and SCSCL_GOAL_POSITION_L < end:
+            goal = self.getWord(SCSCL_GOAL_POSITION_L)
+            min_angle = self.getWord(SCSCL_MIN_ANGLE_LIMIT_L)
+            max_angle = self.getWord(SCSCL_MAX_ANGLE_LIMIT_L)
+            if goal < min_angle or goal > max_angle:
+                self.setWord(
+                    SCSCL_GOAL_POSITION_L, min(max(goal, min_angle), max_angle)
+                )
+                return self.error | ERRBIT_ANGLE
+
+        return self.error
+
+
+class EmulatedSerial:
+    """
+    Stand-in for serial.Serial with timeout=0 that answers like a servo bus.
+
+    Instruction and status packets share the bus and take 10 bit times per
+    byte. A status packet starts after the instruction has been received and
+    the return delay has passed, and read() only returns bytes whose wire
+    time has elapsed.
+    """
+
+    def __init__(self, servos, baudrate, return_delay=EMULATED_RETURN_DELAY):
+        self.servos = servos
+        self.byte_time = 10.0 / baudrate
+        self.return_delay = return_delay
+        self.is_open = True
+
+        self.bus_free_at = 0.0
+        self.tx_done_at = 0.0
+        self.txbuffer = bytearray()
+        self.rxchunks = deque()  # (time the first byte starts, data)
+
+    @property
+    def in_waiting(self):
+        return self._available(time.monotonic())
+
+    def _available(self, now):
+        count = 0
+        for start, data in self.rxchunks:
+            arrived = int((now - start) / self.byte_time)
+            if arrived < len(data):
+                return count + max(arrived, 0)
+            count += len(data)
+        return count
+
+    def nextByteTime(self):
+        # time the next unread byte is complete, None if nothing is on its way
+        if not self.rxchunks:
+            return None
+        return self.rxchunks[0][0] + self.byte_time
+
+    def read(self, size=1):
+        count = min(size, self._available(time.monotonic()))
+        result = bytearray()
+        while count > 0:
+            start, data = self.rxchunks[0]
+            if len(data) <= count:
+                result += data
+                count -= len(data)
+                self.rxchunks.popleft()
+            else:
+                result += data[0:count]
+                self.rxchunks[0] = (start + count * self.byte_time, data[count:])
+                count = 0
+        return bytes(result)
+
+    def write(self, data):
+        data = bytes(data)
+        start = max(time.monotonic(), self.bus_free_at)
+        self.bus_free_at = start + len(data) * self.byte_time
+        self.tx_done_at = self.bus_free_at
+
+        self.txbuffer += data
+        self._process()
+        return len(data)
+
+    def flush(self):
+        # like tcdrain, return when everything written is on the wire
+        delay = self.tx_done_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def reset_input_buffer(self):
+        self.rxchunks.clear()
+
+    def close(self):
+        self.is_open = False
+
+    def _process(self):
+        buffer = self.txbuffer
+        while True:
+            idx = buffer.find(b"\xff\xff")
+            if idx < 0:
+                del buffer[0 : max(len(buffer) - 1, 0)]
+                return
+            del buffer[0:idx]
+            if len(buffer) < 4:
+                return
+            if buffer[2] == 0xFF:
+                del buffer[0]
+                continue
+
+            total_packet_length = buffer[3] + 4
+            if len(buffer) < total_packet_length:
+                return
+
+            packet = bytes(buffer[0:total_packet_length])
+            del buffer[0:total_packet_length]
+
+            # servos ignore packets with a wrong checksum
+            if packet[-1] == (~sum(packet[2:-1]) & 0xFF):
+                self._execute(packet)
+
+    def _respond(self, scs_id, error, data=b""):
+        packet = bytearray([0xFF, 0xFF, scs_id, len(data) + 2, error])
+        packet += data
+        packet.append(~sum(packet[2:]) & 0xFF)
+
+        start = self.bus_free_at + self.return_delay
+        self.bus_free_at = start + len(packet) * self.byte_time
+        self.rxchunks.append((start, bytes(packet)))
+
+    def _execute(self, packet):
+        scs_id = packet[PKT_ID]
+        instruction = packet[PKT_INSTRUCTION]
+        param = packet[PKT_PARAMETER0:-1]
+        now = self.bus_free_at  # the last byte of the instruction has arrived
+
+        if scs_id == BROADCAST_ID:
+            targets = list(self.servos.values())
+        elif scs_id in self.servos:
+            targets = [self.servos[scs_id]]
+        else:
+            return
+
+        if instruction == INST_PING:
+            for servo in targets:
+                if scs_id != BROADCAST_ID:
+                    self._respond(servo.scs_id, servo.error)
+
+        elif instruction == INST_READ:
+            for servo in targets:
+                data = servo.read(param[0], param[1], now)
+                if scs_id != BROADCAST_ID:
+                    self._respond(servo.scs_id, servo.error, data)
+
+        elif instruction == INST_WRITE:
+            for servo in targets:
+                error = servo.write(param[0], param[1:], now)
+                if scs_id != BROADCAST_ID:
+                    self._respond(servo.scs_id, error)
+
+        elif instruction == INST_REG_WRITE:
+            for servo in targets:
+                servo.registered = (param[0], param[1:])
+                if scs_id != BROADCAST_ID:
+                    self._respond(servo.scs_id, servo.error)
+
+        elif instruction == INST_ACTION:
+            for servo in targets:
+                error = servo.error
+                if servo.registered is not None:
+                    error = servo.write(servo.registered[0], servo.registered[1], now)
+                    servo.registered = None
+                if scs_id != BROADCAST_ID:
+                    self._respond(servo.scs_id, error)
+
+        elif instruction == INST_SYNC_WRITE:
+            address, data_length = param[0], param[1]
+            for idx in range(2, len(param) - data_length, data_length + 1):
+                servo = self.servos.get(param[idx])
+                if servo is not None:
+                    servo.write(address, param[idx + 1 : idx + 1 + data_length], now)
+
+        elif instruction == INST_SYNC_READ:
+            address, data_length = param[0], param[1]
+            for servo_id in param[2:]:
+                servo = self.servos.get(servo_id)
+                if servo is not None:
+                    data = servo.read(address, data_length, self.bus_free_at)
+                    self._respond(servo.scs_id, servo.error, data)
+
+
+class EmulatedPortHandler(PortHandler):
+    """
+    PortHandler connected to emulated servos instead of a serial port.
+
+    Port names look like "emulator://8", the number being how many servos
+    with IDs counting from 1 are on the bus.
+    """
+
+    def __init__(self, port_name, servo_ids=None, return_delay=EMULATED_RETURN_DELAY):
+        PortHandler.__init__(self, port_name)
+
+        if servo_ids is None:
+            count = port_name[len(EMULATOR_PORT_PREFIX) :]
+            count = int(count) if count.isdigit() else EMULATOR_DEFAULT_SERVOS
+            servo_ids = range(1, count + 1)
+
+        self.servos = {scs_id: EmulatedServo(scs_id) for scs_id in servo_ids}
+        self.return_delay = return_delay
+
+    def setupPort(self, cflag_baud):
+        if self.is_open:
+            self.closePort()
+
+        self.ser = EmulatedSerial(self.servos, self.baudrate, self.return_delay)
+
+        self.is_open = True
+
+        self.ser.reset_input_buffer()
+
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+
+        return True
+
+    def waitForData(self):
+        # sleep until the next byte is on the wire or the packet deadline passes
+        remaining = self.packet_timeout - self.getTimeSinceStart()
+        if remaining <= 0:
+            return False
+
+        start_time = self.getCurrentTime()
+        next_byte_time = self.ser.nextByteTime()
+        if next_byte_time is None:
+            delay = remaining / 1000.0
+        else:
+            delay = min(remaining / 1000.0, next_byte_time - time.monotonic())
+        if delay > 0:
+            time.sleep(delay)
+
+        self.wait_time += self.getCurrentTime() - start_time
+        return next_byte_time is not None
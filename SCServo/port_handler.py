@@ -9,12 +9,26 @@
 # #!/usr/bin/env python
 
 import time
+import select
 import serial
 import sys
 import platform
 
 DEFAULT_BAUDRATE = 1000000
 LATENCY_TIMER = 50
+BAUDRATE_LIST = [
+    4800,
+    9600,
+    14400,
+    19200,
+    38400,
+    57600,
+    115200,
+    128000,
+    250000,
+    500000,
+    1000000,
+]
 
 
 class PortHandler(object):
@@ -29,6 +43,10 @@ class PortHandler(object):
         self.port_name = port_name
         self.ser = None
 
+        # wait on the port instead of polling it, see setBlocking()
+        self.blocking = False
+        self.resetIoStats()
+
     def openPort(self):
         return self.setBaudRate(self.baudrate)
 
@@ -62,11 +80,60 @@ class PortHandler(object):
     def getBytesAvailable(self):
         return self.ser.in_waiting
 
+    def setBlocking(self, blocking):
+        self.blocking = blocking
+
+    def getBlocking(self):
+        return self.blocking
+
     def readPort(self, length):
+        data = self.ser.read(length)
+        if not data and self.blocking and self.waitForData():
+            data = self.ser.read(length)
+
         if sys.version_info > (3, 0):
-            return self.ser.read(length)
+            return data
+        else:
+            return [ord(ch) for ch in data]
+
+    def waitForData(self):
+        # sleep until bytes arrive or the packet deadline passes
+        remaining = self.packet_timeout - self.getTimeSinceStart()
+        if remaining <= 0:
+            return False
+
+        start_time = self.getCurrentTime()
+        try:
+            fd = self.ser.fileno()
+        except (AttributeError, ValueError):
+            fd = None
+
+        if fd is not None:
+            ready = bool(select.select([fd], [], [], remaining / 1000.0)[0])
         else:
-            return [ord(ch) for ch in self.ser.read(length)]
+            # select does not work on serial handles on Windows, yield the CPU instead
+            time.sleep(min(remaining, 1.0) / 1000.0)
+            ready = True
+
+        self.wait_time += self.getCurrentTime() - start_time
+        return ready
+
+    def addRxTime(self, start_time):
+        self.rx_count += 1
+        self.rx_time += self.getCurrentTime() - start_time
+
+    def getIoStats(self):
+        return {
+            "rx_count": self.rx_count,
+            "rx_time": self.rx_time,
+            "wait_time": self.wait_time,
+            "parse_time": self.rx_time - self.wait_time,
+        }
+
+    def resetIoStats(self):
+        self.rx_count = 0
+        self.rx_time = 0.0
+        self.wait_time = 0.0
 
     def writePort(self, packet):
         return self.ser.write(packet)
@@ -91,7 +158,7 @@ class PortHandler(object):
         return False
 
     def getCurrentTime(self):
-        return round(time.time() * 1000000000) / 1000000.0
+        return time.monotonic() * 1000.0
 
     def getTimeSinceStart(self):
         time_since = self.getCurrentTime() - self.packet_start_time
@@ -122,19 +189,7 @@ class PortHandler(object):
         return True
 
     def getCFlagBaud(self, baudrate):
-        if baudrate in [
-            4800,
-            9600,
-            14400,
-            19200,
-            38400,
-            57600,
-            115200,
-            128000,
-            250000,
-            500000,
-            1000000,
-        ]:
+        if baudrate in BAUDRATE_LIST:
             return baudrate
         else:
             return -1
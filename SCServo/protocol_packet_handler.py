@@ -8,6 +8,8 @@
 # =============================================================================
 #!/usr/bin/env python
 from .scservo_def import *
+from .packet_parser import *
+from .packet_builder import *
 
 TXPACKET_MAX_LEN = 250
 RXPACKET_MAX_LEN = 250
@@ -34,6 +36,8 @@ class protocol_packet_handler(object):
         # self.scs_setend(protocol_end)# STServo bit end(STS/SMS=0, SCS=1)
         self.portHandler = portHandler
         self.scs_end = protocol_end
+        self.rxParser = PacketParser(RXPACKET_MAX_LEN)
+        self.txBuilder = PacketBuilder(TXPACKET_MAX_LEN)
 
     def scs_getend(self):
         return self.scs_end
@@ -125,6 +129,11 @@ class protocol_packet_handler(object):
 
     def txPacket(self, txpacket):
         checksum = 0
+
+        # packet builder could not fit the packet
+        if txpacket is None:
+            return COMM_TX_ERROR
+
         total_packet_length = txpacket[PKT_LENGTH] + 4  # 4: HEADER0 HEADER1 ID LENGTH
 
         if self.portHandler.is_using:
@@ -136,18 +145,24 @@ class protocol_packet_handler(object):
             self.portHandler.is_using = False
             return COMM_TX_ERROR
 
-        # make packet header
-        txpacket[PKT_HEADER0] = 0xFF
-        txpacket[PKT_HEADER1] = 0xFF
+        # packets from the packet builder are complete, lists are finished here
+        if not isinstance(txpacket, memoryview):
+            # make packet header
+            txpacket[PKT_HEADER0] = 0xFF
+            txpacket[PKT_HEADER1] = 0xFF
 
-        # add a checksum to the packet
-        for idx in range(2, total_packet_length - 1):  # except header, checksum
-            checksum += txpacket[idx]
+            # add a checksum to the packet
+            for idx in range(2, total_packet_length - 1):  # except header, checksum
+                checksum += txpacket[idx]
 
-        txpacket[total_packet_length - 1] = ~checksum & 0xFF
+            txpacket[total_packet_length - 1] = ~checksum & 0xFF
 
         # print "[TxPacket] %r" % txpacket
 
+        # drop stale bytes and status packets left over from earlier transactions
+        self.portHandler.ser.reset_input_buffer()
+        self.rxParser.clear()
+
         # tx packet
         self.portHandler.clearPort()
         written_packet_length = self.portHandler.writePort(txpacket)
@@ -161,73 +176,31 @@ class protocol_packet_handler(object):
         rxpacket = []
 
         result = COMM_TX_FAIL
-        checksum = 0
-        rx_length = 0
-        wait_length = 6  # minimum length (HEADER0 HEADER1 ID LENGTH ERROR CHKSUM)
+        start_time = self.portHandler.getCurrentTime()
 
         while True:
-            rxpacket.extend(self.portHandler.readPort(wait_length - rx_length))
-            rx_length = len(rxpacket)
-            if rx_length >= wait_length:
-                # find packet header
-                for idx in range(0, (rx_length - 1)):
-                    if (rxpacket[idx] == 0xFF) and (rxpacket[idx + 1] == 0xFF):
-                        break
-
-                if idx == 0:  # found at the beginning of the packet
-                    if (
-                        (rxpacket[PKT_ID] > 0xFD)
-                        or (rxpacket[PKT_LENGTH] > RXPACKET_MAX_LEN)
-                        or (rxpacket[PKT_ERROR] > 0x7F)
-                    ):
-                        # unavailable ID or unavailable Length or unavailable Error
-                        # remove the first byte in the packet
-                        del rxpacket[0]
-                        rx_length -= 1
-                        continue
-
-                    # re-calculate the exact length of the rx packet
-                    if wait_length != (rxpacket[PKT_LENGTH] + PKT_LENGTH + 1):
-                        wait_length = rxpacket[PKT_LENGTH] + PKT_LENGTH + 1
-                        continue
-
-                    if rx_length < wait_length:
-                        # check timeout
-                        if self.portHandler.isPacketTimeout():
-                            if rx_length == 0:
-                                result = COMM_RX_TIMEOUT
-                            else:
-                                result = COMM_RX_CORRUPT
-                            break
-                        else:
-                            continue
-
-                    # calculate checksum
-                    for i in range(2, wait_length - 1):  # except header, checksum
-                        checksum += rxpacket[i]
-                    checksum = ~checksum & 0xFF
-
-                    # verify checksum
-                    if rxpacket[wait_length - 1] == checksum:
-                        result = COMM_SUCCESS
-                    else:
-                        result = COMM_RX_CORRUPT
-                    break
+            frame = self.rxParser.getFrame()
+            if frame is not None:
+                rxpacket, result = frame
+                break
 
-                else:
-                    # remove unnecessary packets
-                    del rxpacket[0:idx]
-                    rx_length -= idx
+            # read whatever has arrived, queued packets are parsed in one go
+            data = self.portHandler.readPort(self.rxParser.getFreeLength())
+            if data:
+                self.rxParser.feed(data)
+                continue
 
-            else:
-                # check timeout
-                if self.portHandler.isPacketTimeout():
-                    if rx_length == 0:
-                        result = COMM_RX_TIMEOUT
-                    else:
-                        result = COMM_RX_CORRUPT
-                    break
+            # check timeout
+            if self.portHandler.isPacketTimeout():
+                if self.rxParser.getPendingLength() == 0:
+                    result = COMM_RX_TIMEOUT
+                else:
+                    result = COMM_RX_CORRUPT
+                # drop the partial packet
+                self.rxParser.clear()
+                break
 
+        self.portHandler.addRxTime(start_time)
         self.portHandler.is_using = False
         return rxpacket, result
 
@@ -268,14 +241,10 @@ class protocol_packet_handler(object):
         model_number = 0
         error = 0
 
-        txpacket = [0] * 6
-
         if scs_id >= BROADCAST_ID:
             return model_number, COMM_NOT_AVAILABLE, error
 
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = 2
-        txpacket[PKT_INSTRUCTION] = INST_PING
+        txpacket = self.txBuilder.buildPing(scs_id)
 
         rxpacket, result, error = self.txRxPacket(txpacket)
 
@@ -289,28 +258,17 @@ class protocol_packet_handler(object):
         return model_number, result, error
 
     def action(self, scs_id):
-        txpacket = [0] * 6
-
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = 2
-        txpacket[PKT_INSTRUCTION] = INST_ACTION
+        txpacket = self.txBuilder.buildAction(scs_id)
 
         _, result, _ = self.txRxPacket(txpacket)
 
         return result
 
     def readTx(self, scs_id, address, length):
-
-        txpacket = [0] * 8
-
         if scs_id >= BROADCAST_ID:
             return COMM_NOT_AVAILABLE
 
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = 4
-        txpacket[PKT_INSTRUCTION] = INST_READ
-        txpacket[PKT_PARAMETER0 + 0] = address
-        txpacket[PKT_PARAMETER0 + 1] = length
+        txpacket = self.txBuilder.buildRead(scs_id, address, length)
 
         result = self.txPacket(txpacket)
 
@@ -341,17 +299,12 @@ class protocol_packet_handler(object):
         return data, result, error
 
     def readTxRx(self, scs_id, address, length):
-        txpacket = [0] * 8
         data = []
 
         if scs_id >= BROADCAST_ID:
             return data, COMM_NOT_AVAILABLE, 0
 
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = 4
-        txpacket[PKT_INSTRUCTION] = INST_READ
-        txpacket[PKT_PARAMETER0 + 0] = address
-        txpacket[PKT_PARAMETER0 + 1] = length
+        txpacket = self.txBuilder.buildRead(scs_id, address, length)
 
         rxpacket, result, error = self.txRxPacket(txpacket)
         if result == COMM_SUCCESS:
@@ -417,14 +370,7 @@ class protocol_packet_handler(object):
         return data_read, result, error
 
     def writeTxOnly(self, scs_id, address, length, data):
-        txpacket = [0] * (length + 7)
-
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = length + 3
-        txpacket[PKT_INSTRUCTION] = INST_WRITE
-        txpacket[PKT_PARAMETER0] = address
-
-        txpacket[PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + length] = data[0:length]
+        txpacket = self.txBuilder.buildWrite(INST_WRITE, scs_id, address, data, length)
 
         result = self.txPacket(txpacket)
         self.portHandler.is_using = False
@@ -432,14 +378,8 @@ class protocol_packet_handler(object):
         return result
 
     def writeTxRx(self, scs_id, address, length, data):
-        txpacket = [0] * (length + 7)
-
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = length + 3
-        txpacket[PKT_INSTRUCTION] = INST_WRITE
-        txpacket[PKT_PARAMETER0] = address
+        txpacket = self.txBuilder.buildWrite(INST_WRITE, scs_id, address, data, length)
 
-        txpacket[PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + length] = data[0:length]
         rxpacket, result, error = self.txRxPacket(txpacket)
 
         return result, error
@@ -479,14 +419,9 @@ class protocol_packet_handler(object):
         return self.writeTxRx(scs_id, address, 4, data_write)
 
     def regWriteTxOnly(self, scs_id, address, length, data):
-        txpacket = [0] * (length + 7)
-
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = length + 3
-        txpacket[PKT_INSTRUCTION] = INST_REG_WRITE
-        txpacket[PKT_PARAMETER0] = address
-
-        txpacket[PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + length] = data[0:length]
+        txpacket = self.txBuilder.buildWrite(
+            INST_REG_WRITE, scs_id, address, data, length
+        )
 
         result = self.txPacket(txpacket)
         self.portHandler.is_using = False
@@ -494,32 +429,18 @@ class protocol_packet_handler(object):
         return result
 
     def regWriteTxRx(self, scs_id, address, length, data):
-        txpacket = [0] * (length + 7)
-
-        txpacket[PKT_ID] = scs_id
-        txpacket[PKT_LENGTH] = length + 3
-        txpacket[PKT_INSTRUCTION] = INST_REG_WRITE
-        txpacket[PKT_PARAMETER0] = address
-
-        txpacket[PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + length] = data[0:length]
+        txpacket = self.txBuilder.buildWrite(
+            INST_REG_WRITE, scs_id, address, data, length
+        )
 
         _, result, error = self.txRxPacket(txpacket)
 
         return result, error
 
     def syncReadTx(self, start_address, data_length, param, param_length):
-        txpacket = [0] * (param_length + 8)
-        # 8: HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN CHKSUM
-
-        txpacket[PKT_ID] = BROADCAST_ID
-        txpacket[PKT_LENGTH] = param_length + 4  # 7: INST START_ADDR DATA_LEN CHKSUM
-        txpacket[PKT_INSTRUCTION] = INST_SYNC_READ
-        txpacket[PKT_PARAMETER0 + 0] = start_address
-        txpacket[PKT_PARAMETER0 + 1] = data_length
-
-        txpacket[PKT_PARAMETER0 + 2 : PKT_PARAMETER0 + 2 + param_length] = param[
-            0:param_length
-        ]
+        txpacket = self.txBuilder.buildSync(
+            INST_SYNC_READ, start_address, data_length, param, param_length
+        )
 
         # print(txpacket)
         result = self.txPacket(txpacket)
@@ -528,7 +449,8 @@ class protocol_packet_handler(object):
     def syncReadRx(self, data_length, param_length):
         wait_length = (6 + data_length) * param_length
         self.portHandler.setPacketTimeout(wait_length)
-        rxpacket = []
+        start_time = self.portHandler.getCurrentTime()
+        rxpacket = bytearray()
         rx_length = 0
         while True:
             rxpacket.extend(self.portHandler.readPort(wait_length - rx_length))
@@ -544,24 +466,14 @@ class protocol_packet_handler(object):
                     else:
                         result = COMM_RX_CORRUPT
                     break
+        self.portHandler.addRxTime(start_time)
         self.portHandler.is_using = False
         return result, rxpacket
 
     def syncWriteTxOnly(self, start_address, data_length, param, param_length):
-        txpacket = [0] * (param_length + 8)
-        # 8: HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN ... CHKSUM
-
-        txpacket[PKT_ID] = BROADCAST_ID
-        txpacket[PKT_LENGTH] = (
-            param_length + 4
-        )  # 4: INST START_ADDR DATA_LEN ... CHKSUM
-        txpacket[PKT_INSTRUCTION] = INST_SYNC_WRITE
-        txpacket[PKT_PARAMETER0 + 0] = start_address
-        txpacket[PKT_PARAMETER0 + 1] = data_length
-
-        txpacket[PKT_PARAMETER0 + 2 : PKT_PARAMETER0 + 2 + param_length] = param[
-            0:param_length
-        ]
+        txpacket = self.txBuilder.buildSync(
+            INST_SYNC_WRITE, start_address, data_length, param, param_length
+        )
 
         _, result, _ = self.txRxPacket(txpacket)
 
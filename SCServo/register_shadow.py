@@ -0,0 +1,165 @@
+# =============================================================================
+#  register_shadow.py
+#  Host side copy of the servo control tables to suppress redundant writes
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+
+SHADOW_MAX_GAP = 4  # known bytes that may be resent to join two dirty runs
+
+
+class RegisterShadow:
+    """
+    Last known value of a range of registers of every servo.
+
+    Writes are staged byte by byte. Bytes that already hold the staged value
+    are dropped, the rest become dirty and are returned by runs() as
+    contiguous (address, data) blocks. Small gaps between dirty bytes are
+    filled from the shadow when their value is known, so e.g. goal position
+    and goal speed go out as one WRITE across the goal time.
+    """
+
+    def __init__(self, start_address, length, max_gap=SHADOW_MAX_GAP):
+        self.start_address = start_address
+        self.length = length
+        self.max_gap = max_gap
+
+        self.values = {}  # scs_id: bytearray of register values
+        self.known = {}  # scs_id: bytearray, 1 where the value is known
+        self.pending = {}  # scs_id: {address: value} staged and not yet written
+
+        self.staged_bytes = 0
+        self.skipped_bytes = 0
+
+    def _table(self, scs_id):
+        if scs_id not in self.values:
+            self.values[scs_id] = bytearray(self.length)
+            self.known[scs_id] = bytearray(self.length)
+        return self.values[scs_id], self.known[scs_id]
+
+    def _index(self, address):
+        index = address - self.start_address
+        return index if 0 <= index < self.length else -1
+
+    def isKnown(self, scs_id, address):
+        index = self._index(address)
+        return index >= 0 and scs_id in self.known and self.known[scs_id][index] == 1
+
+    def getValue(self, scs_id, address):
+        if not self.isKnown(scs_id, address):
+            return None
+        return self.values[scs_id][self._index(address)]
+
+    def stage(self, scs_id, address, data):
+        """Stage a write, return how many bytes differ from the shadow."""
+        values, known = self._table(scs_id)
+        pending = self.pending.setdefault(scs_id, {})
+
+        changed = 0
+        for offset, value in enumerate(data):
+            value &= 0xFF
+            index = self._index(address + offset)
+            self.staged_bytes += 1
+            if index >= 0 and known[index] and values[index] == value:
+                # already in effect, drop an earlier staged change of the byte
+                pending.pop(address + offset, None)
+                self.skipped_bytes += 1
+                continue
+            pending[address + offset] = value
+            changed += 1
+
+        if not pending:
+            del self.pending[scs_id]
+        return changed
+
+    def runs(self, scs_id):
+        """Dirty bytes of a servo as a list of (address, data) blocks."""
+        pending = self.pending.get(scs_id)
+        if not pending:
+            return []
+
+        values, known = self._table(scs_id)
+        blocks = []
+        for address in sorted(pending):
+            if blocks:
+                start, data = blocks[-1]
+                end = start + len(data)
+                gap = range(end, address)
+                if len(gap) <= self.max_gap and all(
+                    self._index(a) >= 0 and known[self._index(a)] for a in gap
+                ):
+                    data.extend(values[self._index(a)] for a in gap)
+                    data.append(pending[address])
+                    continue
+            blocks.append((address, bytearray([pending[address]])))
+
+        return [(address, bytes(data)) for address, data in blocks]
+
+    def block(self, scs_id, address, length):
+        """Pending or known values of a register block, None if any byte is unknown."""
+        pending = self.pending.get(scs_id, {})
+        values, known = self._table(scs_id)
+        data = bytearray(length)
+        for offset in range(length):
+            value = pending.get(address + offset)
+            if value is None:
+                index = self._index(address + offset)
+                if index < 0 or not known[index]:
+                    return None
+                value = values[index]
+            data[offset] = value
+        return bytes(data)
+
+    def hasPending(self):
+        return bool(self.pending)
+
+    def pendingIds(self):
+        return list(self.pending)
+
+    def clearPending(self, scs_id=None):
+        if scs_id is None:
+            self.pending.clear()
+        else:
+            self.pending.pop(scs_id, None)
+
+    def update(self, scs_id, address, data):
+        """Record values the servo now holds."""
+        values, known = self._table(scs_id)
+        pending = self.pending.get(scs_id)
+        for offset, value in enumerate(data):
+            index = self._index(address + offset)
+            if index >= 0:
+                values[index] = value & 0xFF
+                known[index] = 1
+            if pending is not None and pending.get(address + offset) == value & 0xFF:
+                del pending[address + offset]
+        if pending is not None and not pending:
+            del self.pending[scs_id]
+
+    def seed(self, scs_id, address, data):
+        """Assume values for registers whose value is not known yet."""
+        values, known = self._table(scs_id)
+        for offset, value in enumerate(data):
+            index = self._index(address + offset)
+            if index >= 0 and not known[index]:
+                values[index] = value & 0xFF
+                known[index] = 1
+
+    def invalidate(self, scs_id=None, address=None, length=None):
+        """Forget shadow values, of all servos if scs_id is None, of all registers if address is None."""
+        ids = list(self.known) if scs_id is None else [scs_id]
+        for servo_id in ids:
+            if servo_id not in self.known:
+                continue
+            known = self.known[servo_id]
+            if address is None:
+                known[:] = bytes(self.length)
+                continue
+            for a in range(address, address + length):
+                index = self._index(a)
+                if index >= 0:
+                    known[index] = 0
+
+    def ids(self):
+        return list(self.values)
@@ -10,6 +10,8 @@
 from .scservo_def import *
 from .protocol_packet_handler import *
 from .group_sync_write import *
+from .group_sync_read import *
+from .register_shadow import *
 
 # 波特率定义
 SCSCL_1M = 0
@@ -64,6 +66,17 @@ class scscl(protocol_packet_handler):
     def __init__(self, portHandler):
         protocol_packet_handler.__init__(self, portHandler, 1)
         self.groupSyncWrite = GroupSyncWrite(self, SCSCL_GOAL_POSITION_L, 6)
+        self.groupSyncRead = GroupSyncRead(
+            self,
+            SCSCL_PRESENT_POSITION_L,
+            SCSCL_PRESENT_CURRENT_H - SCSCL_PRESENT_POSITION_L + 1,
+        )
+        # writable SRAM registers, TORQUE_ENABLE to LOCK
+        self.shadow = RegisterShadow(
+            SCSCL_TORQUE_ENABLE, SCSCL_LOCK - SCSCL_TORQUE_ENABLE + 1
+        )
+        self.bus_ids = None
+        self.shadow_transactions = 0
 
     def WritePosition(self, scs_id, position):
         txpacket = [
@@ -139,3 +152,174 @@ class scscl(protocol_packet_handler):
 
     def unLockEprom(self, scs_id):
         return self.write1ByteTxRx(scs_id, SCSCL_LOCK, 0)
+
+    # Register shadow
+    # Writes staged with StageWrite only go on the bus when FlushWrites is
+    # called, and only the bytes that differ from what the servo already holds.
+
+    def SetBusIds(self, scs_ids):
+        # all servo IDs on the bus, lets identical writes to every servo be broadcast
+        self.bus_ids = set(scs_ids) if scs_ids is not None else None
+
+    def StageWrite(self, scs_id, address, data):
+        return self.shadow.stage(scs_id, address, data)
+
+    def _seedGoalTime(self, scs_id):
+        # goal time 0 lets the goal speed apply, as SyncWritePos writes it, and
+        # lets position and speed go out as one write across it
+        self.shadow.seed(scs_id, SCSCL_GOAL_TIME_L, [0, 0])
+
+    def StagePosition(self, scs_id, position):
+        self._seedGoalTime(scs_id)
+        return self.StageWrite(
+            scs_id,
+            SCSCL_GOAL_POSITION_L,
+            [self.scs_lobyte(position), self.scs_hibyte(position)],
+        )
+
+    def StageSpeed(self, scs_id, speed):
+        self._seedGoalTime(scs_id)
+        return self.StageWrite(
+            scs_id, SCSCL_GOAL_SPEED_L, [self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        )
+
+    def ReadShadow(self, scs_id):
+        # load the shadow from the servo so gaps between dirty registers can be filled
+        length = self.shadow.length
+        data, result, error = self.readTxRx(scs_id, self.shadow.start_address, length)
+        if result == COMM_SUCCESS:
+            self.shadow.update(scs_id, self.shadow.start_address, data)
+        return result, error
+
+    def InvalidateShadow(self, scs_id=None):
+        self.shadow.invalidate(scs_id)
+
+    def FlushWrites(self, ack=True):
+        """
+        Write all staged changes with as few transactions as possible.
+
+        Dirty registers of a servo are merged into contiguous blocks. Where
+        the blocks of several servos overlap they are widened to a common
+        block, filled from the shadow, and sent as one broadcast WRITE when
+        every servo on the bus gets the same data or as one SYNC_WRITE
+        otherwise. Everything else is sent as a WRITE per servo, or with
+        ack=False as a SYNC_WRITE to the one servo so that no status packet
+        has to be waited for.
+
+        Returns (comm_result, error) of the first failing transaction.
+        """
+        runs = []
+        for scs_id in self.shadow.pendingIds():
+            for address, data in self.shadow.runs(scs_id):
+                runs.append((address, scs_id, data))
+        runs.sort(key=lambda run: run[0])
+
+        # spans of overlapping blocks over all servos
+        spans = []
+        for address, scs_id, data in runs:
+            if spans and address <= spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], address + len(data))
+                spans[-1][2].append((address, scs_id, data))
+            else:
+                spans.append([address, address + len(data), [(address, scs_id, data)]])
+
+        transactions = []
+        for start, end, members in spans:
+            ids = list(dict.fromkeys(scs_id for _, scs_id, _ in members))
+            blocks = [self.shadow.block(scs_id, start, end - start) for scs_id in ids]
+            if len(ids) > 1 and all(block is not None for block in blocks):
+                transactions.append((start, list(zip(ids, blocks))))
+            else:
+                for address, scs_id, data in members:
+                    transactions.append((address, [(scs_id, data)]))
+        self.shadow.clearPending()
+
+        first_result, first_error = COMM_SUCCESS, 0
+        for address, writes in transactions:
+            length = len(writes[0][1])
+            if (
+                len(writes) > 1
+                and self.bus_ids is not None
+                and set(scs_id for scs_id, _ in writes) == self.bus_ids
+                and all(data == writes[0][1] for _, data in writes)
+            ):
+                results = [
+                    (self.writeTxOnly(BROADCAST_ID, address, length, writes[0][1]), 0)
+                ]
+            elif len(writes) > 1 or not ack:
+                results = []
+                per_packet = (TXPACKET_MAX_LEN - 8) // (length + 1)
+                for idx in range(0, len(writes), per_packet):
+                    param = []
+                    for scs_id, data in writes[idx : idx + per_packet]:
+                        param.append(scs_id)
+                        param.extend(data)
+                    results.append(
+                        (self.syncWriteTxOnly(address, length, param, len(param)), 0)
+                    )
+            else:
+                scs_id, data = writes[0]
+                results = [self.writeTxRx(scs_id, address, length, data)]
+
+            self.shadow_transactions += len(results)
+            for result, error in results:
+                if first_result == COMM_SUCCESS and first_error == 0:
+                    first_result, first_error = result, error
+
+        return first_result, first_error
+
+    # Keep the shadow in step with every write
+
+    def writeTxOnly(self, scs_id, address, length, data):
+        result = protocol_packet_handler.writeTxOnly(
+            self, scs_id, address, length, data
+        )
+        self._shadowWrite(scs_id, address, length, data, result)
+        return result
+
+    def writeTxRx(self, scs_id, address, length, data):
+        result, error = protocol_packet_handler.writeTxRx(
+            self, scs_id, address, length, data
+        )
+        # a servo reporting an error, e.g. a clamped angle, may hold another value
+        self._shadowWrite(
+            scs_id, address, length, data, result if error == 0 else COMM_TX_FAIL
+        )
+        return result, error
+
+    def regWriteTxOnly(self, scs_id, address, length, data):
+        # registered writes only take effect on ACTION
+        self._shadowWrite(scs_id, address, length, data, COMM_TX_FAIL)
+        return protocol_packet_handler.regWriteTxOnly(
+            self, scs_id, address, length, data
+        )
+
+    def regWriteTxRx(self, scs_id, address, length, data):
+        self._shadowWrite(scs_id, address, length, data, COMM_TX_FAIL)
+        return protocol_packet_handler.regWriteTxRx(self, scs_id, address, length, data)
+
+    def syncWriteTxOnly(self, start_address, data_length, param, param_length):
+        result = protocol_packet_handler.syncWriteTxOnly(
+            self, start_address, data_length, param, param_length
+        )
+        for idx in range(0, param_length, data_length + 1):
+            self._shadowWrite(
+                param[idx],
+                start_address,
+                data_length,
+                param[idx + 1 : idx + 1 + data_length],
+                result,
+            )
+        return result
+
+    def _shadowWrite(self, scs_id, address, length, data, result):
+        if scs_id == BROADCAST_ID:
+            ids = self.bus_ids if self.bus_ids is not None else self.shadow.ids()
+        else:
+            ids = [scs_id]
+
+        for servo_id in ids:
+            if result == COMM_SUCCESS:
+                self.shadow.update(servo_id, address, data[0:length])
+            else:
+                self.shadow.invalidate(servo_id, address, length)
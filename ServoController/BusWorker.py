@@ -0,0 +1,182 @@
+# =============================================================================
+#  BusWorker.py
+#  Background thread owning the servo bus, newest target per servo wins.
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import threading
+import time
+from concurrent.futures import Future
+
+from ServoController.ControlLoop import Histogram
+
+
+class BusWorker:
+    """
+    Sends target poses to the servos from a background thread.
+
+    Producers call submit() from any thread. Only the newest target of every
+    servo is kept, older targets that were not sent yet are dropped and
+    counted. The worker sends everything pending in one move_angles call as
+    soon as the bus is free, so the time from submit to the packet on the
+    bus stays around one packet time no matter how fast targets arrive.
+
+    The worker owns the port, other bus access goes through call().
+    """
+
+    def __init__(self, controller, center_positions: dict = None, speed: int = 100):
+        """
+        Initialize the BusWorker.
+
+        Args:
+            controller (Scs0009Controller): Controller used only by the worker thread.
+            center_positions (dict[int, int]): Center position of each servo ID.
+                Defaults to the CENTER_POSITION of the controller.
+            speed (int): Speed (0-100) for targets submitted without one.
+        """
+        self.controller = controller
+        self.center_positions = center_positions or {}
+        self.speed = speed
+
+        self.condition = threading.Condition()
+        self.pending = {}  # id: (angle, speed, submit time)
+        self.calls = []  # (future, function, args)
+        self.running = False
+        self.thread = None
+
+        self.latency_histogram = Histogram()
+        self.reset_stats()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="BusWorker", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """
+        Stop the worker after sending what is pending.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def submit(self, pose: dict, speed: int = None):
+        """
+        Set new targets, replacing targets of the same servos not sent yet.
+
+        Args:
+            pose (dict[int, float]): Angle in degrees for each servo ID.
+            speed (int): Speed (0-100), defaults to the speed of the worker.
+        """
+        now = time.perf_counter()
+        speed = self.speed if speed is None else speed
+        with self.condition:
+            pending = self.pending
+            for id, angle in pose.items():
+                if id in pending:
+                    self.dropped += 1
+                pending[id] = (angle, speed, now)
+            self.submitted += len(pose)
+            self.max_depth = max(self.max_depth, len(pending))
+            self.condition.notify()
+
+    def call(self, function, *args) -> Future:
+        """
+        Run function(controller, *args) on the worker thread, e.g. a telemetry read.
+
+        Returns:
+            Future: Resolves to the return value of the function.
+        """
+        future = Future()
+        with self.condition:
+            self.calls.append((future, function, args))
+            self.condition.notify()
+        return future
+
+    def get_queue_depth(self) -> int:
+        with self.condition:
+            return len(self.pending)
+
+    def reset_stats(self):
+        with self.condition:
+            self.submitted = 0
+            self.dropped = 0
+            self.packets = 0
+            self.errors = 0
+            self.max_depth = 0
+            self.last_error = None
+            self.latency_histogram.reset()
+
+    def get_stats(self) -> dict:
+        """
+        Worker statistics since the last reset.
+
+        Returns:
+            dict: Submitted, dropped and sent target counts, packets, errors, current
+                and maximum queue depth, and a histogram of the time from submit to
+                send of the oldest target in each packet.
+        """
+        with self.condition:
+            return {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "packets": self.packets,
+                "errors": self.errors,
+                "queue_depth": len(self.pending),
+                "max_queue_depth": self.max_depth,
+                "latency": self.latency_histogram.to_dict(),
+            }
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending and not self.calls:
+                    self.condition.wait()
+                if not self.running and not self.pending and not self.calls:
+                    return
+                pending, self.pending = self.pending, {}
+                calls, self.calls = self.calls, []
+
+            for future, function, args in calls:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(function(self.controller, *args))
+                    except Exception as e:
+                        future.set_exception(e)
+
+            if pending:
+                self._send(pending)
+
+    def _send(self, pending):
+        ids = list(pending)
+        angles = [pending[id][0] for id in ids]
+        speeds = [pending[id][1] for id in ids]
+        centers = [
+            self.center_positions.get(id, self.controller.CENTER_POSITION) for id in ids
+        ]
+        oldest = min(submitted for _, _, submitted in pending.values())
+
+        try:
+            self.controller.move_angles(ids, angles, speeds, centers)
+        except (RuntimeError, ValueError) as e:
+            with self.condition:
+                self.errors += 1
+                self.last_error = e
+            return
+
+        latency = (time.perf_counter() - oldest) * 1000.0
+        with self.condition:
+            self.packets += 1
+            self.latency_histogram.add(latency)
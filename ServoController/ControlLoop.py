@@ -0,0 +1,226 @@
+# =============================================================================
+#  ControlLoop.py
+#  Fixed rate control loop running pose callbacks on monotonic deadlines.
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import math
+import threading
+import time
+
+# Upper edges in milliseconds of the histogram bins, the last bin takes the rest
+HISTOGRAM_BINS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+class Histogram:
+    """
+    Fixed bin histogram with running mean and maximum.
+    """
+
+    def __init__(self, bins_ms=HISTOGRAM_BINS_MS):
+        self.bins_ms = bins_ms
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bins_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value_ms: float):
+        index = 0
+        for edge in self.bins_ms:
+            if value_ms <= edge:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.maximum = max(self.maximum, value_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bin edge below which the given fraction of values fall.
+        """
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return (
+                    self.bins_ms[index] if index < len(self.bins_ms) else self.maximum
+                )
+        return self.maximum
+
+    def to_dict(self) -> dict:
+        return {
+            "bins_ms": list(self.bins_ms),
+            "counts": list(self.counts),
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.maximum,
+        }
+
+
+class ControlLoop:
+    """
+    Runs callbacks at a fixed rate and sends the resulting hand pose.
+
+    Every tick calls the callbacks with the scheduled tick time and the time
+    since the previous tick. Each callback returns a pose, a dict of servo ID
+    to angle, or None. The poses are merged and passed to the output, e.g.
+
+        loop = ControlLoop(100, lambda pose: controller.move_angles(
+            list(pose), list(pose.values()), 100))
+
+    Deadlines are kept on a monotonic clock. When a tick overruns, the missed
+    ticks are skipped so the loop stays in phase instead of bursting to
+    catch up.
+    """
+
+    def __init__(self, rate_hz: float, output=None, spin_time: float = 0.0005):
+        """
+        Initialize the ControlLoop.
+
+        Args:
+            rate_hz (float): Ticks per second, e.g. 50-200.
+            output (callable): Called with the merged pose of every tick that produced one.
+            spin_time (float): Seconds before a deadline where sleeping turns into spinning.
+        """
+        if rate_hz <= 0:
+            raise ValueError("Rate must be positive")
+
+        self.period = 1.0 / rate_hz
+        self.output = output
+        self.spin_time = spin_time
+        self.callbacks = []
+
+        self._stop = threading.Event()
+        self.jitter_histogram = Histogram()
+        self.io_histogram = Histogram()
+        self.reset_stats()
+
+    def add_callback(self, callback):
+        """
+        Add a callback(tick_time, dt) returning a pose dict or None.
+        """
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def stop(self):
+        """
+        Stop the loop after the current tick, safe to call from any thread.
+        """
+        self._stop.set()
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.period_count = 0
+        self.period_mean = 0.0
+        self.period_m2 = 0.0
+        self.jitter_histogram.reset()
+        self.io_histogram.reset()
+
+    def get_stats(self) -> dict:
+        """
+        Loop statistics since the last reset.
+
+        Returns:
+            dict: Tick, overrun and skipped tick counts, mean and standard deviation
+                of the measured period in ms, and histograms of the period jitter
+                (absolute deviation from the nominal period) and output time.
+        """
+        std = (
+            math.sqrt(self.period_m2 / (self.period_count - 1))
+            if self.period_count > 1
+            else 0.0
+        )
+        return {
+            "rate_hz": 1.0 / self.period,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "period_mean_ms": self.period_mean * 1000.0,
+            "period_std_ms": std * 1000.0,
+            "jitter_p99_ms": self.jitter_histogram.percentile(0.99),
+            "jitter": self.jitter_histogram.to_dict(),
+            "io": self.io_histogram.to_dict(),
+        }
+
+    def run(self, duration: float = None, ticks: int = None):
+        """
+        Run the loop until stop() is called or the duration or tick count is reached.
+
+        Args:
+            duration (float): Seconds to run, None to run until stopped.
+            ticks (int): Number of ticks to run, None to run until stopped.
+        """
+        self._stop.clear()
+
+        start = time.perf_counter()
+        deadline = start
+        previous_tick = None
+        tick_count = 0
+
+        while not self._stop.is_set():
+            if ticks is not None and tick_count >= ticks:
+                break
+            if duration is not None and deadline - start >= duration:
+                break
+
+            self._sleep_until(deadline)
+            now = time.perf_counter()
+
+            if previous_tick is not None:
+                self._add_period(now - previous_tick)
+            dt = 0.0 if previous_tick is None else now - previous_tick
+            previous_tick = now
+
+            self._tick(deadline, dt)
+            tick_count += 1
+            self.ticks += 1
+
+            deadline += self.period
+            now = time.perf_counter()
+            if now > deadline:
+                # overrun, skip the missed ticks and keep the phase
+                missed = int((now - deadline) / self.period) + 1
+                self.overruns += 1
+                self.skipped_ticks += missed
+                deadline += missed * self.period
+
+    def _tick(self, tick_time: float, dt: float):
+        pose = None
+        for callback in self.callbacks:
+            result = callback(tick_time, dt)
+            if result:
+                if pose is None:
+                    pose = dict(result)
+                else:
+                    pose.update(result)
+
+        if pose and self.output is not None:
+            io_start = time.perf_counter()
+            self.output(pose)
+            self.io_histogram.add((time.perf_counter() - io_start) * 1000.0)
+
+    def _add_period(self, period: float):
+        # Welford running mean and variance of the measured period
+        self.period_count += 1
+        delta = period - self.period_mean
+        self.period_mean += delta / self.period_count
+        self.period_m2 += delta * (period - self.period_mean)
+        self.jitter_histogram.add(abs(period - self.period) * 1000.0)
+
+    def _sleep_until(self, deadline: float):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_time:
+            # wake up early and spin the rest for a precise tick
+            self._stop.wait(remaining - self.spin_time)
+        while time.perf_counter() < deadline and not self._stop.is_set():
+            pass
@@ -0,0 +1,324 @@
+# =============================================================================
+#  GestureLibrary.py
+#  Gestures as data, compiled once into the raw packets to send.
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("..")
+from SCServo import *  # Uses SCServo library
+
+from ServoController.Trajectory import DEFAULT_RATE_HZ, plan_trajectory
+
+GESTURE_FORMAT_VERSION = 1  # bump when the compiled output changes
+GESTURE_CACHE_MAGIC = b"GST1"
+FRAME_HEADER = struct.Struct("<dH")  # send time in seconds, frame length
+
+
+class CompiledGesture:
+    """
+    Ready-to-send packets of a gesture and when to send them.
+
+    times holds the send time of every frame in seconds from the start of the
+    gesture, frames the complete SYNC_WRITE packets including the checksum.
+    """
+
+    def __init__(self, name: str, key: str, times, frames: list):
+        self.name = name
+        self.key = key
+        self.times = np.asarray(times, dtype=np.float64)
+        self.frames = frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def duration(self) -> float:
+        return float(self.times[-1]) if len(self.frames) else 0.0
+
+    def to_bytes(self) -> bytes:
+        chunks = [GESTURE_CACHE_MAGIC]
+        for send_time, frame in zip(self.times.tolist(), self.frames):
+            chunks.append(FRAME_HEADER.pack(send_time, len(frame)))
+            chunks.append(frame)
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, name: str, key: str, data: bytes):
+        if data[0 : len(GESTURE_CACHE_MAGIC)] != GESTURE_CACHE_MAGIC:
+            raise ValueError(f"Not a compiled gesture: {name}")
+
+        times = []
+        frames = []
+        offset = len(GESTURE_CACHE_MAGIC)
+        while offset < len(data):
+            send_time, length = FRAME_HEADER.unpack_from(data, offset)
+            offset += FRAME_HEADER.size
+            times.append(send_time)
+            frames.append(data[offset : offset + length])
+            offset += length
+        return cls(name, key, times, frames)
+
+
+class GestureLibrary:
+    """
+    Compiles gestures defined as data into packet streams and replays them.
+
+    A gesture is a dict with a list of keyframes, e.g.
+
+        {"keyframes": [
+            {"time": 0.0, "speed": 30, "targets": {1: -20, 2: 60}},
+            {"time": 0.5, "duration": 0.3, "targets": {1: 0, 2: 85}},
+        ]}
+
+    Every keyframe is sent at its time, in seconds from the start of the
+    gesture. Without a duration the targets are sent in one SYNC_WRITE and the
+    servos move at the given speed (0-100). With a duration the move from the
+    previous targets is streamed as a trajectory, see Trajectory.py, with an
+    optional "profile".
+
+    Compiled gestures are keyed by a hash of the gesture and the calibration,
+    and cached in memory and, given a cache directory, on disk.
+    """
+
+    def __init__(
+        self,
+        controller,
+        center_positions: dict,
+        cache_dir: str = None,
+        rate_hz: float = DEFAULT_RATE_HZ,
+    ):
+        """
+        Initialize the GestureLibrary.
+
+        Args:
+            controller (Scs0009Controller): Controller whose port the gestures are sent on.
+            center_positions (dict[int, int]): Center position of each servo ID.
+            cache_dir (str): Directory for compiled gestures, None to only cache in memory.
+            rate_hz (float): Rate keyframes with a duration are streamed at.
+        """
+        self.controller = controller
+        self.center_positions = dict(center_positions)
+        self.cache_dir = cache_dir
+        self.rate_hz = rate_hz
+
+        self.gestures = {}
+        self.compiled = {}
+
+        self.calibration_key = self._hash(
+            {
+                "centers": self.center_positions,
+                "min_position": controller.MIN_POSITION,
+                "max_position": controller.MAX_POSITION,
+                "center_position": controller.CENTER_POSITION,
+                "min_speed": controller.MIN_SPEED,
+                "max_speed": controller.MAX_SPEED,
+                "scs_end": controller.packetHandler.scs_getend(),
+                "rate_hz": rate_hz,
+                "version": GESTURE_FORMAT_VERSION,
+            }
+        )
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def add(self, name: str, gesture: dict):
+        self.gestures[name] = gesture
+
+    def add_all(self, gestures: dict):
+        for name, gesture in gestures.items():
+            self.add(name, gesture)
+
+    def key(self, name: str) -> str:
+        """
+        Cache key of a gesture under the current calibration.
+        """
+        if name not in self.gestures:
+            raise ValueError(f"Unknown gesture: {name}")
+        return self._hash(
+            {"calibration": self.calibration_key, "gesture": self.gestures[name]}
+        )
+
+    def compile(self, name: str) -> CompiledGesture:
+        """
+        Compiled packets of a gesture, from the memory or disk cache if possible.
+        """
+        key = self.key(name)
+
+        compiled = self.compiled.get(name)
+        if compiled is not None and compiled.key == key:
+            return compiled
+
+        compiled = self._load(name, key)
+        if compiled is None:
+            compiled = self._compile(name, key)
+            self._store(compiled)
+
+        self.compiled[name] = compiled
+        return compiled
+
+    def compile_all(self):
+        for name in self.gestures:
+            self.compile(name)
+
+    def play(self, name: str):
+        """
+        Send the packets of a gesture at their times.
+
+        The packets bypass the register shadow of the controller, which is
+        cleared for the servos of the gesture, also when playing fails.
+        """
+        compiled = self.compile(name)
+        port_handler = self.controller.portHandler
+        ids = {
+            int(id)
+            for keyframe in self.gestures[name]["keyframes"]
+            for id in keyframe["targets"]
+        }
+
+        start = time.perf_counter()
+        try:
+            for send_time, frame in zip(compiled.times.tolist(), compiled.frames):
+                delay = start + send_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                if port_handler.is_using:
+                    raise RuntimeError(f"Port busy while playing gesture: {name}")
+                port_handler.is_using = True
+                written = port_handler.writePort(frame)
+                port_handler.is_using = False
+
+                if written != len(frame):
+                    raise RuntimeError(
+                        f"Communication error while playing gesture: {name}"
+                    )
+        finally:
+            for id in ids:
+                self.controller.invalidate_shadow(id)
+
+    def _compile(self, name, key):
+        controller = self.controller
+        current = {}  # last target of every servo
+        times = []
+        frames = []
+
+        for keyframe in self.gestures[name]["keyframes"]:
+            start_time = keyframe.get("time", 0.0)
+            targets = {int(id): angle for id, angle in keyframe["targets"].items()}
+            ids = list(targets)
+            end = np.array([targets[id] for id in ids], dtype=np.float64)
+
+            if np.any(end < controller.MIN_DEGREE) or np.any(
+                end > controller.MAX_DEGREE
+            ):
+                raise ValueError(
+                    f"Angles of gesture {name} must be between "
+                    f"{controller.MIN_DEGREE} and {controller.MAX_DEGREE} degrees"
+                )
+
+            duration = keyframe.get("duration")
+            if duration is None:
+                speed = keyframe.get("speed", 100)
+                if speed < 0 or speed > 100:
+                    raise ValueError(f"Speed must be between 0 and 100")
+                angles = end[None, :]
+                send_times = [start_time]
+            else:
+                missing = [id for id in ids if id not in current]
+                if missing:
+                    raise ValueError(
+                        f"Keyframe with a duration in gesture {name} needs earlier targets for {missing}"
+                    )
+                speed = 100
+                trajectory = plan_trajectory(
+                    ids,
+                    [current[id] for id in ids],
+                    [(duration, end)],
+                    self.rate_hz,
+                    keyframe.get("profile", "min_jerk"),
+                )
+                angles = trajectory.angles
+                send_times = (start_time + trajectory.times).tolist()
+
+            times.extend(send_times)
+            frames.extend(self._sync_write_frames(ids, angles, speed))
+            current.update(targets)
+
+        order = np.argsort(np.asarray(times), kind="stable")
+        return CompiledGesture(
+            name, key, np.asarray(times)[order], [frames[index] for index in order]
+        )
+
+    def _sync_write_frames(self, ids, angles, speed):
+        # all frames of one keyframe at once, SYNC_WRITE to GOAL_POSITION of
+        # position, time and speed words for every servo
+        controller = self.controller
+        ticks = angles.shape[0]
+        count = len(ids)
+
+        centers = np.array([self.center_positions[id] for id in ids], dtype=np.int64)
+        positions = (centers - controller.CENTER_POSITION) + (
+            (angles + 150) / 300 * (controller.MAX_POSITION - controller.MIN_POSITION)
+        ).astype(np.int64)
+        servo_speed = controller._to_servo_speed(speed)
+
+        word = ">u2" if self.controller.packetHandler.scs_getend() else "<u2"
+        words = np.zeros((ticks, count, 3), dtype=word)
+        words[:, :, 0] = positions
+        words[:, :, 2] = servo_speed
+
+        data_length = 6
+        param_length = count * (1 + data_length)
+        param = np.empty((ticks, count, 1 + data_length), dtype=np.uint8)
+        param[:, :, 0] = ids
+        param[:, :, 1:] = words.view(np.uint8).reshape(ticks, count, data_length)
+        param = param.reshape(ticks, param_length)
+
+        # HEADER0 HEADER1 ID LEN INST START_ADDR DATA_LEN ... CHKSUM
+        packets = np.empty((ticks, param_length + 8), dtype=np.uint8)
+        packets[:, 0:2] = 0xFF
+        packets[:, 2] = BROADCAST_ID
+        packets[:, 3] = param_length + 4
+        packets[:, 4] = INST_SYNC_WRITE
+        packets[:, 5] = SCSCL_GOAL_POSITION_L
+        packets[:, 6] = data_length
+        packets[:, 7:-1] = param
+        packets[:, -1] = ~packets[:, 2:-1].sum(axis=1, dtype=np.int64) & 0xFF
+
+        if packets.shape[1] > TXPACKET_MAX_LEN:
+            raise ValueError(f"Too many servos in one keyframe: {count}")
+
+        return [row.tobytes() for row in packets]
+
+    def _path(self, name, key):
+        return os.path.join(self.cache_dir, f"{name}-{key}.gesture")
+
+    def _load(self, name, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(name, key), "rb") as f:
+                return CompiledGesture.from_bytes(name, key, f.read())
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _store(self, compiled):
+        if self.cache_dir is None:
+            return
+        path = self._path(compiled.name, compiled.key)
+        with open(path + ".tmp", "wb") as f:
+            f.write(compiled.to_bytes())
+        os.replace(path + ".tmp", path)
+
+    def _hash(self, value):
+        text = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha1(text.encode()).hexdigest()[0:16]
@@ -5,10 +5,31 @@
 #  Licensed under the MIT License.
 # =============================================================================
 import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
 
 sys.path.append("..")
 from SCServo import *  # Uses SCServo library
 
+# One row per servo in a telemetry snapshot
+TELEMETRY_DTYPE = np.dtype(
+    [
+        ("timestamp", np.float64),  # time.monotonic() when the snapshot was received
+        ("id", np.uint8),
+        ("valid", np.bool_),  # False if the servo did not answer
+        ("error", np.uint8),
+        ("position", np.int16),
+        ("speed", np.int16),
+        ("load", np.int16),
+        ("voltage", np.uint8),  # 0.1 V
+        ("temperature", np.uint8),  # degrees Celsius
+        ("moving", np.bool_),
+        ("current", np.int16),
+    ]
+)
+
 
 class Scs0009Controller:
     BAUDRATE = 1000000  # SCServo default baudrate : 1000000
@@ -20,21 +41,46 @@ class Scs0009Controller:
     MIN_SPEED = 1
     MAX_SPEED = 2048
 
-    def __init__(self, com_port):
+    def __init__(self, com_port, blocking_io: bool = False, servo_ids: list = None):
         """
         Initialize the SCS0009Controller.
 
         Args:
             com_port (str): Serial port name.
                 Valid values (Windows): "COM1", "COM2", "COM3", etc.
+                "emulator://8" runs against 8 emulated servos instead of hardware.
+            blocking_io (bool): Sleep while waiting for status packets instead of polling the port.
+            servo_ids (list[int]): IDs of all servos on the bus. Lets settings identical for
+                every servo go out as one broadcast write.
         """
         self.com_port = com_port
 
         # Initialize PortHandler instance
-        self.portHandler = PortHandler(com_port)
+        if com_port.startswith(EMULATOR_PORT_PREFIX):
+            self.portHandler = EmulatedPortHandler(com_port)
+        else:
+            self.portHandler = PortHandler(com_port)
+        self.portHandler.setBlocking(blocking_io)
 
         # Initialize PacketHandler instance
         self.packetHandler = scscl(self.portHandler)
+        self.packetHandler.SetBusIds(servo_ids)
+        self.batch_depth = 0
+        self.asyncBus = None
+
+        # Fire-and-forget writes, see set_fire_and_forget
+        self.fire_and_forget = False
+        self.verify_interval = 0
+        self.on_divergence = None
+        self.setpoints_since_verify = 0
+        self.unverified_ids = set()
+        self.verify_count = 0
+        self.divergence_count = 0
+        self.goalSyncRead = GroupSyncRead(
+            self.packetHandler,
+            SCSCL_GOAL_POSITION_L,
+            SCSCL_GOAL_SPEED_H - SCSCL_GOAL_POSITION_L + 1,
+        )
 
         # Open port
         if not self.portHandler.openPort():
@@ -89,6 +135,73 @@ class Scs0009Controller:
 
         return moving != 0
 
+    def read_telemetry(self, ids: list) -> np.ndarray:
+        """
+        Read position, speed, load, voltage, temperature, moving flag and current
+        of several servos in one SYNC_READ transaction.
+
+        Args:
+            ids (list[int]): IDs of the servos.
+
+        Returns:
+            np.ndarray: One TELEMETRY_DTYPE row per servo, in the order of ids.
+
+        Raises:
+            ValueError: If an ID is listed twice.
+            RuntimeError: If none of the servos answered.
+        """
+        if len(set(ids)) != len(ids):
+            raise ValueError("Servo IDs must be unique")
+
+        group_sync_read = self.packetHandler.groupSyncRead
+        if list(group_sync_read.data_dict) != list(ids):
+            group_sync_read.clearParam()
+            for id in ids:
+                group_sync_read.addParam(id)
+
+        comm_result = group_sync_read.txRxPacket()
+        timestamp = time.monotonic()
+
+        valid = np.array(
+            [group_sync_read.data_dict[id] is not None for id in ids], dtype=np.bool_
+        )
+        if comm_result != COMM_SUCCESS and not valid.any():
+            raise RuntimeError(
+                f"Communication error: {self.packetHandler.getTxRxResult(comm_result)}"
+            )
+
+        # error byte followed by the registers from SCSCL_PRESENT_POSITION_L,
+        # servos that did not answer read as zero instead of their last values
+        raw = np.frombuffer(group_sync_read.getDataBuffer(), dtype=np.uint8).reshape(
+            len(ids), group_sync_read.slot_length
+        )
+        raw = np.where(valid[:, None], raw, 0)
+
+        def register(address):
+            return raw[:, address - SCSCL_PRESENT_POSITION_L + 1]
+
+        def word(address, sign_bit=None):
+            # SCS servos store words big endian
+            value = (register(address).astype(np.int32) << 8) | register(address + 1)
+            if sign_bit is not None:
+                negative = (value & (1 << sign_bit)) != 0
+                value = np.where(negative, -(value & ~(1 << sign_bit)), value)
+            return value
+
+        telemetry = np.zeros(len(ids), dtype=TELEMETRY_DTYPE)
+        telemetry["timestamp"] = timestamp
+        telemetry["id"] = ids
+        telemetry["valid"] = valid
+        telemetry["error"] = raw[:, 0]
+        telemetry["position"] = word(SCSCL_PRESENT_POSITION_L)
+        telemetry["speed"] = word(SCSCL_PRESENT_SPEED_L, 15)
+        telemetry["load"] = word(SCSCL_PRESENT_LOAD_L, 10)
+        telemetry["voltage"] = register(SCSCL_PRESENT_VOLTAGE)
+        telemetry["temperature"] = register(SCSCL_PRESENT_TEMPERATURE)
+        telemetry["moving"] = register(SCSCL_MOVING) != 0
+        telemetry["current"] = word(SCSCL_PRESENT_CURRENT_L, 15)
+        return telemetry
+
     def set_speed(self, id: int, speed: int):
         """
         Set the speed of the servo.
@@ -100,37 +213,215 @@ class Scs0009Controller:
         if speed < 0 or speed > 100:
             raise ValueError(f"Speed must be between 0 and 100")
 
-        # Map speed from 0-100 to 1-2048
-        servo_speed = int(
-            self.MIN_SPEED + (speed / 100) * (self.MAX_SPEED - self.MIN_SPEED)
-        )
+        self.packetHandler.StageSpeed(id, self._to_servo_speed(speed))
+        if self.batch_depth == 0:
+            self._flush_writes()
+
+    def move_angle(self, id: int, angle: int, center_pos: int = CENTER_POSITION):
+        """
+        Set the angle of the servo.
+
+        Args:
+            id (int): ID of the servo.
+            degree (int): Angle value in degrees (-150 - +150).
+        """
+        if angle < self.MIN_DEGREE or angle > self.MAX_DEGREE:
+            raise ValueError(f"Angle must be between -150 and +150 degrees")
 
-        comm_result, error = self.packetHandler.WriteSpeed(id, servo_speed)
+        self.packetHandler.StagePosition(id, self._to_position(angle, center_pos))
+        if self.batch_depth == 0:
+            self._flush_writes()
+
+    def move_angles(
+        self,
+        ids: list,
+        angles: list,
+        speeds,
+        center_positions=None,
+    ):
+        """
+        Set speed and angle of several servos in one SYNC_WRITE packet.
+
+        Args:
+            ids (list[int]): IDs of the servos.
+            angles (list[int]): Angle value in degrees for each servo (-85 - +85).
+            speeds (int | list[int]): Speed value (0-100), either one for all servos or one per servo.
+            center_positions (list[int]): Center position for each servo. Defaults to CENTER_POSITION.
+        """
+        group_sync_write = self.packetHandler.groupSyncWrite
+        group_sync_write.clearParam()
+
+        for id, position, servo_speed in self._servo_targets(
+            ids, angles, speeds, center_positions
+        ):
+            self.packetHandler.SyncWritePos(id, position, 0, servo_speed)
+
+        comm_result = group_sync_write.txPacket()
         if comm_result != COMM_SUCCESS:
             raise RuntimeError(
                 f"Communication error: {self.packetHandler.getTxRxResult(comm_result)}"
             )
-        if error != 0:
+        self._setpoint_sent(ids)
+
+    async def move_angles_async(
+        self,
+        ids: list,
+        angles: list,
+        speeds,
+        center_positions=None,
+    ):
+        """
+        move_angles on the asyncio bus, see async_bus().
+
+        The event loop keeps running while the packet is sent. Writes made here
+        bypass the register shadow, which is cleared for the servos.
+        """
+        handler = self.packetHandler
+        param = []
+        for id, position, servo_speed in self._servo_targets(
+            ids, angles, speeds, center_positions
+        ):
+            param.extend(
+                [
+                    id,
+                    handler.scs_lobyte(position),
+                    handler.scs_hibyte(position),
+                    0,
+                    0,
+                    handler.scs_lobyte(servo_speed),
+                    handler.scs_hibyte(servo_speed),
+                ]
+            )
+            handler.InvalidateShadow(id)
+
+        comm_result = await self.async_bus().sync_write(SCSCL_GOAL_POSITION_L, 6, param)
+        if comm_result != COMM_SUCCESS:
             raise RuntimeError(
-                f"Servo error: {self.packetHandler.getRxPacketError(error)}"
+                f"Communication error: {handler.getTxRxResult(comm_result)}"
             )
 
-    def move_angle(self, id: int, angle: int, center_pos: int = CENTER_POSITION):
+    def async_bus(self) -> AsyncPacketHandler:
         """
-        Set the angle of the servo.
+        asyncio packet handler on the port of this controller.
+
+        Its ping, read, write, sync_write and sync_read are awaitable and let
+        other tasks, e.g. BLE notifications, run while waiting on the servos.
+        """
+        if self.asyncBus is None:
+            self.asyncBus = AsyncPacketHandler(
+                self.portHandler, self.packetHandler.scs_getend()
+            )
+        return self.asyncBus
+
+    @contextmanager
+    def batch(self):
+        """
+        Collect set_speed and move_angle calls and send them together on exit.
+
+        Unchanged values are skipped, speed and position of a servo are merged
+        into one write and the same change on several servos into one SYNC_WRITE.
+
+            with controller.batch():
+                controller.set_speed(1, 30)
+                controller.move_angle(1, 45)
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+        if self.batch_depth == 0:
+            self._flush_writes()
+
+    def set_fire_and_forget(
+        self, enabled: bool, verify_interval: int = 10, on_divergence=None
+    ):
+        """
+        Send setpoints without waiting for status packets.
+
+        set_speed and move_angle go out as SYNC_WRITE or broadcast writes, which
+        servos do not answer, so a setpoint only costs its transmit time. Every
+        verify_interval setpoints the goal registers of the servos written since
+        the last check are read back in one SYNC_READ and compared with what was
+        sent. Servos that differ or do not answer count as diverged.
 
         Args:
-            id (int): ID of the servo.
-            degree (int): Angle value in degrees (-150 - +150).
+            enabled (bool): True for fire-and-forget, False to acknowledge every write.
+            verify_interval (int): Setpoints between verifications, 0 to never verify.
+            on_divergence (callable): Called with (id, expected_position, actual_position)
+                for every diverged servo, actual_position is None if the servo did not answer.
         """
-        if angle < self.MIN_DEGREE or angle > self.MAX_DEGREE:
-            raise ValueError(f"Angle must be between -150 and +150 degrees")
+        self.fire_and_forget = enabled
+        self.verify_interval = verify_interval
+        self.on_divergence = on_divergence
+        self.setpoints_since_verify = 0
+        self.unverified_ids.clear()
 
-        center_offset = center_pos - self.CENTER_POSITION
-        position = int(((angle + 150) / 300) * (self.MAX_POSITION - self.MIN_POSITION))
-        position = center_offset + position
+    def verify_writes(self, ids: list = None) -> int:
+        """
+        Read back the goal registers and compare them with the written values.
+
+        Diverged servos are counted in divergence_count, reported to on_divergence
+        and have their register shadow cleared so the next setpoint is sent again.
 
-        comm_result, error = self.packetHandler.WritePosition(id, position)
+        Args:
+            ids (list[int]): IDs of the servos, defaults to the servos written since the last check.
+
+        Returns:
+            int: Number of diverged servos.
+        """
+        if ids is None:
+            ids = sorted(self.unverified_ids)
+        self.unverified_ids.clear()
+        self.setpoints_since_verify = 0
+        if not ids:
+            return 0
+
+        group_sync_read = self.goalSyncRead
+        if list(group_sync_read.data_dict) != list(ids):
+            group_sync_read.clearParam()
+            for id in ids:
+                group_sync_read.addParam(id)
+        group_sync_read.txRxPacket()
+        self.verify_count += 1
+
+        shadow = self.packetHandler.shadow
+        diverged = 0
+        for id in ids:
+            data = group_sync_read.data_dict[id]
+            expected = [
+                shadow.getValue(id, SCSCL_GOAL_POSITION_L + offset)
+                for offset in range(group_sync_read.data_length)
+            ]
+            if data is not None and all(
+                value is None or value == data[offset + 1]
+                for offset, value in enumerate(expected)
+            ):
+                continue
+
+            diverged += 1
+            self.packetHandler.InvalidateShadow(id)
+            if self.on_divergence is not None:
+                self.on_divergence(
+                    id,
+                    self._word(expected[0], expected[1]),
+                    None if data is None else self._word(data[1], data[2]),
+                )
+
+        self.divergence_count += diverged
+        return diverged
+
+    def invalidate_shadow(self, id: int = None):
+        """
+        Forget the register values cached for a servo, or all servos if id is None.
+
+        Call this when a servo may have changed outside this controller, e.g. after a power cycle.
+        """
+        self.packetHandler.InvalidateShadow(id)
+
+    def _flush_writes(self):
+        ids = self.packetHandler.shadow.pendingIds()
+        comm_result, error = self.packetHandler.FlushWrites(not self.fire_and_forget)
         if comm_result != COMM_SUCCESS:
             raise RuntimeError(
                 f"Communication error: {self.packetHandler.getTxRxResult(comm_result)}"
@@ -139,6 +430,53 @@ class Scs0009Controller:
             raise RuntimeError(
                 f"Servo error: {self.packetHandler.getRxPacketError(error)}"
             )
+        if ids:
+            self._setpoint_sent(ids)
+
+    def _setpoint_sent(self, ids):
+        if not self.fire_and_forget or self.verify_interval <= 0:
+            return
+        self.unverified_ids.update(ids)
+        self.setpoints_since_verify += 1
+        if self.setpoints_since_verify >= self.verify_interval:
+            self.verify_writes()
+
+    def _word(self, high, low):
+        # SCS servos store words big endian
+        if high is None or low is None:
+            return None
+        return (high << 8) | low
+
+    def _servo_targets(self, ids, angles, speeds, center_positions):
+        # validated (id, position, servo speed) of every servo of a multi servo move
+        if isinstance(speeds, (int, float)):
+            speeds = [speeds] * len(ids)
+        if center_positions is None:
+            center_positions = [self.CENTER_POSITION] * len(ids)
+
+        if not (len(ids) == len(angles) == len(speeds) == len(center_positions)):
+            raise ValueError("ids, angles, speeds and center_positions must match")
+
+        targets = []
+        for id, angle, speed, center_pos in zip(ids, angles, speeds, center_positions):
+            if angle < self.MIN_DEGREE or angle > self.MAX_DEGREE:
+                raise ValueError(f"Angle must be between -150 and +150 degrees")
+            if speed < 0 or speed > 100:
+                raise ValueError(f"Speed must be between 0 and 100")
+
+            targets.append(
+                (id, self._to_position(angle, center_pos), self._to_servo_speed(speed))
+            )
+        return targets
+
+    def _to_servo_speed(self, speed):
+        # Map speed from 0-100 to 1-2048
+        return int(self.MIN_SPEED + (speed / 100) * (self.MAX_SPEED - self.MIN_SPEED))
+
+    def _to_position(self, angle, center_pos):
+        center_offset = center_pos - self.CENTER_POSITION
+        position = int(((angle + 150) / 300) * (self.MAX_POSITION - self.MIN_POSITION))
+        return center_offset + position
 
     # Descructor to ensure port is closed when the object is deleted
     def __del__(self):
@@ -0,0 +1,203 @@
+# =============================================================================
+#  Trajectory.py
+#  Precomputed joint trajectories for the servos of the hand.
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+
+from ServoController.ControlLoop import ControlLoop
+
+DEFAULT_RATE_HZ = 100
+TRAPEZOID_ACCEL_FRACTION = 0.25  # part of a move spent accelerating, and decelerating
+
+
+def min_jerk(s: np.ndarray) -> np.ndarray:
+    """
+    Minimum jerk profile, 10s^3 - 15s^4 + 6s^5, for normalized time s in [0, 1].
+    """
+    return s * s * s * (10.0 + s * (-15.0 + 6.0 * s))
+
+
+def trapezoidal(
+    s: np.ndarray, accel_fraction: float = TRAPEZOID_ACCEL_FRACTION
+) -> np.ndarray:
+    """
+    Trapezoidal velocity profile for normalized time s in [0, 1].
+    """
+    velocity = 1.0 / (1.0 - accel_fraction)
+    ramp = 0.5 * velocity / accel_fraction
+    return np.where(
+        s < accel_fraction,
+        ramp * s * s,
+        np.where(
+            s > 1.0 - accel_fraction,
+            1.0 - ramp * (1.0 - s) * (1.0 - s),
+            velocity * (s - 0.5 * accel_fraction),
+        ),
+    )
+
+
+def linear(s: np.ndarray) -> np.ndarray:
+    return s
+
+
+PROFILES = {
+    "min_jerk": min_jerk,
+    "trapezoidal": trapezoidal,
+    "linear": linear,
+}
+
+
+class Trajectory:
+    """
+    Angles of a set of servos sampled at a fixed rate.
+
+    angles has one row per control tick and one column per servo ID, so the
+    trajectory can be streamed one row at a time with no work per tick.
+    """
+
+    def __init__(self, ids: list, angles: np.ndarray, rate_hz: float = DEFAULT_RATE_HZ):
+        angles = np.asarray(angles, dtype=np.float64)
+        if angles.ndim != 2 or angles.shape[1] != len(ids):
+            raise ValueError("angles must have one column per servo ID")
+
+        self.ids = list(ids)
+        self.angles = angles
+        self.rate_hz = rate_hz
+
+    def __len__(self):
+        return self.angles.shape[0]
+
+    @property
+    def duration(self) -> float:
+        return len(self) / self.rate_hz
+
+    @property
+    def times(self) -> np.ndarray:
+        return np.arange(len(self)) / self.rate_hz
+
+    def pose(self, index: int) -> dict:
+        """
+        Pose of one tick as a dict of servo ID to angle.
+        """
+        return dict(zip(self.ids, self.angles[index].tolist()))
+
+    def callback(self):
+        """
+        ControlLoop callback returning the poses tick by tick, then None.
+        """
+        rows = self.angles.tolist()
+        ids = self.ids
+        index = 0
+
+        def next_pose(tick_time, dt):
+            nonlocal index
+            if index >= len(rows):
+                return None
+            pose = dict(zip(ids, rows[index]))
+            index += 1
+            return pose
+
+        return next_pose
+
+    def play(self, output) -> dict:
+        """
+        Stream the trajectory to output at its rate.
+
+        Args:
+            output (callable): Called with the pose of every tick, e.g. a SYNC_WRITE of the angles.
+
+        Returns:
+            dict: Statistics of the control loop.
+        """
+        loop = ControlLoop(self.rate_hz, output)
+        loop.add_callback(self.callback())
+        loop.run(ticks=len(self))
+        return loop.get_stats()
+
+
+def plan_trajectory(
+    ids: list,
+    start: list,
+    keyframes: list,
+    rate_hz: float = DEFAULT_RATE_HZ,
+    profile: str = "min_jerk",
+) -> Trajectory:
+    """
+    Compute the trajectory through a sequence of keyframes in one go.
+
+    Args:
+        ids (list[int]): IDs of the servos.
+        start (list[float]): Angle of each servo at the start.
+        keyframes (list[tuple[float, list[float]]]): (duration in seconds, angles) pairs,
+            each moving every servo from the previous angles to the given angles.
+            Repeating the previous angles holds the pose.
+        rate_hz (float): Control rate the trajectory is sampled at.
+        profile (str): "min_jerk", "trapezoidal" or "linear".
+
+    Returns:
+        Trajectory: Sampled angles ending exactly on the last keyframe.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Profile must be one of {', '.join(PROFILES)}")
+    if not keyframes:
+        raise ValueError("At least one keyframe is required")
+
+    durations = np.array([duration for duration, _ in keyframes], dtype=np.float64)
+    if np.any(durations <= 0):
+        raise ValueError("Keyframe durations must be positive")
+
+    targets = np.array([angles for _, angles in keyframes], dtype=np.float64)
+    starts = np.vstack([np.asarray(start, dtype=np.float64), targets[:-1]])
+    if targets.shape[1] != len(ids) or starts.shape[1] != len(ids):
+        raise ValueError("Every keyframe needs one angle per servo ID")
+
+    ends = np.cumsum(durations)
+    ticks = max(int(round(ends[-1] * rate_hz)), 1)
+    t = np.arange(1, ticks + 1) / rate_hz
+
+    # keyframe active at each tick and how far through it the tick is
+    segment = np.minimum(np.searchsorted(ends, t, side="left"), len(durations) - 1)
+    s = np.clip(
+        (t - (ends[segment] - durations[segment])) / durations[segment], 0.0, 1.0
+    )
+    shaped = PROFILES[profile](s)
+
+    angles = starts[segment] + (targets[segment] - starts[segment]) * shaped[:, None]
+    return Trajectory(ids, angles, rate_hz)
+
+
+def blend_trajectories(
+    first: Trajectory, second: Trajectory, blend_time: float, profile: str = "min_jerk"
+) -> Trajectory:
+    """
+    Join two trajectories, crossfading the end of the first into the start of the second.
+
+    Args:
+        first (Trajectory): Trajectory played first.
+        second (Trajectory): Trajectory played next, with the same servo IDs and rate.
+        blend_time (float): Seconds the two overlap.
+        profile (str): Shape of the crossfade weight.
+
+    Returns:
+        Trajectory: The joined trajectory, blend_time shorter than both together.
+    """
+    if first.ids != second.ids or first.rate_hz != second.rate_hz:
+        raise ValueError("Only trajectories with the same IDs and rate can be blended")
+    if profile not in PROFILES:
+        raise ValueError(f"Profile must be one of {', '.join(PROFILES)}")
+
+    overlap = min(int(round(blend_time * first.rate_hz)), len(first), len(second))
+    if overlap <= 0:
+        return Trajectory(
+            first.ids, np.vstack([first.angles, second.angles]), first.rate_hz
+        )
+
+    weight = PROFILES[profile](np.arange(1, overlap + 1) / overlap)[:, None]
+    tail = first.angles[-overlap:]
+    head = second.angles[:overlap]
+    blended = (1.0 - weight) * tail + weight * head
+
+    angles = np.vstack([first.angles[:-overlap], blended, second.angles[overlap:]])
+    return Trajectory(first.ids, angles, first.rate_hz)
@@ -0,0 +1,119 @@
+# =============================================================================
+#  packet_encoder_benchmark.py
+#  Benchmark instruction packet encoding, list packets versus packet builder
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+import time
+
+from serial.serialutil import to_bytes
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from SCServo import *  # Uses SCServo library
+
+
+class NullPort:
+    """Port that discards packets after converting them like pyserial does."""
+
+    def __init__(self):
+        self.is_using = False
+
+    def clearPort(self):
+        pass
+
+    def writePort(self, packet):
+        return len(to_bytes(packet))
+
+
+def legacy_write(handler, scs_id, address, length, data):
+    txpacket = [0] * (length + 7)
+
+    txpacket[PKT_ID] = scs_id
+    txpacket[PKT_LENGTH] = length + 3
+    txpacket[PKT_INSTRUCTION] = INST_WRITE
+    txpacket[PKT_PARAMETER0] = address
+
+    txpacket[PKT_PARAMETER0 + 1 : PKT_PARAMETER0 + 1 + length] = data[0:length]
+
+    result = handler.txPacket(txpacket)
+    handler.portHandler.is_using = False
+    return result
+
+
+def legacy_sync_write(handler, start_address, data_length, param, param_length):
+    txpacket = [0] * (param_length + 8)
+
+    txpacket[PKT_ID] = BROADCAST_ID
+    txpacket[PKT_LENGTH] = param_length + 4
+    txpacket[PKT_INSTRUCTION] = INST_SYNC_WRITE
+    txpacket[PKT_PARAMETER0 + 0] = start_address
+    txpacket[PKT_PARAMETER0 + 1] = data_length
+
+    txpacket[PKT_PARAMETER0 + 2 : PKT_PARAMETER0 + 2 + param_length] = param[
+        0:param_length
+    ]
+
+    result = handler.txPacket(txpacket)
+    handler.portHandler.is_using = False
+    return result
+
+
+def builder_write(handler, scs_id, address, length, data):
+    return handler.writeTxOnly(scs_id, address, length, data)
+
+
+def builder_sync_write(handler, start_address, data_length, param, param_length):
+    result = handler.txPacket(
+        handler.txBuilder.buildSync(
+            INST_SYNC_WRITE, start_address, data_length, param, param_length
+        )
+    )
+    handler.portHandler.is_using = False
+    return result
+
+
+def measure(function, args, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function(*args)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    handler = protocol_packet_handler(NullPort(), 1)
+
+    # goal position of one servo and goal position, time and speed of all 8 servos
+    position = [0x02, 0x00]
+    param = []
+    for scs_id in range(1, 9):
+        param.extend([scs_id, 0x02, 0x00, 0x00, 0x00, 0x02, 0x67])
+
+    cases = [
+        ("write 2 bytes", legacy_write, builder_write, (handler, 1, 42, 2, position)),
+        (
+            "sync write 8x6 bytes",
+            legacy_sync_write,
+            builder_sync_write,
+            (handler, 42, 6, param, len(param)),
+        ),
+    ]
+
+    for name, legacy, builder, case_args in cases:
+        legacy_rate = measure(legacy, case_args, args.count)
+        builder_rate = measure(builder, case_args, args.count)
+        print(
+            f"{name:22s} list {legacy_rate:10.0f} packets/s  "
+            f"builder {builder_rate:10.0f} packets/s  x{builder_rate / legacy_rate:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# =============================================================================
+#  packet_parser_benchmark.py
+#  Benchmark status packet parsing on garbage-laden byte streams
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from SCServo import *  # Uses SCServo library
+
+
+class StreamPort:
+    """Minimal port that serves a prerecorded byte stream to rxPacket."""
+
+    def __init__(self, stream, chunk):
+        self.stream = stream
+        self.chunk = chunk
+        self.index = 0
+        self.is_using = False
+
+    def readPort(self, length):
+        # a read never returns more than one chunk, like a USB serial adapter
+        length = min(length, self.chunk)
+        data = self.stream[self.index : self.index + length]
+        self.index += len(data)
+        return data
+
+    def isPacketTimeout(self):
+        return self.index >= len(self.stream)
+
+    def getCurrentTime(self):
+        return time.monotonic() * 1000.0
+
+    def addRxTime(self, start_time):
+        pass
+
+
+def make_status_packet(scs_id, data):
+    packet = [0xFF, 0xFF, scs_id, len(data) + 2, 0] + list(data)
+    packet.append(~sum(packet[2:]) & 0xFF)
+    return bytes(packet)
+
+
+def make_stream(packets, garbage_ratio, seed):
+    rng = random.Random(seed)
+    stream = bytearray()
+    for i in range(packets):
+        garbage = int(rng.expovariate(1.0) * garbage_ratio * 8)
+        stream += bytes(
+            rng.choice((0x00, 0x55, 0xFF, rng.randrange(256))) for _ in range(garbage)
+        )
+        stream += make_status_packet(
+            1 + i % 8, (rng.randrange(256), rng.randrange(256))
+        )
+    return bytes(stream)
+
+
+def legacy_rx_packet(port):
+    """The list based rxPacket loop the parser replaced, kept for comparison."""
+    rxpacket = []
+
+    result = COMM_TX_FAIL
+    checksum = 0
+    rx_length = 0
+    wait_length = 6
+
+    while True:
+        rxpacket.extend(port.readPort(wait_length - rx_length))
+        rx_length = len(rxpacket)
+        if rx_length >= wait_length:
+            for idx in range(0, (rx_length - 1)):
+                if (rxpacket[idx] == 0xFF) and (rxpacket[idx + 1] == 0xFF):
+                    break
+
+            if idx == 0:
+                if (
+                    (rxpacket[PKT_ID] > 0xFD)
+                    or (rxpacket[PKT_LENGTH] > RXPACKET_MAX_LEN)
+                    or (rxpacket[PKT_ERROR] > 0x7F)
+                ):
+                    del rxpacket[0]
+                    rx_length -= 1
+                    continue
+
+                if wait_length != (rxpacket[PKT_LENGTH] + PKT_LENGTH + 1):
+                    wait_length = rxpacket[PKT_LENGTH] + PKT_LENGTH + 1
+                    continue
+
+                if rx_length < wait_length:
+                    if port.isPacketTimeout():
+                        result = COMM_RX_CORRUPT
+                        break
+                    else:
+                        continue
+
+                for i in range(2, wait_length - 1):
+                    checksum += rxpacket[i]
+                checksum = ~checksum & 0xFF
+
+                if rxpacket[wait_length - 1] == checksum:
+                    result = COMM_SUCCESS
+                else:
+                    result = COMM_RX_CORRUPT
+                break
+
+            else:
+                del rxpacket[0:idx]
+                rx_length -= idx
+
+        else:
+            if port.isPacketTimeout():
+                result = COMM_RX_TIMEOUT if rx_length == 0 else COMM_RX_CORRUPT
+                break
+
+    port.is_using = False
+    return rxpacket, result
+
+
+def run(name, rx_packet, stream):
+    packets = 0
+    start = time.perf_counter()
+    while True:
+        _, result = rx_packet()
+        if result == COMM_SUCCESS:
+            packets += 1
+        elif result == COMM_RX_TIMEOUT:
+            break
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:8s} {packets:7d} packets  {elapsed * 1000:9.1f} ms  "
+        f"{len(stream) / elapsed / 1e6:7.2f} MB/s  {packets / elapsed:10.0f} packets/s"
+    )
+    return packets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packets", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for garbage_ratio in (0, 1, 4, 16):
+        stream = make_stream(args.packets, garbage_ratio, args.seed)
+        print(f"garbage ratio {garbage_ratio}: {len(stream)} bytes")
+
+        port = StreamPort(stream, args.chunk)
+        run("legacy", lambda: legacy_rx_packet(port), stream)
+
+        handler = protocol_packet_handler(StreamPort(stream, args.chunk), 1)
+        run("parser", handler.rxPacket, stream)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# =============================================================================
+#  protocol_benchmark.py
+#  Throughput and latency of the SCServo protocol stack at every baud rate
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import serial
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from SCServo import *  # Uses SCServo library
+
+LOOPBACK_PORT = "loop://"
+SERVO_IDS = list(range(1, 9))
+
+
+class LoopbackPortHandler(PortHandler):
+    """PortHandler on pyserial's loop:// port, status packets are the echoed instructions."""
+
+    def setupPort(self, cflag_baud):
+        if self.is_open:
+            self.closePort()
+
+        self.ser = serial.serial_for_url(
+            LOOPBACK_PORT, baudrate=self.baudrate, timeout=0
+        )
+
+        self.is_open = True
+
+        self.ser.reset_input_buffer()
+
+        self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
+
+        return True
+
+    def clearPort(self):
+        # loop:// flush waits until the echo has been read, drop stale echoes instead
+        self.ser.reset_input_buffer()
+
+
+def open_port(port_name, blocking):
+    if port_name.startswith(EMULATOR_PORT_PREFIX):
+        port_handler = EmulatedPortHandler(port_name)
+    elif port_name == LOOPBACK_PORT:
+        port_handler = LoopbackPortHandler(port_name)
+    else:
+        port_handler = PortHandler(port_name)
+
+    port_handler.setBlocking(blocking)
+    if not port_handler.openPort():
+        raise ConnectionError(f"Failed to open port: {port_name}")
+    return port_handler
+
+
+def operations(packet_handler, scs_id):
+    group_sync_read = GroupSyncRead(packet_handler, SCSCL_PRESENT_POSITION_L, 2)
+    for servo_id in SERVO_IDS:
+        group_sync_read.addParam(servo_id)
+
+    param = []
+    for servo_id in SERVO_IDS:
+        param.extend([servo_id, 0x02, 0x00, 0x00, 0x00, 0x02, 0x00])
+
+    def write_tx_only():
+        # servos answer a WRITE to their own ID even when nobody reads the status
+        # packet, broadcast so that no stale status packets pile up on the port
+        result = packet_handler.writeTxOnly(
+            BROADCAST_ID, SCSCL_GOAL_POSITION_L, 2, [2, 0]
+        )
+        return result, 0
+
+    def sync_write_tx_only():
+        result = packet_handler.syncWriteTxOnly(
+            SCSCL_GOAL_POSITION_L, 6, param, len(param)
+        )
+        return result, 0
+
+    def group_sync_read_tx_rx():
+        return group_sync_read.txRxPacket(), 0
+
+    return {
+        "ping": lambda: packet_handler.ping(scs_id)[1:],
+        "read1ByteTxRx": lambda: packet_handler.read1ByteTxRx(scs_id, SCSCL_MOVING)[1:],
+        "read2ByteTxRx": lambda: packet_handler.read2ByteTxRx(
+            scs_id, SCSCL_PRESENT_POSITION_L
+        )[1:],
+        "writeTxRx": lambda: packet_handler.writeTxRx(
+            scs_id, SCSCL_GOAL_POSITION_L, 2, [2, 0]
+        ),
+        "writeTxOnly": write_tx_only,
+        "syncWriteTxOnly": sync_write_tx_only,
+        "GroupSyncRead.txRxPacket": group_sync_read_tx_rx,
+    }
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def measure(operation, count, max_time):
+    latencies = []
+    errors = 0
+
+    start = time.perf_counter()
+    while len(latencies) < count and time.perf_counter() - start < max_time:
+        begin = time.perf_counter()
+        result, _ = operation()
+        latencies.append(time.perf_counter() - begin)
+        if result != COMM_SUCCESS:
+            errors += 1
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "packets_per_s": len(latencies) / elapsed,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def run(args):
+    port_handler = open_port(args.port, args.blocking)
+    packet_handler = scscl(port_handler)
+    ops = operations(packet_handler, args.id)
+
+    results = []
+    for baudrate in args.baud:
+        if not port_handler.setBaudRate(baudrate):
+            print(f"Skipping unsupported baud rate {baudrate}")
+            continue
+
+        for name, operation in ops.items():
+            if args.operation and name not in args.operation:
+                continue
+
+            result = measure(operation, args.count, args.max_time)
+            port_handler.clearPort()
+            port_handler.ser.reset_input_buffer()
+            result["baudrate"] = baudrate
+            result["operation"] = name
+            results.append(result)
+
+            print(
+                f"{baudrate:8d} {name:25s} {result['packets_per_s']:9.0f} packets/s  "
+                f"p50 {result['p50_us']:9.1f} us  p99 {result['p99_us']:9.1f} us  "
+                f"errors {result['errors']}/{result['count']}"
+            )
+
+    port_handler.closePort()
+
+    return {
+        "port": args.port,
+        "blocking": args.blocking,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print regressions of current against baseline, return how many were found."""
+    baseline_results = {(r["baudrate"], r["operation"]): r for r in baseline["results"]}
+
+    regressions = 0
+    for result in current["results"]:
+        key = (result["baudrate"], result["operation"])
+        if key not in baseline_results:
+            continue
+        old = baseline_results[key]
+
+        checks = [
+            ("packets/s", old["packets_per_s"], result["packets_per_s"], -1),
+            ("p50", old["p50_us"], result["p50_us"], 1),
+            ("p99", old["p99_us"], result["p99_us"], 1),
+        ]
+        for metric, old_value, new_value, direction in checks:
+            if old_value <= 0:
+                continue
+            change = (new_value - old_value) / old_value * 100.0
+            if change * direction > threshold:
+                regressions += 1
+                print(
+                    f"REGRESSION {key[0]:8d} {key[1]:25s} {metric:9s} "
+                    f"{old_value:10.1f} -> {new_value:10.1f} ({change:+.1f}%)"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure packets/s and round trip latency of the SCServo package."
+    )
+    parser.add_argument(
+        "--port",
+        default=EMULATOR_PORT_PREFIX + str(len(SERVO_IDS)),
+        help="emulator://N, loop:// or a serial port. Real servos only answer at their own baud rate.",
+    )
+    parser.add_argument(
+        "--id", type=int, default=1, help="servo ID for single servo operations"
+    )
+    parser.add_argument("--baud", type=int, nargs="+", default=BAUDRATE_LIST)
+    parser.add_argument("--operation", nargs="+", help="only run these operations")
+    parser.add_argument(
+        "--count", type=int, default=500, help="iterations per operation"
+    )
+    parser.add_argument(
+        "--max-time", type=float, default=1.0, help="seconds per operation"
+    )
+    parser.add_argument(
+        "--blocking", action="store_true", help="wait on the port instead of polling"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON file of an earlier run to compare against"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="allowed change in percent"
+    )
+    args = parser.parse_args()
+
+    current = run(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        print(f"{regressions} regressions above {args.threshold}%")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,26 @@
 # =============================================================================
 #!/usr/bin/env python
 from http import client
+import contextlib
+import os
 import sys
 import time
 
 from ServoController.Scs0009Controller import Scs0009Controller
+from ServoController.ControlLoop import Histogram
 import asyncio
 import keyboard
 from colmi_ring.colmi_client import ColmiClient
+from colmi_ring.scanner import Scanner
+from colmi_ring.ring_process import RingProcess
+from signal_processing.interpolator import SampleInterpolator
+from signal_processing.filters import (
+    FilterPipeline,
+    Deadband,
+    OneEuroFilter,
+    RateLimiter,
+    Hysteresis,
+)
 
 # Find these values with fd.exe from feetech
 CENTER_DEFAULT = 511
@@ -49,12 +62,47 @@ SRVID_RING_R = 5
 SRVID_RING_L = 6
 SRVID_THUMB_R = 7
 SRVID_THUMB_L = 8
-
-DEVICENAME = "COM5"  # Set to correct port for your system
-
-controller = Scs0009Controller(DEVICENAME)
+SERVO_IDS = [
+    SRVID_INDEX_R,
+    SRVID_INDEX_L,
+    SRVID_MIDDLE_R,
+    SRVID_MIDDLE_L,
+    SRVID_RING_R,
+    SRVID_RING_L,
+    SRVID_THUMB_R,
+    SRVID_THUMB_L,
+]
+
+# Set to correct port for your system, BIONIC_HAND_PORT=emulator://8 runs without hardware
+DEVICENAME = os.environ.get("BIONIC_HAND_PORT", "COM5")
+
+controller = Scs0009Controller(DEVICENAME, servo_ids=SERVO_IDS)
 
 RING_ADDRESS = "32:31:47:36:08:07"  # Replace with your Colmi Ring's Bluetooth address
+# Rings found before are tried first, then the first ring advertising is used
+RING_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".colmi_rings.json"
+)
+KEYBOARD_POLL_TIME = 0.1  # seconds between checks of the stop key
+# True receives the ring samples in a separate process, so Bluetooth and servo
+# control cannot delay each other
+PROCESS_SPLIT = False
+
+# The ring sends raw sensor data once per second, the hand is updated at
+# CONTROL_RATE with values interpolated between the samples
+CONTROL_RATE = 50  # Hz
+INTERPOLATION_MODE = "extrapolate"  # "hold", "linear" or "extrapolate"
+INTERPOLATION_DELAY = 0.5  # seconds, more is smoother, less is quicker
+MAX_EXTRAPOLATION = 0.5  # seconds
+MAX_OVERSHOOT = 10  # percent
+
+# Conditioning of the interpolated value, all in percent closed
+REST_DEADBAND = 5  # ring tilts below this keep the hand open
+MIN_CUTOFF = 1.0  # Hz, One Euro smoothing when the ring is still
+CUTOFF_BETA = 0.05  # cutoff increase per %/s, less lag when moving fast
+MAX_CLOSING_RATE = 200  # percent per second
+HYSTERESIS = 1  # ignore the ring wobbling back and forth less than this
+EMIT_THRESHOLD = 0.5  # smaller changes are not sent to the servos
 
 
 async def main():
@@ -63,48 +111,157 @@ async def main():
     Add your initialization and control logic here.
     """
     print("Hold SPACE to stop")
+    start_time = time.perf_counter()
 
     open_hand()
-    client = ColmiClient(RING_ADDRESS)
+    if PROCESS_SPLIT:
+        client = RingProcess(RING_ADDRESS, RING_CACHE_FILE)
+    else:
+        ring = await Scanner().find_ring(RING_ADDRESS, RING_CACHE_FILE)
+        if ring is None:
+            return
+        client = ColmiClient(ring)
+    interpolator = SampleInterpolator(
+        INTERPOLATION_MODE, INTERPOLATION_DELAY, MAX_EXTRAPOLATION, MAX_OVERSHOOT
+    )
+    pipeline = FilterPipeline(
+        Deadband(REST_DEADBAND),
+        OneEuroFilter(MIN_CUTOFF, CUTOFF_BETA),
+        RateLimiter(MAX_CLOSING_RATE),
+        Hysteresis(HYSTERESIS),
+        emit_threshold=EMIT_THRESHOLD,
+    )
+    latency = Histogram()  # ms from ring notification to the next servo write
+    new_sample_times = []
 
     async with client:
+        samples = client.subscribe_accelerometer()
         await client.start_streaming()
+        control_task = asyncio.create_task(
+            control_hand(interpolator, pipeline, new_sample_times, latency)
+        )
+
+        try:
+            while True:
+                try:
+                    # react to every new sample, wake up regularly to check the keyboard
+                    sample = await asyncio.wait_for(samples.get(), KEYBOARD_POLL_TIME)
+                except asyncio.TimeoutError:
+                    sample = None
+
+                if sample is not None:
+                    if not interpolator.samples:
+                        startup = sample.timestamp - start_time
+                        print(f"First ring sample {startup:.2f} seconds after start")
+                    fist_closed_percent = ring_closed_percent(sample.x)
+                    print(f"Ring at {fist_closed_percent:.2f}%")
+                    interpolator.add_sample(sample.timestamp, fist_closed_percent)
+                    new_sample_times.append(sample.timestamp)
+
+                if control_task.done():
+                    # control_hand only returns by raising
+                    raise control_task.exception()
+
+                if keyboard.is_pressed(" "):  # Check if space key is pressed
+                    print("Space key pressed - stopping streaming")
+                    break
+        finally:
+            # wait until control_hand has stopped, so no servo write overlaps the shutdown
+            control_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await control_task
+        await client.stop_streaming()
+
+    stats = latency.to_dict()
+    print(
+        f"Notification to servo write: mean {stats['mean_ms']:.2f} ms, "
+        f"max {stats['max_ms']:.2f} ms, p99 {latency.percentile(0.99):.2f} ms "
+        f"over {latency.count} samples, {client.dropped_samples} dropped"
+    )
+    print(f"Sent {pipeline.emitted} of {pipeline.samples} hand targets")
 
-        while True:
-            x_abs = abs(client.accX)
-            if x_abs > 8192:
-                x_abs = 8192  # Clamp to max value
-
-            fist_closed_percent = x_abs / 81.92  # Scale to 0-100%
-            ring_controlled_hand(fist_closed_percent)
 
-            await asyncio.sleep(0.5)
+async def control_hand(interpolator, pipeline, new_sample_times, latency):
+    """
+    Move the hand to the interpolated and filtered ring position at CONTROL_RATE.
+    Nothing is sent while the filtered position stays within EMIT_THRESHOLD.
+    """
+    period = 1.0 / CONTROL_RATE
+    deadline = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        closed_percent = interpolator.value_at(now)
+        if closed_percent is not None:
+            closed_percent = pipeline.update(closed_percent, now)
+        if closed_percent is not None:
+            await ring_controlled_hand(closed_percent)
+
+            now = time.perf_counter()
+            for timestamp in new_sample_times:
+                latency.add((now - timestamp) * 1000.0)
+            new_sample_times.clear()
+
+        deadline += period
+        delay = deadline - time.perf_counter()
+        if delay < 0:
+            # overrun, skip the missed ticks
+            deadline -= delay // period * period
+            delay = deadline - time.perf_counter()
+        await asyncio.sleep(max(delay, 0))
+
+
+def ring_closed_percent(acc_x):
+    """
+    Map the accelerometer X axis of the ring to 0-100% closed.
+    """
+    x_abs = abs(acc_x)
+    if x_abs > 8192:
+        x_abs = 8192  # Clamp to max value
 
-            if keyboard.is_pressed(" "):  # Check if space key is pressed
-                print("Space key pressed - stopping streaming")
-                await client.stop_streaming()
-                break
+    return x_abs / 81.92  # Scale to 0-100%
 
 
-def ring_controlled_hand(closed_percent):
-    print(f"Closing hand to {closed_percent:.2f}%")
+async def ring_controlled_hand(closed_percent):
+    """
+    Close the fingers by closed_percent in one SYNC_WRITE on the asyncio bus,
+    so ring notifications keep arriving while the servos are written.
+    """
     speed = 50
-    move_index(
-        FINGER_MIN_R + (FINGER_MAX_R - FINGER_MIN_R) * closed_percent / 100,
-        FINGER_MAX_L - (FINGER_MAX_L - FINGER_MIN_L) * closed_percent / 100,
+    angle_r = FINGER_MIN_R + (FINGER_MAX_R - FINGER_MIN_R) * closed_percent / 100
+    angle_l = FINGER_MAX_L - (FINGER_MAX_L - FINGER_MIN_L) * closed_percent / 100
+    await controller.move_angles_async(
+        [
+            SRVID_INDEX_R,
+            SRVID_INDEX_L,
+            SRVID_MIDDLE_R,
+            SRVID_MIDDLE_L,
+            SRVID_RING_R,
+            SRVID_RING_L,
+            SRVID_THUMB_R,
+            SRVID_THUMB_L,
+        ],
+        [
+            angle_r,
+            angle_l,
+            angle_r,
+            angle_l,
+            angle_r,
+            angle_l,
+            THUMB_MIN_R + 20,
+            THUMB_MAX_L - 20,
+        ],
         speed,
+        [
+            INDEX_CENTER_R,
+            INDEX_CENTER_L,
+            MIDDLE_CENTER_R,
+            MIDDLE_CENTER_L,
+            RING_CENTER_R,
+            RING_CENTER_L,
+            THUMB_CENTER_R,
+            THUMB_CENTER_L,
+        ],
     )
-    move_middle(
-        FINGER_MIN_R + (FINGER_MAX_R - FINGER_MIN_R) * closed_percent / 100,
-        FINGER_MAX_L - (FINGER_MAX_L - FINGER_MIN_L) * closed_percent / 100,
-        speed,
-    )
-    move_ring(
-        FINGER_MIN_R + (FINGER_MAX_R - FINGER_MIN_R) * closed_percent / 100,
-        FINGER_MAX_L - (FINGER_MAX_L - FINGER_MIN_L) * closed_percent / 100,
-        speed,
-    )
-    move_thumb(THUMB_MIN_R + 20, THUMB_MAX_L - 20, speed)
 
 
 def open_hand():
@@ -142,10 +299,12 @@ def move_index(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_INDEX_R, speed)
-    controller.set_speed(SRVID_INDEX_L, speed)
-    controller.move_angle(SRVID_INDEX_R, angle_r, INDEX_CENTER_R)
-    controller.move_angle(SRVID_INDEX_L, angle_l, INDEX_CENTER_L)
+    controller.move_angles(
+        [SRVID_INDEX_R, SRVID_INDEX_L],
+        [angle_r, angle_l],
+        speed,
+        [INDEX_CENTER_R, INDEX_CENTER_L],
+    )
 
 
 def move_middle(angle_r, angle_l, speed):
@@ -160,10 +319,12 @@ def move_middle(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_MIDDLE_R, speed)
-    controller.set_speed(SRVID_MIDDLE_L, speed)
-    controller.move_angle(SRVID_MIDDLE_R, angle_r, MIDDLE_CENTER_R)
-    controller.move_angle(SRVID_MIDDLE_L, angle_l, MIDDLE_CENTER_L)
+    controller.move_angles(
+        [SRVID_MIDDLE_R, SRVID_MIDDLE_L],
+        [angle_r, angle_l],
+        speed,
+        [MIDDLE_CENTER_R, MIDDLE_CENTER_L],
+    )
 
 
 def move_ring(angle_r, angle_l, speed):
@@ -178,10 +339,12 @@ def move_ring(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_RING_R, speed)
-    controller.set_speed(SRVID_RING_L, speed)
-    controller.move_angle(SRVID_RING_R, angle_r, RING_CENTER_R)
-    controller.move_angle(SRVID_RING_L, angle_l, RING_CENTER_L)
+    controller.move_angles(
+        [SRVID_RING_R, SRVID_RING_L],
+        [angle_r, angle_l],
+        speed,
+        [RING_CENTER_R, RING_CENTER_L],
+    )
 
 
 def move_thumb(angle_r, angle_l, speed):
@@ -196,10 +359,12 @@ def move_thumb(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_THUMB_R, speed)
-    controller.set_speed(SRVID_THUMB_L, speed)
-    controller.move_angle(SRVID_THUMB_R, angle_r, THUMB_CENTER_R)
-    controller.move_angle(SRVID_THUMB_L, angle_l, THUMB_CENTER_L)
+    controller.move_angles(
+        [SRVID_THUMB_R, SRVID_THUMB_L],
+        [angle_r, angle_l],
+        speed,
+        [THUMB_CENTER_R, THUMB_CENTER_L],
+    )
 
 
 if __name__ == "__main__":
@@ -5,10 +5,12 @@
 #  Licensed under the MIT License.
 # =============================================================================
 #!/usr/bin/env python
+import os
 import sys
 import time
 
 from ServoController.Scs0009Controller import Scs0009Controller
+from ServoController.GestureLibrary import GestureLibrary
 
 # Find these values with fd.exe from feetech
 CENTER_DEFAULT = 511
@@ -46,9 +48,171 @@ SRVID_RING_L = 6
 SRVID_THUMB_R = 7
 SRVID_THUMB_L = 8
 
-DEVICENAME = "COM5"  # Set to correct port for your system
-
-controller = Scs0009Controller(DEVICENAME)
+SERVO_CENTERS = {
+    SRVID_INDEX_R: INDEX_CENTER_R,
+    SRVID_INDEX_L: INDEX_CENTER_L,
+    SRVID_MIDDLE_R: MIDDLE_CENTER_R,
+    SRVID_MIDDLE_L: MIDDLE_CENTER_L,
+    SRVID_RING_R: RING_CENTER_R,
+    SRVID_RING_L: RING_CENTER_L,
+    SRVID_THUMB_R: THUMB_CENTER_R,
+    SRVID_THUMB_L: THUMB_CENTER_L,
+}
+
+CONTROL_RATE = 100  # Hz, rate trajectories are streamed at
+GESTURE_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".gesture_cache"
+)
+
+
+def fingers(index=None, middle=None, ring=None, thumb=None):
+    """
+    Servo targets of a keyframe from (angle_r, angle_l) pairs per finger.
+    """
+    targets = {}
+    for pair, ids in [
+        (index, (SRVID_INDEX_R, SRVID_INDEX_L)),
+        (middle, (SRVID_MIDDLE_R, SRVID_MIDDLE_L)),
+        (ring, (SRVID_RING_R, SRVID_RING_L)),
+        (thumb, (SRVID_THUMB_R, SRVID_THUMB_L)),
+    ]:
+        if pair is not None:
+            targets[ids[0]] = pair[0]
+            targets[ids[1]] = pair[1]
+    return targets
+
+
+FINGER_OPEN = (FINGER_MIN_R, FINGER_MAX_L)
+FINGER_CLOSED = (FINGER_MAX_R, FINGER_MIN_L)
+THUMB_OPEN = (THUMB_MIN_R, THUMB_MAX_L)
+
+# Keyframes of every gesture, see ServoController/GestureLibrary.py
+GESTURES = {
+    "open_hand": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers(FINGER_OPEN, FINGER_OPEN, FINGER_OPEN, THUMB_OPEN),
+            },
+        ]
+    },
+    "close_hand": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers(FINGER_CLOSED, FINGER_CLOSED, FINGER_CLOSED),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(20, -20))},
+        ]
+    },
+    "point_index": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers(FINGER_OPEN, FINGER_CLOSED, FINGER_CLOSED),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(60, -60))},
+        ]
+    },
+    "no_no": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers(FINGER_OPEN, FINGER_CLOSED, FINGER_CLOSED),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(60, -60))},
+        ]
+        + [
+            {
+                "time": 1.5 + 0.3 * i,
+                "duration": 0.3,
+                "targets": fingers((0, 85) if i % 2 == 0 else (-85, 0)),
+            }
+            for i in range(6)
+        ]
+    },
+    "horns": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers((-20, 60), FINGER_CLOSED, (-60, 20)),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(60, -60))},
+        ]
+    },
+    "victory": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers((0, 85), (-85, 0), FINGER_CLOSED),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(60, -60))},
+        ]
+    },
+    "scissor": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers((-30, 50), (-50, 30), FINGER_CLOSED),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(60, -60))},
+        ]
+    },
+    "thumbs_up": {
+        "keyframes": [
+            {"time": 0.0, "speed": 30, "targets": fingers(thumb=THUMB_OPEN)},
+            {
+                "time": 0.5,
+                "speed": 30,
+                "targets": fingers(FINGER_CLOSED, FINGER_CLOSED, FINGER_CLOSED),
+            },
+        ]
+    },
+    "perfect": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers((35, -35), FINGER_OPEN, FINGER_OPEN, (15, -15)),
+            },
+        ]
+    },
+    "three": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers((-30, 50), (-50, 30), FINGER_CLOSED, (-40, -60)),
+            },
+        ]
+    },
+    "four": {
+        "keyframes": [
+            {
+                "time": 0.0,
+                "speed": 30,
+                "targets": fingers(FINGER_OPEN, FINGER_OPEN, FINGER_OPEN),
+            },
+            {"time": 0.5, "speed": 30, "targets": fingers(thumb=(-40, -60))},
+        ]
+    },
+}
+
+# Set to correct port for your system, BIONIC_HAND_PORT=emulator://8 runs without hardware
+DEVICENAME = os.environ.get("BIONIC_HAND_PORT", "COM5")
+
+controller = Scs0009Controller(DEVICENAME, servo_ids=list(SERVO_CENTERS))
+gesture_library = GestureLibrary(
+    controller, SERVO_CENTERS, GESTURE_CACHE_DIR, CONTROL_RATE
+)
+gesture_library.add_all(GESTURES)
 
 
 def main():
@@ -74,144 +238,77 @@ def open_hand():
     """
     Open all fingers
     """
-    speed = 30
-    move_index(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_middle(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_ring(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_thumb(THUMB_MIN_R, THUMB_MAX_L, speed)
+    gesture_library.play("open_hand")
 
 
 def close_hand():
     """
     Open all fingers
     """
-    speed = 30
-    move_index(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_middle(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    time.sleep(0.5)
-    move_thumb(20, -20, speed)
+    gesture_library.play("close_hand")
 
 
 def point_index():
     """
     Point with index finger
     """
-    speed = 30
-    move_index(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_middle(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    time.sleep(0.5)
-    move_thumb(60, -60, speed)
+    gesture_library.play("point_index")
 
 
 def no_no():
     """
     No no with index finger
     """
-    speed = 30
-    move_index(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_middle(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    time.sleep(0.5)
-    move_thumb(60, -60, speed)
-    time.sleep(1)
-
-    speed = 50
-    sleep_time = 0.3
-    move_index(0, 85, speed)
-    time.sleep(sleep_time)
-    move_index(-85, 0, speed)
-    time.sleep(sleep_time)
-    move_index(0, 85, speed)
-    time.sleep(sleep_time)
-    move_index(-85, 0, speed)
-    time.sleep(sleep_time)
-    move_index(0, 85, speed)
-    time.sleep(sleep_time)
-    move_index(-85, 0, speed)
+    gesture_library.play("no_no")
 
 
 def horns():
     """
     Horns
     """
-    speed = 30
-    move_index(-20, 60, speed)
-    move_middle(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_ring(-60, 20, speed)
-    time.sleep(0.5)
-    move_thumb(60, -60, speed)
+    gesture_library.play("horns")
 
 
 def victory():
     """
     Victory sign with index and middle finger
     """
-    speed = 30
-    move_index(0, 85, speed)
-    move_middle(-85, 0, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    time.sleep(0.5)
-    move_thumb(60, -60, speed)
+    gesture_library.play("victory")
 
 
 def scissor():
     """
     Scissor in rock paper scissors. Use open and close for paper and rock
     """
-    speed = 30
-    move_index(-30, 50, speed)
-    move_middle(-50, 30, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    time.sleep(0.5)
-    move_thumb(60, -60, speed)
+    gesture_library.play("scissor")
 
 
 def thumbs_up():
     """
     Thumbs up sign
     """
-    speed = 30
-    move_thumb(THUMB_MIN_R, THUMB_MAX_L, speed)
-    time.sleep(0.5)
-    move_index(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_middle(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
+    gesture_library.play("thumbs_up")
 
 
 def perfect():
     """
     Perfect sign
     """
-    speed = 30
-    move_index(35, -35, speed)
-    move_middle(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_ring(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_thumb(15, -15, speed)
+    gesture_library.play("perfect")
 
 
 def three():
     """
     Three
     """
-    speed = 30
-    move_index(-30, 50, speed)
-    move_middle(-50, 30, speed)
-    move_ring(FINGER_MAX_R, FINGER_MIN_L, speed)
-    move_thumb(-40, -60, speed)
+    gesture_library.play("three")
 
 
 def four():
     """
     Four
     """
-    speed = 30
-    move_index(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_middle(FINGER_MIN_R, FINGER_MAX_L, speed)
-    move_ring(FINGER_MIN_R, FINGER_MAX_L, speed)
-    time.sleep(0.5)
-    move_thumb(-40, -60, speed)
+    gesture_library.play("four")
 
 
 def move_index(angle_r, angle_l, speed):
@@ -226,10 +323,12 @@ def move_index(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_INDEX_R, speed)
-    controller.set_speed(SRVID_INDEX_L, speed)
-    controller.move_angle(SRVID_INDEX_R, angle_r, INDEX_CENTER_R)
-    controller.move_angle(SRVID_INDEX_L, angle_l, INDEX_CENTER_L)
+    controller.move_angles(
+        [SRVID_INDEX_R, SRVID_INDEX_L],
+        [angle_r, angle_l],
+        speed,
+        [INDEX_CENTER_R, INDEX_CENTER_L],
+    )
 
 
 def move_middle(angle_r, angle_l, speed):
@@ -244,10 +343,12 @@ def move_middle(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_MIDDLE_R, speed)
-    controller.set_speed(SRVID_MIDDLE_L, speed)
-    controller.move_angle(SRVID_MIDDLE_R, angle_r, MIDDLE_CENTER_R)
-    controller.move_angle(SRVID_MIDDLE_L, angle_l, MIDDLE_CENTER_L)
+    controller.move_angles(
+        [SRVID_MIDDLE_R, SRVID_MIDDLE_L],
+        [angle_r, angle_l],
+        speed,
+        [MIDDLE_CENTER_R, MIDDLE_CENTER_L],
+    )
 
 
 def move_ring(angle_r, angle_l, speed):
@@ -262,10 +363,12 @@ def move_ring(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_RING_R, speed)
-    controller.set_speed(SRVID_RING_L, speed)
-    controller.move_angle(SRVID_RING_R, angle_r, RING_CENTER_R)
-    controller.move_angle(SRVID_RING_L, angle_l, RING_CENTER_L)
+    controller.move_angles(
+        [SRVID_RING_R, SRVID_RING_L],
+        [angle_r, angle_l],
+        speed,
+        [RING_CENTER_R, RING_CENTER_L],
+    )
 
 
 def move_thumb(angle_r, angle_l, speed):
@@ -280,10 +383,12 @@ def move_thumb(angle_r, angle_l, speed):
     if speed < MIN_SPEED or speed > MAX_SPEED:
         raise ValueError(f"Speed must be between {MIN_SPEED} and {MAX_SPEED}")
 
-    controller.set_speed(SRVID_THUMB_R, speed)
-    controller.set_speed(SRVID_THUMB_L, speed)
-    controller.move_angle(SRVID_THUMB_R, angle_r, THUMB_CENTER_R)
-    controller.move_angle(SRVID_THUMB_L, angle_l, THUMB_CENTER_L)
+    controller.move_angles(
+        [SRVID_THUMB_R, SRVID_THUMB_L],
+        [angle_r, angle_l],
+        speed,
+        [THUMB_CENTER_R, THUMB_CENTER_L],
+    )
 
 
 if __name__ == "__main__":
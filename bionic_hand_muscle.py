@@ -1 +1,258 @@
-# to write
+# =============================================================================
+#  bionic_hand_muscle.py
+#  Controlling the bionic hand with a muscle sensor
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import os
+import time
+from collections import Counter, deque
+
+import keyboard
+
+from ServoController.BusWorker import BusWorker
+from ServoController.ControlLoop import ControlLoop, Histogram
+from muscle_sensor.ingester import SensorIngester, SensorProcess
+from muscle_sensor.emg_engine import EmgEngine
+from muscle_sensor.gesture_classifier import (
+    FeatureExtractor,
+    GestureClassifier,
+    save_recordings,
+)
+from signal_processing.filters import FilterPipeline, EmaFilter, RateLimiter
+
+# The hand, its limits and the gestures are set up in bionic_hand_gestures.py
+from bionic_hand_gestures import (
+    controller,
+    gesture_library,
+    SERVO_CENTERS,
+    FINGER_MIN_R,
+    FINGER_MAX_L,
+    FINGER_MAX_R,
+    FINGER_MIN_L,
+    THUMB_MIN_R,
+    THUMB_MAX_L,
+    SRVID_INDEX_R,
+    SRVID_INDEX_L,
+    SRVID_MIDDLE_R,
+    SRVID_MIDDLE_L,
+    SRVID_RING_R,
+    SRVID_RING_L,
+    SRVID_THUMB_R,
+    SRVID_THUMB_L,
+)
+
+# Arduino running hardware-test/arduinoemitter with the MyoWare RAW output on A0
+SENSOR_PORT = os.environ.get("MUSCLE_SENSOR_PORT", "COM3")
+SENSOR_CHANNELS = 2  # NUM_CHANNELS in arduinoemitter.ino
+EMG_CHANNEL = 0
+SAMPLE_RATE = 1000  # Hz, SAMPLE_RATE in arduinoemitter.ino
+# True reads the sensor in a separate process, so reading and servo control
+# cannot delay each other
+PROCESS_SPLIT = False
+
+CALIBRATION_TIME = 3.0  # seconds to record rest and maximum contraction
+# "proportional" closes as far as you squeeze, "grip" opens or closes fully,
+# "gestures" plays the gesture recognized by a classifier trained on your arm
+CONTROL_MODE = "proportional"
+CONTROL_RATE = 50  # Hz
+SPEED = 100
+CLOSING_RATE = 300  # percent per second
+EMIT_THRESHOLD = 1  # percent, smaller changes are not sent to the servos
+
+# Gesture recognition, delete GESTURE_MODEL_FILE to train again
+TRAINED_GESTURES = ["open_hand", "close_hand", "point_index", "victory", "horns"]
+TRAINING_TIME = 4.0  # seconds per recording
+TRAINING_REPETITIONS = 2
+GESTURE_VOTES = 5  # windows that must agree before a gesture is played
+GESTURE_MODEL_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".emg_gesture_model.npz"
+)
+GESTURE_RECORDINGS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".emg_gesture_recordings.npz"
+)
+
+
+def main():
+    """
+    Main entry point for controlling the bionic hand.
+    Calibrate the muscle sensor or train the gesture classifier, then control
+    the hand with it.
+    """
+    engine = EmgEngine(SAMPLE_RATE, SENSOR_CHANNELS)
+    extractor = FeatureExtractor(SAMPLE_RATE, SENSOR_CHANNELS)
+    classify_time = Histogram()  # ms to extract features and classify a block
+    pipeline = FilterPipeline(
+        EmaFilter(0.3), RateLimiter(CLOSING_RATE), emit_threshold=EMIT_THRESHOLD
+    )
+
+    ingester_type = SensorProcess if PROCESS_SPLIT else SensorIngester
+    with ingester_type(SENSOR_PORT, SENSOR_CHANNELS) as ingester:
+        open_hand()
+        if CONTROL_MODE == "gestures":
+            classifier = gesture_classifier(ingester, extractor)
+        else:
+            calibrate(ingester, engine)
+        print("Hold SPACE to stop")
+
+        count = ingester.count
+        loop = ControlLoop(CONTROL_RATE, send_pose)
+        votes = deque(maxlen=GESTURE_VOTES)
+        gesture = "open_hand"
+        # gestures play on the worker thread, so the loop keeps its rate meanwhile
+        worker = BusWorker(controller, SERVO_CENTERS, SPEED)
+        playback = None  # Future of the gesture being played
+
+        def muscle_controlled_hand(tick_time, dt):
+            nonlocal count, gesture, playback
+            if keyboard.is_pressed(" "):  # Check if space key is pressed
+                loop.stop()
+                return None
+
+            # process every sample received since the last tick
+            count, timestamps, samples = ingester.samples_since(count)
+            if len(samples) == 0:
+                return None
+
+            if CONTROL_MODE == "gestures":
+                if playback is not None:
+                    if not playback.done():
+                        return None  # no new decisions while a gesture plays
+                    playback.result()  # raises if playing failed
+                    playback = None
+                    # start over with the samples after the gesture
+                    extractor.reset()
+                    votes.clear()
+                    return None
+
+                start = time.perf_counter()
+                features = extractor.process(samples)
+                if len(features):
+                    votes.extend(classifier.predict(features))
+                    classify_time.add((time.perf_counter() - start) * 1000.0)
+                recognized, agreeing = (
+                    Counter(votes).most_common(1)[0] if votes else (None, 0)
+                )
+                if agreeing == GESTURE_VOTES and recognized != gesture:
+                    gesture = recognized
+                    print(f"Recognized {gesture}")
+                    playback = worker.call(play_gesture, gesture)
+                return None
+
+            result = engine.process(samples)
+            if CONTROL_MODE == "grip":
+                closed_percent = 100.0 if result.grip[-1, EMG_CHANNEL] else 0.0
+            else:
+                closed_percent = 100.0 * result.activation[-1, EMG_CHANNEL]
+
+            closed_percent = pipeline.update(closed_percent, tick_time)
+            if closed_percent is None:
+                return None
+            return hand_pose(closed_percent)
+
+        loop.add_callback(muscle_controlled_hand)
+        if CONTROL_MODE == "gestures":
+            worker.start()
+        try:
+            loop.run()
+        finally:
+            if playback is not None:
+                playback.exception()  # let the gesture finish
+            worker.stop()
+
+        if CONTROL_MODE == "gestures":
+            stats = classify_time.to_dict()
+            print(
+                f"Classification: mean {stats['mean_ms']:.2f} ms, "
+                f"max {stats['max_ms']:.2f} ms per block"
+            )
+        else:
+            print(f"Sent {pipeline.emitted} of {pipeline.samples} hand targets")
+        print(f"Sensor: {ingester.get_stats()}")
+        print(f"Control loop: jitter p99 {loop.get_stats()['jitter_p99_ms']} ms")
+
+
+def calibrate(ingester, engine):
+    """
+    Record the envelope while relaxed and while squeezing as hard as possible.
+    """
+    envelopes = []
+    for instruction in ("Relax your arm", "Squeeze as hard as you can"):
+        print(f"{instruction} for {CALIBRATION_TIME:.0f} seconds")
+        time.sleep(1.0)  # time to react
+        count = ingester.count
+        time.sleep(CALIBRATION_TIME)
+        _, _, samples = ingester.samples_since(count)
+        envelopes.append(engine.envelope(samples))
+
+    engine.calibrate(*envelopes)
+    engine.reset()
+    print(f"Rest level {engine.rest}, maximum {engine.max}")
+
+
+def gesture_classifier(ingester, extractor):
+    """
+    Load the trained gesture classifier, or train one by recording each gesture.
+    """
+    if os.path.exists(GESTURE_MODEL_FILE):
+        classifier = GestureClassifier.load(GESTURE_MODEL_FILE)
+        print(f"Loaded classifier for {', '.join(classifier.labels)}")
+        return classifier
+
+    recordings = {}
+    for repetition in range(TRAINING_REPETITIONS):
+        for gesture in TRAINED_GESTURES:
+            print(f"Make the {gesture} gesture for {TRAINING_TIME:.0f} seconds")
+            gesture_library.play(gesture)  # show which gesture to make
+            time.sleep(1.0)  # time to react
+            count = ingester.count
+            time.sleep(TRAINING_TIME)
+            _, _, samples = ingester.samples_since(count)
+            recordings.setdefault(gesture, []).append(samples.copy())
+    open_hand()
+
+    save_recordings(GESTURE_RECORDINGS_FILE, recordings)
+    classifier = GestureClassifier().fit_recordings(extractor, recordings)
+    classifier.save(GESTURE_MODEL_FILE)
+    return classifier
+
+
+def hand_pose(closed_percent):
+    """
+    Angles of the fingers closed by closed_percent, the thumb stays put.
+    """
+    angle_r = FINGER_MIN_R + (FINGER_MAX_R - FINGER_MIN_R) * closed_percent / 100
+    angle_l = FINGER_MAX_L - (FINGER_MAX_L - FINGER_MIN_L) * closed_percent / 100
+    return {
+        SRVID_INDEX_R: angle_r,
+        SRVID_INDEX_L: angle_l,
+        SRVID_MIDDLE_R: angle_r,
+        SRVID_MIDDLE_L: angle_l,
+        SRVID_RING_R: angle_r,
+        SRVID_RING_L: angle_l,
+        SRVID_THUMB_R: THUMB_MIN_R + 20,
+        SRVID_THUMB_L: THUMB_MAX_L - 20,
+    }
+
+
+def send_pose(pose):
+    ids = list(pose)
+    controller.move_angles(
+        ids, list(pose.values()), SPEED, [SERVO_CENTERS[id] for id in ids]
+    )
+
+
+def play_gesture(controller, gesture):
+    gesture_library.play(gesture)
+
+
+def open_hand():
+    """
+    Open all fingers
+    """
+    send_pose(hand_pose(0))
+
+
+if __name__ == "__main__":
+    main()
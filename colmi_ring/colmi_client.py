@@ -11,11 +11,16 @@
 # =============================================================================
 import logging
 import asyncio
+import time
+from collections import namedtuple
 from bleak import BleakClient
 from bleak.backends.characteristic import BleakGATTCharacteristic
+from bleak.backends.device import BLEDevice
 from types import TracebackType
 import struct
 
+from signal_processing.sample_ring import SampleRing
+
 # UUIDs for MAIN and RXTX services and characteristics
 MAIN_SERVICE_UUID = "de5bf728-d711-4e47-af26-65e3012a5dc7"
 MAIN_WRITE_CHARACTERISTIC_UUID = "de5bf72a-d711-4e47-af26-65e3012a5dc7"
@@ -35,9 +40,7 @@ def create_command(hex_string):
 
 
 # Other versions of this rings seems to use 12 bit format but looks like Colmi R12 uses 16 bit signed integers
-def decode_accelerometer(packet: bytes):
-    x, y, z = struct.unpack(">hhh", packet[2:8])
-    return x, y, z
+ACCELEROMETER_STRUCT = struct.Struct(">hhh")
 
 
 # Commands
@@ -49,18 +52,52 @@ CMD_ENABLE_RAW_SENSOR = create_command("a104")
 # Disable raw sensor for my Colmi R12 is different from most documentation that claims this should be a102
 CMD_DISABLE_RAW_SENSOR = create_command("a105")
 
+# Packet types and sub types
+PACKET_BATTERY = 0x03
+PACKET_RAW_SENSOR = 0xA1
+RAW_SENSOR_ACCELEROMETER = 0x03
+
+ACCELEROMETER_RING_SIZE = 1024  # samples kept in ColmiClient.accelerometer
+
+CONNECT_TIMEOUT = 30.0  # seconds
+READY_TIMEOUT = 2.0  # seconds to wait for the ring to answer after connecting
+
 logger = logging.getLogger(__name__)
 
+# timestamp is time.perf_counter() when the notification was received
+AccelerometerSample = namedtuple("AccelerometerSample", ["timestamp", "x", "y", "z"])
 
-class ColmiClient:
-    accX: int = 0
-    accY: int = 0
-    accZ: int = 0
 
-    def __init__(self, address: str):
-        self.address = address
-        self.bleak_client = BleakClient(self.address)
+class ColmiClient:
+    def __init__(
+        self, address: str | BLEDevice, connect_timeout: float = CONNECT_TIMEOUT
+    ):
+        """
+        Args:
+            address (str | BLEDevice): Bluetooth address of the ring, or the device found by
+                Scanner.find_ring() which connects without scanning for it again.
+            connect_timeout (float): Seconds to try connecting.
+        """
+        self.address = address.address if isinstance(address, BLEDevice) else address
+        self.bleak_client = BleakClient(address)
+        self.connect_timeout = connect_timeout
+        self.battery_level = None
         self.battery_queue = asyncio.Queue()
+        self.accelerometer_queues = []
+        self.dropped_samples = 0
+
+        # newest accelerometer values and when they arrived, older ones in the ring
+        self.accX = 0
+        self.accY = 0
+        self.accZ = 0
+        self.acc_timestamp = 0.0
+        self.accelerometer = SampleRing(ACCELEROMETER_RING_SIZE, 3)
+
+        # packet type: handler(packet, timestamp)
+        self.handlers = {
+            PACKET_BATTERY: self.handle_battery,
+            PACKET_RAW_SENSOR: self.handle_raw_sensor,
+        }
 
         logger.info(f"Created client for {self.address}")
 
@@ -82,7 +119,7 @@ class ColmiClient:
         await self.disconnect()
 
     async def connect(self):
-        await self.bleak_client.connect(timeout=30.0)
+        await self.bleak_client.connect(timeout=self.connect_timeout)
 
         await self.bleak_client.start_notify(
             MAIN_NOTIFY_CHARACTERISTIC_UUID, self.handle_notification
@@ -90,7 +127,19 @@ class ColmiClient:
         await self.bleak_client.start_notify(
             RXTX_NOTIFY_CHARACTERISTIC_UUID, self.handle_notification
         )
-        await asyncio.sleep(2)  # Ensure notifications are set up
+        await self.wait_ready()
+
+    async def wait_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """
+        Wait until the ring answers a battery request, proving commands and
+        notifications both work. Returns False if it did not answer in time.
+        """
+        try:
+            await asyncio.wait_for(self.get_battery_level(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Ring did not answer within {timeout} seconds")
+            return False
 
     async def disconnect(self):
         await self.bleak_client.disconnect()
@@ -113,29 +162,62 @@ class ColmiClient:
         self, _: BleakGATTCharacteristic, packet: bytearray
     ) -> None:
         """Bleak callback that handles new packets from the ring."""
-        logger.info(f"Received packet {packet}")
-        packet_type = packet[0]
-        packet_sub_type = packet[1]
-
-        logger.info(f"Packet: {packet_type} - {packet_sub_type}")
-
-        if packet_type == 0x03:
-            battery_level = packet[1]
-            self.battery_queue.put_nowait(battery_level)
-
-        # get accelerometer values
-        if packet_type == 0xA1 and packet_sub_type == 0x03:
-            logger.info(f"Accelerometer packet: {packet}")
-            self.accX, self.accY, self.accZ = decode_accelerometer(packet)
-
-            logger.info(
-                f"Accelerometer - X: {self.accX}, Y: {self.accY}, Z: {self.accZ}"
-            )
+        timestamp = time.perf_counter()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received packet %s", packet.hex())
+
+        handler = self.handlers.get(packet[0])
+        if handler is not None:
+            handler(packet, timestamp)
+
+    def handle_battery(self, packet: bytearray, timestamp: float) -> None:
+        self.battery_queue.put_nowait(packet[1])
+
+    def handle_raw_sensor(self, packet: bytearray, timestamp: float) -> None:
+        if packet[1] != RAW_SENSOR_ACCELEROMETER:
+            return
+
+        x, y, z = ACCELEROMETER_STRUCT.unpack_from(packet, 2)
+        self.accX, self.accY, self.accZ = x, y, z
+        self.acc_timestamp = timestamp
+        self.accelerometer.append(timestamp, x, y, z)
+        if self.accelerometer_queues:
+            self.publish_accelerometer(AccelerometerSample(timestamp, x, y, z))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Accelerometer - X: %d, Y: %d, Z: %d", x, y, z)
+
+    def subscribe_accelerometer(self, maxsize: int = 1) -> asyncio.Queue:
+        """Queue receiving every new AccelerometerSample, the oldest is dropped when full."""
+        queue = asyncio.Queue(maxsize)
+        self.accelerometer_queues.append(queue)
+        return queue
+
+    def unsubscribe_accelerometer(self, queue: asyncio.Queue):
+        self.accelerometer_queues.remove(queue)
+
+    async def accelerometer_samples(self, maxsize: int = 1):
+        """Async iterator over new accelerometer samples as they arrive."""
+        queue = self.subscribe_accelerometer(maxsize)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe_accelerometer(queue)
+
+    def publish_accelerometer(self, sample: AccelerometerSample):
+        for queue in self.accelerometer_queues:
+            if queue.full():
+                # a slow consumer only cares about the newest sample
+                queue.get_nowait()
+                self.dropped_samples += 1
+            queue.put_nowait(sample)
 
     async def get_battery_level(self) -> int:
         """Get the battery level from the Colmi Ring."""
         await self.send_data_array(CMD_BATTERY, "RXTX")
         battery_level = await self.battery_queue.get()
+        self.battery_level = battery_level
         logger.info(f"Battery level: {battery_level}%")
 
         return battery_level
@@ -0,0 +1,117 @@
+# =============================================================================
+#  ring_process.py
+#  Streams the Colmi ring accelerometer from a separate process.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import asyncio
+import logging
+
+import numpy as np
+
+from colmi_ring.colmi_client import AccelerometerSample, ColmiClient
+from colmi_ring.scanner import Scanner
+from signal_processing.shared_ring import (
+    RingWriterProcess,
+    SharedSampleRing,
+    run_writer,
+)
+
+RING_POLL_TIME = 0.002  # seconds between checks for new samples
+STOP_POLL_TIME = 0.1  # seconds between checks if the process should stop
+
+logger = logging.getLogger(__name__)
+
+
+class RingProcess:
+    """
+    Connects to the ring and receives its samples in a separate process.
+
+    Bluetooth callbacks then run in their own interpreter and cannot delay
+    the control loop, or be delayed by it. Samples are passed through a
+    SharedSampleRing. The async methods match the part of ColmiClient used
+    by bionic_hand_colmi_ring.py, so it can use either.
+    """
+
+    def __init__(self, address: str = None, cache_file: str = None, capacity=1024):
+        """
+        Initialize the RingProcess.
+
+        Args:
+            address (str): Bluetooth address of the ring, see Scanner.find_ring().
+            cache_file (str): JSON file with known ring addresses.
+            capacity (int): Samples kept in the shared ring.
+        """
+        self.ring = SharedSampleRing(None, capacity, 3, np.int16)
+        self.process = RingWriterProcess(
+            "colmi_ring.ring_process", self.ring, address=address, cache_file=cache_file
+        )
+        self.read_count = 0
+        self.dropped_samples = 0
+
+    async def __aenter__(self) -> "RingProcess":
+        self.process.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await asyncio.to_thread(self.process.stop)
+        self.ring.close()
+
+    def subscribe_accelerometer(self) -> "RingProcess":
+        """Returns self, get() waits for the next sample like the ColmiClient queue."""
+        return self
+
+    async def get(self) -> AccelerometerSample:
+        """
+        Wait for a new sample, older samples not read yet are dropped and counted.
+
+        Only the newest sample is read, straight from the views into the
+        shared memory, and taken again if the writer overwrote it meanwhile.
+        """
+        while True:
+            count, missed, timestamps, samples = self.ring.samples_since(
+                self.read_count
+            )
+            if len(timestamps):
+                timestamp = float(timestamps[-1])
+                x, y, z = samples[-1].tolist()
+                if not self.ring.intact(count - 1):
+                    continue
+                self.dropped_samples += missed + len(timestamps) - 1
+                self.read_count = count
+                return AccelerometerSample(timestamp, x, y, z)
+            if not self.process.is_alive():
+                raise RuntimeError("Ring process stopped")
+            await asyncio.sleep(RING_POLL_TIME)
+
+    async def start_streaming(self):
+        pass  # the process streams from connecting until it is stopped
+
+    async def stop_streaming(self):
+        pass
+
+
+async def _stream(ring, stop_event, address, cache_file):
+    device = await Scanner().find_ring(address, cache_file)
+    if device is None:
+        return
+
+    async with ColmiClient(device) as client:
+        samples = client.subscribe_accelerometer(maxsize=16)
+        await client.start_streaming()
+        while not stop_event.is_set():
+            try:
+                sample = await asyncio.wait_for(samples.get(), STOP_POLL_TIME)
+            except asyncio.TimeoutError:
+                continue
+            ring.write([sample.timestamp], [[sample.x, sample.y, sample.z]])
+        await client.stop_streaming()
+
+
+def _run(ring, stop_event, address, cache_file):
+    """Body of the process started by RingProcess."""
+    asyncio.run(_stream(ring, stop_event, address, cache_file))
+
+
+if __name__ == "__main__":
+    run_writer(_run)
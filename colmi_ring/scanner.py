@@ -9,23 +9,115 @@
 # =============================================================================
 import logging
 import asyncio
+import json
+import os
 from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
 
 logger = logging.getLogger(__name__)
 
+RING_NAME_PREFIX = "COLMI"
+SCAN_TIMEOUT = 10.0  # seconds to look for any ring
+CACHED_RING_TIMEOUT = 3.0  # seconds to look for a known ring before scanning
+
+
+def is_colmi_ring(device: BLEDevice, advertisement_data=None) -> bool:
+    name = device.name
+    if advertisement_data is not None and advertisement_data.local_name:
+        name = advertisement_data.local_name
+    return name is not None and name.startswith(RING_NAME_PREFIX)
+
+
+def load_known_rings(cache_file: str) -> list:
+    """Addresses of rings found before, most recent first."""
+    try:
+        with open(cache_file) as f:
+            return json.load(f).get("addresses", [])
+    except (OSError, ValueError):
+        return []
+
+
+def save_known_ring(cache_file: str, address: str):
+    addresses = [address] + [a for a in load_known_rings(cache_file) if a != address]
+    try:
+        with open(cache_file, "w") as f:
+            json.dump({"addresses": addresses}, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not save ring address to {cache_file}: {e}")
+
 
 class Scanner:
-    async def scan(self):
-        """Scan for available Colmi Rings. Need to scan for 10 seconds to ensure it finds it."""
-        found_devices = 0
-        devices = await BleakScanner.discover(timeout=10.0)
+    async def scan(self, timeout: float = SCAN_TIMEOUT, stop_at_first: bool = False):
+        """
+        Scan for available Colmi Rings and print them as they are found.
+
+        Args:
+            timeout (float): Seconds to scan for.
+            stop_at_first (bool): Return as soon as one ring has advertised.
+
+        Returns:
+            list[BLEDevice]: Rings found, in the order they were seen.
+        """
+        found = {}
+        first_found = asyncio.Event()
 
-        for d in devices:
-            if d.name is not None and d.name.startswith("COLMI"):
-                found_devices += 1
-                print(f"{d.name} - {d.address}")
+        def detection_callback(device, advertisement_data):
+            if device.address in found or not is_colmi_ring(device, advertisement_data):
+                return
+            found[device.address] = device
+            print(f"{advertisement_data.local_name or device.name} - {device.address}")
+            if stop_at_first:
+                first_found.set()
 
-        if found_devices == 0:
+        async with BleakScanner(detection_callback):
+            try:
+                await asyncio.wait_for(first_found.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        if not found:
             print(
                 "No Colmi ring found. Make sure ring is not connected to another device."
             )
+        return list(found.values())
+
+    async def find_ring(
+        self,
+        address: str = None,
+        cache_file: str = None,
+        timeout: float = SCAN_TIMEOUT,
+    ):
+        """
+        Find a ring to connect to, as fast as possible.
+
+        The given address and the rings in cache_file are tried first, each
+        lookup returns at the first advertisement of that ring. Only when none
+        of them is seen, all rings are scanned for and the first one is used.
+        The ring found is saved to cache_file.
+
+        Args:
+            address (str): Bluetooth address of the ring, None to use the cache or scan.
+            cache_file (str): JSON file with known ring addresses, None for no cache.
+            timeout (float): Seconds to scan for any ring.
+
+        Returns:
+            BLEDevice | None: The ring, can be passed directly to ColmiClient.
+        """
+        known = [address] if address else []
+        if cache_file:
+            known += [a for a in load_known_rings(cache_file) if a != address]
+
+        for known_address in known:
+            device = await BleakScanner.find_device_by_address(
+                known_address, timeout=CACHED_RING_TIMEOUT
+            )
+            if device is not None:
+                logger.info(f"Found known ring {known_address}")
+                break
+        else:
+            devices = await self.scan(timeout, stop_at_first=True)
+            device = devices[0] if devices else None
+
+        if device is not None and cache_file:
+            save_known_ring(cache_file, device.address)
+        return device
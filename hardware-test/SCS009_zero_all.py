@@ -21,6 +21,7 @@ controller = Scs0009Controller(DEVICENAME)
 
 degree = 0
 
-controller.set_speed(id, 50)  # Set speed to 10%
-
-controller.move_angle(id, degree)
+# speed and position go out together in one write
+with controller.batch():
+    controller.set_speed(id, 50)  # Set speed to 10%
+    controller.move_angle(id, degree)
@@ -1,15 +1,25 @@
-import serial
+# =============================================================================
+#  arduino_receiver.py
+#  Test receiving sample frames from arduinoemitter.ino
+#  Copyright (c) 2025 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+#!/usr/bin/env python
+import sys
+import time
 
-SERIALPORT = "COM3"
-serial_port = serial.Serial(SERIALPORT, 9600, timeout=1)
-
-value_int = 0
+sys.path.append("..")
+from muscle_sensor.ingester import SensorIngester
 
-while True:
-    value_str = serial_port.readline().decode("utf-8").rstrip()
-    try:
-        value_int = int(value_str)
-    except Exception as err:
-        print(f"Unexpected {err=}, {type(err)=}")
+SERIALPORT = "COM3"
+NUM_CHANNELS = 2  # NUM_CHANNELS in arduinoemitter.ino
 
-    print(value_int)
+with SensorIngester(SERIALPORT, NUM_CHANNELS) as ingester:
+    count = 0
+    while True:
+        # the ingester keeps reading while this thread is busy or sleeping
+        time.sleep(1.0)
+        previous = count
+        count, timestamps, samples = ingester.samples_since(count)
+        last = samples[-1].tolist() if len(samples) else "-"
+        print(f"{count - previous} samples/s, last {last}, {ingester.get_stats()}")
@@ -1,27 +1,106 @@
 /*=============================================================================
 arduinoemitter.ino
-Send a stream of serial numbers from Arduino to a connected computer
+Send timestamped analog samples from Arduino to a connected computer
 Copyright(c) 2025 Jakob Leander
 Licensed under the MIT License.
+
+Every sample period one frame is sent, all values little endian:
+  uint16 sequence, uint32 micros(), uint16 sample per channel,
+  uint16 CRC-16/CCITT-FALSE of the bytes before it
+The frame is COBS encoded and ended with a 0 byte, so a receiver can find
+the start of the next frame after lost bytes. Decoded by
+muscle_sensor/frame_decoder.py
 =============================================================================*/
-int x;
+#define BAUD_RATE 500000     // 0% error on a 16 MHz Arduino
+#define SAMPLE_RATE 1000     // Hz
+#define NUM_CHANNELS 2       // analog pins A0, A1, ...
+#define TEST_PATTERN 0       // 1 sends a counter instead of analog readings
+
+#define PAYLOAD_SIZE (2 + 4 + 2 * NUM_CHANNELS + 2)
+
+const unsigned long samplePeriod = 1000000UL / SAMPLE_RATE;
+unsigned long nextSample;
+uint16_t sequence;
+
+uint16_t crc16(const uint8_t *data, uint8_t length)
+{
+    uint16_t crc = 0xFFFF;
+    while (length--)
+    {
+        crc ^= (uint16_t)(*data++) << 8;
+        for (uint8_t bit = 0; bit < 8; bit++)
+        {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+    return crc;
+}
+
+// Writes length + 1 bytes to out, none of them 0. Length must be below 254
+void cobsEncode(const uint8_t *data, uint8_t length, uint8_t *out)
+{
+    uint8_t codeIndex = 0;
+    uint8_t outIndex = 1;
+    uint8_t code = 1;
+    for (uint8_t i = 0; i < length; i++)
+    {
+        if (data[i] == 0)
+        {
+            out[codeIndex] = code;
+            codeIndex = outIndex++;
+            code = 1;
+        }
+        else
+        {
+            out[outIndex++] = data[i];
+            code++;
+        }
+    }
+    out[codeIndex] = code;
+}
+
+void putWord(uint8_t *data, uint16_t value)
+{
+    data[0] = value & 0xFF;
+    data[1] = value >> 8;
+}
 
 void setup()
 {
-    x = 0;
-    Serial.begin(9600);
+    sequence = 0;
+    Serial.begin(BAUD_RATE);
+    nextSample = micros();
 }
 
 void loop()
 {
-    Serial.println(x);
+    uint8_t payload[PAYLOAD_SIZE];
+    uint8_t frame[PAYLOAD_SIZE + 2];
 
-    x++;
+    // wait for the next sample time, the timestamp is when it was taken
+    while ((long)(micros() - nextSample) < 0)
+    {
+    }
+    unsigned long timestamp = micros();
+    nextSample += samplePeriod;
 
-    if (x > 255)
+    putWord(payload, sequence);
+    putWord(payload + 2, timestamp & 0xFFFF);
+    putWord(payload + 4, timestamp >> 16);
+    for (uint8_t channel = 0; channel < NUM_CHANNELS; channel++)
     {
-        x = 0;
+#if TEST_PATTERN
+        uint16_t sample = (sequence + channel) & 0x3FF;
+#else
+        uint16_t sample = analogRead(A0 + channel);
+#endif
+        putWord(payload + 6 + 2 * channel, sample);
     }
+    putWord(payload + PAYLOAD_SIZE - 2, crc16(payload, PAYLOAD_SIZE - 2));
 
-    delay(10);
-}
\ No newline at end of file
+    cobsEncode(payload, PAYLOAD_SIZE, frame);
+    frame[PAYLOAD_SIZE + 1] = 0;
+    Serial.write(frame, sizeof(frame));
+
+    sequence++;
+}
@@ -0,0 +1,179 @@
+# =============================================================================
+#  emg_engine.py
+#  Turns blocks of raw EMG samples into muscle activation and grip intent.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+from collections import namedtuple
+
+import numpy as np
+
+ENVELOPES = ("rms", "mav")
+
+# envelope, activation (0-1) and grip (bool), all (samples, channels) arrays
+EmgResult = namedtuple("EmgResult", ["envelope", "activation", "grip"])
+
+
+def bandpass_taps(low: float, high: float, rate: float, taps: int = 63) -> np.ndarray:
+    """
+    Windowed sinc FIR band-pass from low to high Hz, high at or above
+    Nyquist gives a high-pass. taps must be odd.
+    """
+    n = np.arange(taps) - (taps - 1) / 2
+    if high < rate / 2:
+        kernel = 2 * high / rate * np.sinc(2 * high / rate * n)
+    else:
+        kernel = (n == 0).astype(np.float64)
+    kernel = kernel - 2 * low / rate * np.sinc(2 * low / rate * n)
+    return kernel * np.hamming(taps)
+
+
+class EmgEngine:
+    """
+    Incremental EMG processing on blocks of samples.
+
+    Each block is band-pass filtered to remove the DC offset, motion
+    artifacts and high frequency noise, then rectified and smoothed over a
+    sliding window into an envelope. The filter and window keep the tail of
+    the previous block, so splitting the samples into blocks of any size
+    gives the same result, and all work is done with NumPy per block.
+
+    The envelope is scaled to an activation between the calibrated rest
+    (0) and maximum contraction (1) levels. The grip turns on above
+    on_threshold and only off again below off_threshold. While the activation
+    is below off_threshold, the rest level slowly follows the envelope, so
+    electrode drift does not cause a grip by itself.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1000.0,
+        channels: int = 1,
+        band: tuple = (20.0, 450.0),
+        window: float = 0.1,
+        envelope: str = "rms",
+        on_threshold: float = 0.3,
+        off_threshold: float = 0.15,
+        adapt_time: float = 30.0,
+    ):
+        """
+        Initialize the EmgEngine.
+
+        Args:
+            rate (float): Sample rate in Hz.
+            channels (int): Number of EMG channels.
+            band (tuple[float, float]): Band-pass in Hz, None for an already rectified
+                input like the MyoWare envelope output.
+            window (float): Seconds the envelope is averaged over.
+            envelope (str): "rms" or "mav" (mean absolute value).
+            on_threshold (float): Activation at which the grip turns on.
+            off_threshold (float): Activation below which the grip turns off again.
+            adapt_time (float): Seconds for the rest level to follow drift, 0 disables it.
+        """
+        if envelope not in ENVELOPES:
+            raise ValueError(f"Envelope must be one of {', '.join(ENVELOPES)}")
+        if off_threshold > on_threshold:
+            raise ValueError("Off threshold must not be above on threshold")
+
+        self.rate = rate
+        self.channels = channels
+        self.envelope_type = envelope
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.adapt_time = adapt_time
+
+        self.taps = None if band is None else bandpass_taps(band[0], band[1], rate)
+        self.window_size = max(1, int(round(window * rate)))
+
+        self.rest = np.zeros(channels)
+        self.max = np.ones(channels)
+        self.reset()
+
+    def reset(self):
+        """Forget the filter state, keeps the calibration."""
+        filter_tail = 0 if self.taps is None else len(self.taps) - 1
+        self.filter_tail = np.zeros((filter_tail, self.channels))
+        self.window_tail = np.zeros((self.window_size, self.channels))
+        self.grip = np.zeros(self.channels, dtype=bool)
+        self.samples = 0
+
+    def calibrate(self, rest_envelope, max_envelope):
+        """
+        Set the rest and maximum contraction levels from envelopes recorded
+        while relaxed and while squeezing as hard as possible.
+        """
+        self.rest = np.median(np.asarray(rest_envelope).reshape(-1, self.channels), 0)
+        self.max = np.percentile(
+            np.asarray(max_envelope).reshape(-1, self.channels), 95, 0
+        )
+        self.max = np.maximum(self.max, self.rest + 1e-6)
+
+    def envelope(self, samples) -> np.ndarray:
+        """
+        Envelope of the next block of samples.
+
+        Args:
+            samples (array_like): Raw samples, (samples, channels) or (samples,).
+
+        Returns:
+            np.ndarray: Envelope, (samples, channels).
+        """
+        x = np.asarray(samples, dtype=np.float64).reshape(-1, self.channels)
+        n = len(x)
+        if n == 0:
+            return np.empty((0, self.channels))
+
+        if self.taps is not None:
+            padded = np.concatenate((self.filter_tail, x))
+            self.filter_tail = padded[n:]
+            x = np.stack(
+                [
+                    np.convolve(padded[:, channel], self.taps, "valid")
+                    for channel in range(self.channels)
+                ],
+                axis=1,
+            )
+
+        # sliding window mean of the squared or absolute signal
+        x = x * x if self.envelope_type == "rms" else np.abs(x)
+        padded = np.concatenate((self.window_tail, x))
+        self.window_tail = padded[n:]
+        sums = np.cumsum(padded, axis=0)
+        mean = (sums[self.window_size :] - sums[: -self.window_size]) / self.window_size
+        np.maximum(mean, 0.0, out=mean)  # rounding in the cumulative sum
+        self.samples += n
+        return np.sqrt(mean) if self.envelope_type == "rms" else mean
+
+    def process(self, samples) -> EmgResult:
+        """
+        Envelope, activation and grip state of the next block of samples.
+        """
+        envelope = self.envelope(samples)
+        activation = np.clip((envelope - self.rest) / (self.max - self.rest), 0.0, 1.0)
+
+        # hysteresis: above on is gripping, below off is not, in between holds
+        state = np.where(
+            activation >= self.on_threshold,
+            1,
+            np.where(activation < self.off_threshold, 0, -1),
+        )
+        state = np.concatenate((self.grip[np.newaxis].astype(np.int64), state))
+        index = np.where(state >= 0, np.arange(len(state))[:, np.newaxis], 0)
+        np.maximum.accumulate(index, axis=0, out=index)
+        grip = np.take_along_axis(state, index, axis=0)[1:].astype(bool)
+        if len(grip):
+            self.grip = grip[-1].copy()
+            self._adapt_rest(envelope, activation)
+
+        return EmgResult(envelope, activation, grip)
+
+    def _adapt_rest(self, envelope, activation):
+        if self.adapt_time <= 0:
+            return
+        relaxed = activation < self.off_threshold
+        for channel in range(self.channels):
+            values = envelope[relaxed[:, channel], channel]
+            if len(values):
+                alpha = 1.0 - np.exp(-len(values) / (self.adapt_time * self.rate))
+                self.rest[channel] += alpha * (values.mean() - self.rest[channel])
+        np.minimum(self.rest, self.max - 1e-6, out=self.rest)
@@ -0,0 +1,199 @@
+# =============================================================================
+#  frame_decoder.py
+#  Decoder for the binary sample frames sent by hardware-test/arduinoemitter.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+FRAME_DELIMITER = b"\x00"
+BAUD_RATE = 500000
+
+# little endian: uint16 sequence, uint32 micros, uint16 per channel, uint16 CRC
+HEADER_STRUCT = struct.Struct("<HI")
+CRC_STRUCT = struct.Struct("<H")
+
+# sequence, device timestamp in seconds and (frames, channels) samples as arrays
+Frames = namedtuple("Frames", ["sequence", "timestamps", "samples"])
+
+
+def _crc16_table():
+    table = np.zeros(256, dtype=np.uint16)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+        table[byte] = crc & 0xFFFF
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data: bytes) -> int:
+    """CRC-16/CCITT-FALSE, as calculated by the emitter."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ int(CRC16_TABLE[(crc >> 8) ^ byte])
+    return crc
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """COBS encode data shorter than 254 bytes, the result contains no 0 bytes."""
+    blocks = data.split(FRAME_DELIMITER)
+    return b"".join(bytes([len(block) + 1]) + block for block in blocks)
+
+
+def payload_size(channels: int) -> int:
+    return HEADER_STRUCT.size + 2 * channels + CRC_STRUCT.size
+
+
+def encode_frame(sequence: int, timestamp_us: int, samples) -> bytes:
+    """
+    Build a frame the way the emitter does, including the delimiter.
+    Used to test the decoder without an Arduino.
+    """
+    payload = HEADER_STRUCT.pack(sequence & 0xFFFF, timestamp_us & 0xFFFFFFFF)
+    payload += struct.pack(f"<{len(samples)}H", *samples)
+    payload += CRC_STRUCT.pack(crc16(payload))
+    return cobs_encode(payload) + FRAME_DELIMITER
+
+
+class FrameDecoder:
+    """
+    Turns bytes read from the serial port into arrays of samples.
+
+    Frames have a fixed size, so all complete frames in a read are COBS
+    decoded and CRC checked together with NumPy, one column at a time,
+    instead of byte by byte in Python. A frame split across reads is kept
+    until the rest arrives. Bytes without a delimiter for longer than two
+    frames, e.g. at a wrong baud rate, are dropped and counted as corrupt.
+
+    Counts frames with a bad CRC or size as corrupt_frames, and frames
+    missing from the sequence numbers, corrupt or never received, as
+    lost_frames. Timestamps continue across the 71 minute micros() wrap.
+    """
+
+    def __init__(self, channels: int = 2):
+        """
+        Initialize the FrameDecoder.
+
+        Args:
+            channels (int): Samples per frame, NUM_CHANNELS of the emitter.
+        """
+        self.channels = channels
+        self.payload_size = payload_size(channels)
+        # two encoded frames with their delimiters
+        self.max_pending = 2 * (self.payload_size + 2)
+        self.frame_dtype = np.dtype(
+            [
+                ("sequence", "<u2"),
+                ("timestamp", "<u4"),
+                ("samples", "<u2", (channels,)),
+                ("crc", "<u2"),
+            ]
+        )
+        self.reset()
+
+    def reset(self):
+        self.buffer = b""
+        self.synced = False  # a delimiter was seen, the next byte starts a frame
+        self.last_sequence = None
+        self.last_timestamp = None  # raw micros() of the last frame
+        self.time_us = 0  # unwrapped micros() of the last frame
+        self.frames = 0
+        self.corrupt_frames = 0
+        self.lost_frames = 0
+
+    def feed(self, data: bytes) -> Frames:
+        """
+        Decode the frames completed by data.
+
+        Args:
+            data (bytes): Bytes read from the serial port, any length.
+
+        Returns:
+            Frames: Sequence numbers (uint16), device timestamps in seconds
+                (float64) and samples (uint16, frames x channels) of the valid frames.
+        """
+        chunks = (self.buffer + data).split(FRAME_DELIMITER)
+        self.buffer = chunks.pop()
+        if not self.synced and chunks:
+            chunks.pop(0)  # started listening in the middle of a frame
+            self.synced = True
+        if len(self.buffer) > self.max_pending:
+            # no frame is this long, drop it and sync on the next delimiter
+            if self.synced:
+                self.corrupt_frames += 1
+            self.buffer = b""
+            self.synced = False
+
+        encoded_size = self.payload_size + 1
+        frames = [chunk for chunk in chunks if len(chunk) == encoded_size]
+        self.corrupt_frames += sum(1 for chunk in chunks if chunk) - len(frames)
+        if not frames:
+            return self._empty()
+
+        encoded = np.frombuffer(b"".join(frames), dtype=np.uint8)
+        payload = self._cobs_decode(encoded.reshape(len(frames), encoded_size))
+        valid = self._crc_ok(payload)
+        self.corrupt_frames += int(len(valid) - np.count_nonzero(valid))
+        if not valid.all():
+            payload = payload[valid]
+        if len(payload) == 0:
+            return self._empty()
+
+        records = np.ascontiguousarray(payload).view(self.frame_dtype)[:, 0]
+        return self._frames(records)
+
+    def _cobs_decode(self, encoded: np.ndarray) -> np.ndarray:
+        """COBS decode rows of equal length, frames are too short for 0xFF codes."""
+        rows, columns = encoded.shape
+        payload = np.empty((rows, columns - 1), dtype=np.uint8)
+        next_code = encoded[:, 0].astype(np.intp)
+        for column in range(1, columns):
+            is_code = next_code == column
+            payload[:, column - 1] = np.where(is_code, 0, encoded[:, column])
+            next_code = np.where(is_code, column + encoded[:, column], next_code)
+        return payload
+
+    def _crc_ok(self, payload: np.ndarray) -> np.ndarray:
+        crc = np.full(len(payload), 0xFFFF, dtype=np.uint16)
+        for column in range(self.payload_size - CRC_STRUCT.size):
+            crc = (crc << 8) ^ CRC16_TABLE[(crc >> 8) ^ payload[:, column]]
+        received = payload[:, -2].astype(np.uint16) | (
+            payload[:, -1].astype(np.uint16) << 8
+        )
+        return crc == received
+
+    def _frames(self, records) -> Frames:
+        sequence = records["sequence"]
+        raw_timestamps = records["timestamp"]
+
+        # gaps in the sequence numbers, including the one since the last read
+        previous = sequence[0] if self.last_sequence is None else self.last_sequence + 1
+        steps = np.diff(sequence.astype(np.int64), prepend=np.int64(previous) - 1)
+        self.lost_frames += int(((steps - 1) % 0x10000).sum())
+        self.last_sequence = int(sequence[-1])
+
+        # unwrap micros() into a growing count of microseconds
+        if self.last_timestamp is None:
+            self.time_us = self.last_timestamp = int(raw_timestamps[0])
+        previous = self.last_timestamp
+        steps = np.diff(raw_timestamps.astype(np.int64), prepend=np.int64(previous))
+        time_us = self.time_us + np.cumsum(steps % 0x100000000)
+        self.time_us = int(time_us[-1])
+        self.last_timestamp = int(raw_timestamps[-1])
+
+        self.frames += len(records)
+        return Frames(sequence.copy(), time_us * 1e-6, records["samples"].copy())
+
+    def _empty(self) -> Frames:
+        return Frames(
+            np.empty(0, dtype=np.uint16),
+            np.empty(0, dtype=np.float64),
+            np.empty((0, self.channels), dtype=np.uint16),
+        )
@@ -0,0 +1,267 @@
+# =============================================================================
+#  gesture_classifier.py
+#  Classifies hand gestures from windows of multi-channel EMG.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from muscle_sensor.emg_engine import bandpass_taps
+
+FEATURES = ("mav", "wl", "zc", "ssc")
+CLASSIFIERS = ("lda", "centroid")
+
+
+def window_features(windows: np.ndarray, threshold: float = 0.0) -> np.ndarray:
+    """
+    Time domain features of a batch of windows.
+
+    Args:
+        windows (np.ndarray): Band-passed EMG, (windows, samples, channels).
+        threshold (float): Smallest amplitude counted by zero and slope sign
+            changes, keeps noise at rest from counting.
+
+    Returns:
+        np.ndarray: (windows, 4 * channels), per channel the mean absolute value,
+            waveform length, zero crossings and slope sign changes.
+    """
+    diff = np.diff(windows, axis=1)
+    mav = np.abs(windows).mean(axis=1)
+    wl = np.abs(diff).sum(axis=1)
+    zc = ((windows[:, :-1] * windows[:, 1:] < 0) & (np.abs(diff) >= threshold)).sum(
+        axis=1
+    )
+    ssc = (
+        (diff[:, :-1] * diff[:, 1:] < 0)
+        & ((np.abs(diff[:, :-1]) >= threshold) | (np.abs(diff[:, 1:]) >= threshold))
+    ).sum(axis=1)
+    return np.concatenate((mav, wl, zc, ssc), axis=1).astype(np.float64)
+
+
+def save_recordings(path: str, recordings: dict):
+    """Save raw sample blocks per gesture, as used by GestureClassifier.fit_recordings()."""
+    np.savez(
+        path,
+        **{
+            f"{label}/{index}": samples
+            for label, blocks in recordings.items()
+            for index, samples in enumerate(blocks)
+        },
+    )
+
+
+def load_recordings(path: str) -> dict:
+    recordings = {}
+    with np.load(path) as data:
+        for name in data.files:
+            label = name.rsplit("/", 1)[0]
+            recordings.setdefault(label, []).append(data[name])
+    return recordings
+
+
+class FeatureExtractor:
+    """
+    Cuts a stream of EMG samples into overlapping windows and returns their features.
+
+    Blocks of samples of any size can be fed, the band-pass filter and the
+    samples of the window in progress carry over to the next block. All
+    windows completed by a block are computed together.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1000.0,
+        channels: int = 2,
+        window: float = 0.2,
+        step: float = 0.05,
+        band: tuple = (20.0, 450.0),
+        threshold: float = 0.0,
+    ):
+        """
+        Initialize the FeatureExtractor.
+
+        Args:
+            rate (float): Sample rate in Hz.
+            channels (int): Number of EMG channels.
+            window (float): Seconds per window.
+            step (float): Seconds between the starts of windows, less than window overlaps them.
+            band (tuple[float, float]): Band-pass in Hz, None if the input is already filtered.
+            threshold (float): Noise threshold for the zero and slope sign change counts.
+        """
+        self.rate = rate
+        self.channels = channels
+        self.window_size = max(2, int(round(window * rate)))
+        self.step_size = max(1, int(round(step * rate)))
+        self.taps = None if band is None else bandpass_taps(band[0], band[1], rate)
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        filter_tail = 0 if self.taps is None else len(self.taps) - 1
+        self.filter_tail = np.zeros((filter_tail, self.channels))
+        self.buffer = np.empty((0, self.channels))  # filtered samples not used up yet
+
+    def feature_names(self) -> list:
+        return [
+            f"{feature}{channel}"
+            for feature in FEATURES
+            for channel in range(self.channels)
+        ]
+
+    def process(self, samples) -> np.ndarray:
+        """
+        Features of every window completed by the next block of samples.
+
+        Returns:
+            np.ndarray: (windows, 4 * channels), possibly no rows.
+        """
+        x = np.asarray(samples, dtype=np.float64).reshape(-1, self.channels)
+        if self.taps is not None and len(x):
+            padded = np.concatenate((self.filter_tail, x))
+            self.filter_tail = padded[len(x) :]
+            x = np.stack(
+                [
+                    np.convolve(padded[:, channel], self.taps, "valid")
+                    for channel in range(self.channels)
+                ],
+                axis=1,
+            )
+
+        buffer = np.concatenate((self.buffer, x))
+        count = (len(buffer) - self.window_size) // self.step_size + 1
+        if len(buffer) < self.window_size or count <= 0:
+            self.buffer = buffer
+            return np.empty((0, 4 * self.channels))
+
+        windows = sliding_window_view(buffer, self.window_size, axis=0)
+        windows = windows[: count * self.step_size : self.step_size]
+        features = window_features(windows.transpose(0, 2, 1), self.threshold)
+        self.buffer = buffer[count * self.step_size :]
+        return features
+
+    def process_recording(self, samples) -> np.ndarray:
+        """Features of all windows of a recording, from the reset state."""
+        self.reset()
+        features = self.process(samples)
+        self.reset()
+        return features
+
+
+class GestureClassifier:
+    """
+    Linear discriminant analysis or nearest centroid classifier of feature vectors.
+
+    Features are standardized with the training mean and deviation. LDA
+    uses one shrunk covariance shared by all gestures, so prediction is a
+    single matrix product per window. Nearest centroid picks the gesture
+    whose mean feature vector is closest.
+    """
+
+    def __init__(self, method: str = "lda", shrinkage: float = 0.1):
+        """
+        Initialize the GestureClassifier.
+
+        Args:
+            method (str): "lda" or "centroid".
+            shrinkage (float): 0-1, how far the LDA covariance is pulled toward
+                the identity, helps with little training data.
+        """
+        if method not in CLASSIFIERS:
+            raise ValueError(f"Method must be one of {', '.join(CLASSIFIERS)}")
+        self.method = method
+        self.shrinkage = shrinkage
+        self.labels = []
+
+    def fit(self, features, labels):
+        """
+        Train from feature vectors and the gesture name of each.
+
+        Args:
+            features (array_like): (windows, features).
+            labels (list[str]): Gesture name of each window.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels)
+        self.labels = sorted(set(labels.tolist()))
+        if len(self.labels) < 2:
+            raise ValueError("At least two gestures are needed to train")
+
+        self.mean = features.mean(axis=0)
+        self.scale = features.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+        z = (features - self.mean) / self.scale
+
+        self.centroids = np.stack(
+            [z[labels == label].mean(axis=0) for label in self.labels]
+        )
+        if self.method == "lda":
+            residuals = z - self.centroids[np.searchsorted(self.labels, labels)]
+            covariance = residuals.T @ residuals / max(len(z) - len(self.labels), 1)
+            covariance = (1 - self.shrinkage) * covariance + self.shrinkage * np.eye(
+                len(covariance)
+            )
+            priors = np.array([np.mean(labels == label) for label in self.labels])
+            self.weights = np.linalg.solve(covariance, self.centroids.T)
+            offsets = np.sum(self.centroids.T * self.weights, axis=0)
+            self.bias = np.log(priors) - 0.5 * offsets
+        return self
+
+    def fit_recordings(self, extractor: FeatureExtractor, recordings: dict):
+        """
+        Train from recorded sessions.
+
+        Args:
+            extractor (FeatureExtractor): Extractor also used for prediction.
+            recordings (dict[str, list[np.ndarray]]): Raw sample blocks recorded
+                while holding each gesture.
+        """
+        features = []
+        labels = []
+        for label, blocks in recordings.items():
+            for samples in blocks:
+                block_features = extractor.process_recording(samples)
+                features.append(block_features)
+                labels += [label] * len(block_features)
+        return self.fit(np.concatenate(features), labels)
+
+    def scores(self, features) -> np.ndarray:
+        """Score of each gesture per window, higher is more likely."""
+        z = (np.atleast_2d(features) - self.mean) / self.scale
+        if self.method == "lda":
+            return z @ self.weights + self.bias
+        return -(
+            (z * z).sum(axis=1)[:, np.newaxis]
+            - 2 * z @ self.centroids.T
+            + (self.centroids * self.centroids).sum(axis=1)
+        )
+
+    def predict(self, features) -> list:
+        """Gesture name of each window."""
+        return [self.labels[index] for index in self.scores(features).argmax(axis=1)]
+
+    def save(self, path: str):
+        data = {
+            "method": self.method,
+            "shrinkage": self.shrinkage,
+            "labels": np.array(self.labels),
+            "mean": self.mean,
+            "scale": self.scale,
+            "centroids": self.centroids,
+        }
+        if self.method == "lda":
+            data.update(weights=self.weights, bias=self.bias)
+        np.savez(path, **data)
+
+    @classmethod
+    def load(cls, path: str) -> "GestureClassifier":
+        with np.load(path) as data:
+            classifier = cls(str(data["method"]), float(data["shrinkage"]))
+            classifier.labels = data["labels"].tolist()
+            classifier.mean = data["mean"]
+            classifier.scale = data["scale"]
+            classifier.centroids = data["centroids"]
+            if classifier.method == "lda":
+                classifier.weights = data["weights"]
+                classifier.bias = data["bias"]
+        return classifier
@@ -0,0 +1,264 @@
+# =============================================================================
+#  ingester.py
+#  Background reader filling a ring buffer with muscle sensor samples.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import threading
+import time
+
+import numpy as np
+import serial
+
+from muscle_sensor.frame_decoder import BAUD_RATE, FrameDecoder
+from signal_processing.sample_ring import HEADER_STATS, SampleRing
+from signal_processing.shared_ring import (
+    RingWriterProcess,
+    SharedSampleRing,
+    run_writer,
+)
+
+READ_TIMEOUT = 0.05  # seconds, also how long stop() can take
+
+# Header slots of the shared ring holding the counters of the ingest process
+STATS = ("reads", "read_errors", "lost_frames", "corrupt_frames")
+
+
+def read_into_ring(port, decoder: FrameDecoder, ring: SampleRing):
+    """
+    Read all bytes waiting on the port, at least one, and add the decoded
+    samples to the ring. The read loop of SensorIngester and SensorProcess.
+
+    Returns:
+        tuple[int, Exception | None]: Bytes read, and the error if the read
+            failed, after waiting READ_TIMEOUT to not spin on a lost port.
+    """
+    try:
+        data = port.read(max(port.in_waiting, 1))
+    except (serial.SerialException, OSError) as e:
+        time.sleep(READ_TIMEOUT)
+        return 0, e
+    if data:
+        frames = decoder.feed(data)
+        ring.write(frames.timestamps, frames.samples)
+    return len(data), None
+
+
+class SensorIngester:
+    """
+    Reads the sensor port on a background thread into a SampleRing.
+
+    Every read takes all bytes waiting on the port and decodes them in one
+    batch. The thread is the only writer: it fills in the samples first and
+    then advances count, so readers need no lock, they only see samples that
+    are complete.
+
+    latest(), window() and samples_since() return NumPy views of the newest
+    samples without copying. A view stays valid until the writer has added
+    capacity - n more samples, consumers that keep one longer should copy it.
+    """
+
+    def __init__(self, port, channels: int = 2, capacity: int = 8192):
+        """
+        Initialize the SensorIngester.
+
+        Args:
+            port (str | serial.Serial): Serial port name, or an open port with read() and in_waiting.
+            channels (int): Channels per sample, NUM_CHANNELS of the emitter.
+            capacity (int): Samples kept in the ring.
+        """
+        if isinstance(port, str):
+            port = serial.Serial(port, BAUD_RATE, timeout=READ_TIMEOUT)
+        self.port = port
+        self.channels = channels
+        self.capacity = capacity
+        self.decoder = FrameDecoder(channels)
+
+        self.ring = SampleRing(capacity, channels, np.uint16)
+
+        self.overflows = 0  # samples overwritten before samples_since() returned them
+        self.reads = 0
+        self.read_errors = 0
+        self.last_error = None
+        self.last_read_time = 0.0  # time.perf_counter() of the last read with data
+
+        self.running = False
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __len__(self):
+        return len(self.ring)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._run, name="SensorIngester", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    @property
+    def count(self) -> int:
+        """Samples added since creation, the newest is count - 1."""
+        return self.ring.count
+
+    @property
+    def lost_frames(self) -> int:
+        return self.decoder.lost_frames
+
+    @property
+    def corrupt_frames(self) -> int:
+        return self.decoder.corrupt_frames
+
+    def get_stats(self) -> dict:
+        return {
+            "samples": self.count,
+            "reads": self.reads,
+            "read_errors": self.read_errors,
+            "lost_frames": self.decoder.lost_frames,
+            "corrupt_frames": self.decoder.corrupt_frames,
+            "overflows": self.overflows,
+        }
+
+    def latest(self):
+        """Newest (timestamp, samples view) or None if empty."""
+        return self.ring.latest()
+
+    def window(self, n: int):
+        """Views of the timestamps and samples of the newest n samples, oldest first."""
+        return self.ring.window(n)
+
+    def samples_since(self, count: int):
+        """
+        Views of the samples added after the first count, for consumers that
+        need every sample. Samples already overwritten are counted in overflows.
+
+        Args:
+            count (int): The count returned by the previous call, 0 at first.
+
+        Returns:
+            tuple[int, np.ndarray, np.ndarray]: New count, timestamps and samples.
+        """
+        newest, missed, timestamps, samples = self.ring.samples_since(count)
+        self.overflows += missed
+        return newest, timestamps, samples
+
+    def _run(self):
+        while self.running:
+            length, error = read_into_ring(self.port, self.decoder, self.ring)
+            if error is not None:
+                self.read_errors += 1
+                self.last_error = error
+            elif length:
+                self.reads += 1
+                self.last_read_time = time.perf_counter()
+
+
+class SensorProcess:
+    """
+    SensorIngester running in a separate process.
+
+    Reading and decoding the port happens in its own interpreter, so it
+    neither waits for nor delays the control loop because of the GIL. The
+    samples arrive in a SharedSampleRing, the same ring as SensorIngester
+    uses but in shared memory, and are read with the same latest(),
+    window() and samples_since(), as views into the shared memory.
+    """
+
+    def __init__(self, port: str, channels: int = 2, capacity: int = 8192):
+        """
+        Initialize the SensorProcess.
+
+        Args:
+            port (str): Serial port name.
+            channels (int): Channels per sample, NUM_CHANNELS of the emitter.
+            capacity (int): Samples kept in the ring.
+        """
+        self.channels = channels
+        self.capacity = capacity
+        self.ring = SharedSampleRing(None, capacity, channels, np.uint16)
+        self.process = RingWriterProcess(
+            "muscle_sensor.ingester", self.ring, port=port, channels=channels
+        )
+        self.overflows = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.ring)
+
+    def start(self):
+        self.process.start()
+
+    def stop(self, timeout: float = 2.0):
+        self.process.stop(timeout)
+
+    def close(self):
+        self.stop()
+        self.ring.close()
+
+    @property
+    def count(self) -> int:
+        return self.ring.count
+
+    def get_stats(self) -> dict:
+        stats = {"samples": self.ring.count}
+        for index, name in enumerate(STATS):
+            stats[name] = int(self.ring.header[HEADER_STATS + index])
+        stats["overflows"] = self.overflows
+        return stats
+
+    def latest(self):
+        """Newest (timestamp, samples view) or None if empty."""
+        return self.ring.latest()
+
+    def window(self, n: int):
+        """Views of the timestamps and samples of the newest n samples, oldest first."""
+        return self.ring.window(n)
+
+    def samples_since(self, count: int):
+        """Same as SensorIngester.samples_since()."""
+        newest, missed, timestamps, samples = self.ring.samples_since(count)
+        self.overflows += missed
+        return newest, timestamps, samples
+
+
+def _ingest(ring, stop_event, port, channels):
+    """Body of the process started by SensorProcess."""
+    port = serial.Serial(port, BAUD_RATE, timeout=READ_TIMEOUT)
+    decoder = FrameDecoder(channels)
+    stats = ring.header[HEADER_STATS : HEADER_STATS + len(STATS)]
+    while not stop_event.is_set():
+        length, error = read_into_ring(port, decoder, ring)
+        if error is not None:
+            stats[1] += 1
+        elif length:
+            stats[:] = (
+                stats[0] + 1,
+                stats[1],
+                decoder.lost_frames,
+                decoder.corrupt_frames,
+            )
+    port.close()
+
+
+if __name__ == "__main__":
+    run_writer(_ingest)
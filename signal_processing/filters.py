@@ -0,0 +1,327 @@
+# =============================================================================
+#  filters.py
+#  Streaming filter stages for turning sensor values into servo targets.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+
+# EmaFilter.process() ignores older samples weighted less than this
+EMA_MIN_FACTOR = 1e-17
+
+
+class FilterStage(ABC):
+    """
+    One step of a FilterPipeline.
+
+    update() takes the next sample and its timestamp in seconds and returns
+    the filtered value, keeping only a few numbers of state. process() runs
+    the stage over recorded arrays, for tuning on logged data. It calls
+    update() per sample, linear stages override it with array operations.
+    """
+
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def update(self, value: float, timestamp: float) -> float:
+        pass
+
+    def process(self, values, timestamps) -> np.ndarray:
+        """
+        Filter recorded samples from the reset state.
+
+        Args:
+            values (array_like): Sample values.
+            timestamps (array_like): Sample times in seconds.
+
+        Returns:
+            np.ndarray: Filtered values.
+        """
+        self.reset()
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        output = np.empty_like(values)
+        update = self.update
+        for index, (value, timestamp) in enumerate(
+            zip(values.tolist(), timestamps.tolist())
+        ):
+            output[index] = update(value, timestamp)
+        return output
+
+
+class EmaFilter(FilterStage):
+    """
+    Exponential moving average, alpha 1 passes the input, smaller is smoother.
+    """
+
+    def __init__(self, alpha: float = 0.5):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("Alpha must be in the range (0, 1]")
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    def process(self, values, timestamps) -> np.ndarray:
+        # y[k] = decay * y[k - 1] + alpha * x[k] solved as a prefix scan, each
+        # pass adds the terms from step samples back, until decay^step vanishes
+        self.reset()
+        output = self.alpha * np.asarray(values, dtype=np.float64)
+        if len(output) == 0:
+            return output
+        output[0] = values[0]  # the first output is the first value
+
+        decay = 1.0 - self.alpha
+        step = 1
+        factor = decay
+        while step < len(output) and factor > EMA_MIN_FACTOR:
+            output[step:] += factor * output[:-step]
+            step *= 2
+            factor *= factor
+        self.value = float(output[-1])
+        return output
+
+
+class MedianFilter(FilterStage):
+    """
+    Median of the last size samples, removes single spikes without smearing steps.
+    """
+
+    def __init__(self, size: int = 3):
+        if size < 1:
+            raise ValueError("Size must be at least 1")
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.sorted = []
+
+    def update(self, value: float, timestamp: float) -> float:
+        window = self.window
+        ordered = self.sorted
+        if len(window) == self.size:
+            del ordered[bisect_left(ordered, window.popleft())]
+        window.append(value)
+        insort(ordered, value)
+
+        middle = len(ordered) // 2
+        if len(ordered) % 2:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class OneEuroFilter(FilterStage):
+    """
+    One Euro filter, an EMA whose cutoff rises with the speed of the signal.
+
+    Slow movement is smoothed with min_cutoff Hz to remove jitter, fast
+    movement raises the cutoff by beta per unit/s so it is not delayed.
+    See https://gery.casiez.net/1euro/
+    """
+
+    def __init__(
+        self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0
+    ):
+        """
+        Initialize the OneEuroFilter.
+
+        Args:
+            min_cutoff (float): Cutoff frequency in Hz when the signal is still.
+            beta (float): Cutoff increase per unit/s of signal speed.
+            d_cutoff (float): Cutoff frequency in Hz for the speed estimate.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.derivative = 0.0
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff: float, dt: float) -> float:
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self.value is None:
+            self.value = value
+            self.timestamp = timestamp
+            return value
+
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return self.value  # out of order or duplicate
+        self.timestamp = timestamp
+
+        derivative = (value - self.value) / dt
+        self.derivative += self._alpha(self.d_cutoff, dt) * (
+            derivative - self.derivative
+        )
+        cutoff = self.min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff, dt) * (value - self.value)
+        return self.value
+
+
+class Deadband(FilterStage):
+    """
+    Values within width of center become center, e.g. small ring tilts keep the hand open.
+    """
+
+    def __init__(self, width: float, center: float = 0.0):
+        self.width = width
+        self.center = center
+
+    def update(self, value: float, timestamp: float) -> float:
+        if abs(value - self.center) <= self.width:
+            return self.center
+        return value
+
+    def process(self, values, timestamps) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        return np.where(np.abs(values - self.center) <= self.width, self.center, values)
+
+
+class Hysteresis(FilterStage):
+    """
+    Holds the output until the input has moved more than width away from it.
+
+    The output then follows the input at a distance of width, so a signal
+    hovering around one value does not make the output change back and forth.
+    """
+
+    def __init__(self, width: float):
+        self.width = width
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self.value is None:
+            self.value = value
+        elif value > self.value + self.width:
+            self.value = value - self.width
+        elif value < self.value - self.width:
+            self.value = value + self.width
+        return self.value
+
+
+class RateLimiter(FilterStage):
+    """
+    Limits how fast the output changes, to max_rate units per second.
+    """
+
+    def __init__(self, max_rate: float):
+        self.max_rate = max_rate
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.timestamp = None
+
+    def update(self, value: float, timestamp: float) -> float:
+        if self.value is None:
+            self.value = value
+            self.timestamp = timestamp
+            return value
+
+        max_step = self.max_rate * max(timestamp - self.timestamp, 0.0)
+        self.timestamp = timestamp
+        self.value += max(-max_step, min(max_step, value - self.value))
+        return self.value
+
+
+class FilterPipeline:
+    """
+    Runs filter stages in order and decides which outputs are worth sending.
+
+    update() returns the filtered value only when it differs more than
+    emit_threshold from the last value it returned, and None otherwise, so
+    a still signal causes no servo traffic.
+    """
+
+    def __init__(self, *stages: FilterStage, emit_threshold: float = 0.0):
+        """
+        Initialize the FilterPipeline.
+
+        Args:
+            *stages (FilterStage): Stages, the first gets the raw samples.
+            emit_threshold (float): Smallest change that is emitted.
+        """
+        self.stages = list(stages)
+        self.emit_threshold = emit_threshold
+        self.reset()
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+        self.value = None  # last filtered value
+        self.emitted_value = None  # last value returned by update()
+        self.samples = 0
+        self.emitted = 0
+
+    def update(self, value: float, timestamp: float):
+        """
+        Filter the next sample.
+
+        Returns:
+            float | None: Filtered value, or None if it is too close to the last emitted value.
+        """
+        for stage in self.stages:
+            value = stage.update(value, timestamp)
+        self.value = value
+        self.samples += 1
+
+        if (
+            self.emitted_value is not None
+            and abs(value - self.emitted_value) <= self.emit_threshold
+        ):
+            return None
+        self.emitted_value = value
+        self.emitted += 1
+        return value
+
+    def process(self, values, timestamps):
+        """
+        Filter recorded samples from the reset state, leaving the pipeline reset.
+
+        Args:
+            values (array_like): Sample values.
+            timestamps (array_like): Sample times in seconds.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Filtered values and a bool mask of the
+                samples update() would have emitted.
+        """
+        self.reset()
+        output = np.asarray(values, dtype=np.float64)
+        for stage in self.stages:
+            output = stage.process(output, timestamps)
+
+        emit = np.zeros(len(output), dtype=bool)
+        emitted_value = None
+        threshold = self.emit_threshold
+        for index, value in enumerate(output.tolist()):
+            if emitted_value is None or abs(value - emitted_value) > threshold:
+                emit[index] = True
+                emitted_value = value
+        self.reset()
+        return output, emit
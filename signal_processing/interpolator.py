@@ -0,0 +1,106 @@
+# =============================================================================
+#  interpolator.py
+#  Turns sparse sensor samples into a smooth signal at the control rate.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+from collections import deque
+
+INTERPOLATION_MODES = ("hold", "linear", "extrapolate")
+
+
+class SampleInterpolator:
+    """
+    Estimates a sampled signal at any time between and after its samples.
+
+    The Colmi ring sends raw sensor data once per second. Sampling it at the
+    servo control rate gives a staircase, this fills in the steps:
+
+    - "hold": the newest sample, no added latency, a step per sample.
+    - "linear": interpolates between samples delay seconds in the past. With
+      the delay equal to the sample period the output is a smooth ramp that
+      never overshoots, but lags by that period.
+    - "extrapolate": continues the slope of the last two samples for at most
+      max_extrapolation seconds past the newest sample (after the delay) and
+      at most max_overshoot beyond it. Less delay means quicker response and
+      more overshoot when the signal turns.
+
+    Output is clamped to [min_value, max_value].
+    """
+
+    def __init__(
+        self,
+        mode: str = "linear",
+        delay: float = 1.0,
+        max_extrapolation: float = 0.5,
+        max_overshoot: float = 10.0,
+        min_value: float = 0.0,
+        max_value: float = 100.0,
+    ):
+        """
+        Initialize the SampleInterpolator.
+
+        Args:
+            mode (str): "hold", "linear" or "extrapolate".
+            delay (float): Seconds the output lags the samples, trades latency for smoothness.
+            max_extrapolation (float): Seconds past the newest sample the slope is continued.
+            max_overshoot (float): Largest distance extrapolation may go beyond the newest sample.
+            min_value (float): Lowest output value.
+            max_value (float): Highest output value.
+        """
+        if mode not in INTERPOLATION_MODES:
+            raise ValueError(f"Mode must be one of {', '.join(INTERPOLATION_MODES)}")
+
+        self.mode = mode
+        self.delay = delay
+        self.max_extrapolation = max_extrapolation
+        self.max_overshoot = max_overshoot
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self.samples = deque(maxlen=3)  # (timestamp, value), oldest first
+
+    def reset(self):
+        self.samples.clear()
+
+    def add_sample(self, timestamp: float, value: float):
+        if self.samples and timestamp <= self.samples[-1][0]:
+            return  # out of order or duplicate
+        self.samples.append((timestamp, value))
+
+    def value_at(self, now: float):
+        """
+        Estimated value at time now, None before the first sample.
+        """
+        samples = self.samples
+        if not samples:
+            return None
+
+        last_time, last_value = samples[-1]
+        if self.mode == "hold" or len(samples) == 1:
+            return self._clamp(last_value)
+
+        t = now - self.delay
+
+        # interpolate between the two samples around t
+        if t < last_time:
+            for index in range(len(samples) - 1, 0, -1):
+                t0, v0 = samples[index - 1]
+                t1, v1 = samples[index]
+                if t >= t0:
+                    return self._clamp(v0 + (v1 - v0) * (t - t0) / (t1 - t0))
+
+        if t < samples[0][0]:
+            return self._clamp(samples[0][1])
+        if self.mode == "linear" or t <= last_time:
+            return self._clamp(last_value)
+
+        # bounded extrapolation past the newest sample
+        previous_time, previous_value = samples[-2]
+        slope = (last_value - previous_value) / (last_time - previous_time)
+        ahead = min(t - last_time, self.max_extrapolation)
+        change = max(-self.max_overshoot, min(self.max_overshoot, slope * ahead))
+        return self._clamp(last_value + change)
+
+    def _clamp(self, value):
+        return max(self.min_value, min(self.max_value, value))
@@ -0,0 +1,162 @@
+# =============================================================================
+#  sample_ring.py
+#  Preallocated ring buffer of timestamped sensor samples.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+
+# Slots of the int64 header at the start of the storage
+HEADER_WRITE_END = 0  # samples written or being written, raised before writing
+HEADER_COUNT = 1  # samples completely written, raised after writing
+HEADER_STATS = 2  # first of the slots the writer can use for its own counters
+HEADER_SLOTS = 16
+
+
+class SampleRing:
+    """
+    Fixed size ring of timestamped samples, one writer and any number of readers.
+
+    Storage is allocated once, write() and append() only copy into it, so
+    they can be called from a reader thread or a notification callback at
+    any rate. The newest samples overwrite the oldest.
+
+    The ring is stored twice in a row, so latest(), window() and
+    samples_since() return NumPy views of the newest samples without
+    copying. The writer raises the write end before it touches the ring and
+    the count after, like the sequence number of a seqlock. A reader takes
+    the count, uses the views, and can then check with intact() that the
+    writer has not come around and overwritten them meanwhile. Readers that
+    keep views longer should copy them, or use read_since().
+
+    The header, timestamps and samples live in one buffer, a bytearray by
+    default or e.g. shared memory, see SharedSampleRing.
+    """
+
+    def __init__(
+        self, capacity: int = 1024, channels: int = 3, dtype=np.int16, buffer=None
+    ):
+        """
+        Initialize the SampleRing.
+
+        Args:
+            capacity (int): Samples kept in the ring.
+            channels (int): Values per sample.
+            dtype: NumPy type of the values.
+            buffer: Writable buffer of at least nbytes() bytes to store the ring
+                in, None to allocate one. A given buffer is used as it is.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+
+        if buffer is None:
+            buffer = bytearray(self.nbytes(capacity, channels, self.dtype))
+        header_size = HEADER_SLOTS * 8
+        timestamps_size = 2 * capacity * 8
+        self.header = np.ndarray((HEADER_SLOTS,), np.int64, buffer)
+        self.timestamps = np.ndarray(
+            (2 * capacity,), np.float64, buffer, offset=header_size
+        )
+        self.samples = np.ndarray(
+            (2 * capacity, channels),
+            self.dtype,
+            buffer,
+            offset=header_size + timestamps_size,
+        )
+
+    @staticmethod
+    def nbytes(capacity: int, channels: int, dtype) -> int:
+        """Size of the buffer holding a ring."""
+        samples_size = 2 * capacity * channels * np.dtype(dtype).itemsize
+        return HEADER_SLOTS * 8 + 2 * capacity * 8 + samples_size
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """Samples completely written since creation, the newest is count - 1."""
+        return int(self.header[HEADER_COUNT])
+
+    def write(self, timestamps, samples):
+        """
+        Add a block of samples, only one thread or process may write.
+
+        Args:
+            timestamps (array_like): Timestamp of each sample.
+            samples (array_like): (samples, channels) values.
+        """
+        total = len(timestamps)
+        if total == 0:
+            return
+        n = min(total, self.capacity)
+        count = int(self.header[HEADER_COUNT])
+
+        self.header[HEADER_WRITE_END] = count + total
+        index = (count + total - n + np.arange(n)) % self.capacity
+        for offset in (0, self.capacity):
+            self.timestamps[index + offset] = timestamps[-n:]
+            self.samples[index + offset] = samples[-n:]
+        self.header[HEADER_COUNT] = count + total
+
+    def append(self, timestamp: float, *values):
+        """Add one sample, cheaper than write() for a single one."""
+        count = int(self.header[HEADER_COUNT])
+        index = count % self.capacity
+
+        self.header[HEADER_WRITE_END] = count + 1
+        self.timestamps[index] = self.timestamps[index + self.capacity] = timestamp
+        self.samples[index] = self.samples[index + self.capacity] = values
+        self.header[HEADER_COUNT] = count + 1
+
+    def intact(self, start: int) -> bool:
+        """
+        True if the samples from start on have not been overwritten since they
+        were read, check after using views from window() or samples_since().
+        """
+        return int(self.header[HEADER_WRITE_END]) - start <= self.capacity
+
+    def latest(self):
+        """Newest (timestamp, samples view) or None if empty."""
+        count = self.count
+        if count == 0:
+            return None
+        index = (count - 1) % self.capacity
+        return self.timestamps[index], self.samples[index]
+
+    def window(self, n: int):
+        """Views of the timestamps and samples of the newest n samples, oldest first."""
+        return self._views(self.count, n)
+
+    def samples_since(self, count: int):
+        """
+        Views of the samples added after the first count.
+
+        Args:
+            count (int): The count returned by the previous call, 0 at first.
+
+        Returns:
+            tuple[int, int, np.ndarray, np.ndarray]: New count, samples that were
+                already overwritten, timestamps and samples.
+        """
+        newest = self.count
+        n = newest - count
+        missed = max(0, n - self.capacity)
+        timestamps, samples = self._views(newest, n - missed)
+        return newest, missed, timestamps, samples
+
+    def read_since(self, count: int):
+        """
+        Like samples_since() but copies, retrying until the copy is intact.
+        """
+        while True:
+            newest, missed, timestamps, samples = self.samples_since(count)
+            timestamps, samples = timestamps.copy(), samples.copy()
+            if self.intact(newest - len(timestamps)):
+                return newest, missed, timestamps, samples
+
+    def _views(self, count: int, n: int):
+        n = max(0, min(n, count, self.capacity))
+        end = count % self.capacity + self.capacity
+        return self.timestamps[end - n : end], self.samples[end - n : end]
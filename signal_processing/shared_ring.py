@@ -0,0 +1,157 @@
+# =============================================================================
+#  shared_ring.py
+#  Ring of timestamped samples in shared memory, one writer process, many readers.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import json
+import os
+import subprocess
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from signal_processing.sample_ring import SampleRing
+
+# Repository root, the working directory of writer processes
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SharedSampleRing(SampleRing):
+    """
+    SampleRing in shared memory, written by one process and read by others.
+
+    The seqlock counters of SampleRing are what makes this safe: readers
+    never block the writer and no lock is shared between processes. Views
+    from window() and samples_since() point straight into the shared memory.
+    """
+
+    def __init__(
+        self,
+        name: str = None,
+        capacity: int = 8192,
+        channels: int = 1,
+        dtype=np.uint16,
+        create: bool = True,
+    ):
+        """
+        Create a new ring, or attach to one created by another process.
+
+        Args:
+            name (str): Shared memory name, None for a new unique one.
+            capacity (int): Samples kept in the ring.
+            channels (int): Values per sample.
+            dtype: NumPy type of the values.
+            create (bool): True to create the shared memory, False to attach.
+        """
+        self.created = create
+        size = self.nbytes(capacity, channels, dtype)
+        self.shared_memory = shared_memory.SharedMemory(name, create, size)
+        self.name = self.shared_memory.name
+        if not create and os.name == "posix":
+            # attaching registers the memory with the resource tracker of this
+            # process, which would free it when this process exits
+            resource_tracker.unregister(self.shared_memory._name, "shared_memory")
+
+        SampleRing.__init__(self, capacity, channels, dtype, self.shared_memory.buf)
+        if create:
+            self.header[:] = 0
+
+    def spec(self) -> dict:
+        """Arguments for attaching to this ring from another process."""
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "channels": self.channels,
+            "dtype": self.dtype.str,
+            "create": False,
+        }
+
+    def close(self):
+        """Detach, and free the shared memory if this ring created it."""
+        self.header = self.timestamps = self.samples = None
+        try:
+            self.shared_memory.close()
+        except BufferError:
+            pass  # a reader still holds a view, it is unmapped when the view is gone
+        if self.created:
+            self.shared_memory.unlink()
+
+
+class RingWriterProcess:
+    """
+    Runs python -m module in its own process, writing into a SharedSampleRing.
+
+    The module calls run_writer() from its __main__ block. A fresh
+    interpreter is started instead of a multiprocessing child, so the
+    control script, which opens the servo port when imported, is not
+    imported a second time on Windows. The writer stops when its stdin is
+    closed, also when this process dies.
+    """
+
+    def __init__(self, module: str, ring: SharedSampleRing, **kwargs):
+        """
+        Args:
+            module (str): Module with a run_writer() __main__ block, e.g. "muscle_sensor.ingester".
+            ring (SharedSampleRing): Ring created by this process.
+            **kwargs: JSON serializable arguments for the writer function.
+        """
+        self.module = module
+        self.ring = ring
+        self.kwargs = kwargs
+        self.process = None
+
+    def start(self):
+        if self.process is not None:
+            return
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                self.module,
+                json.dumps(self.ring.spec()),
+                json.dumps(self.kwargs),
+            ],
+            stdin=subprocess.PIPE,
+            cwd=ROOT_DIR,
+        )
+
+    def stop(self, timeout: float = 2.0):
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+def run_writer(writer):
+    """
+    Entry point of a writer process started by RingWriterProcess.
+
+    Calls writer(ring, stop_event, **kwargs), the writer returns soon after
+    stop_event is set.
+    """
+    ring = SharedSampleRing(**json.loads(sys.argv[1]))
+    kwargs = json.loads(sys.argv[2])
+    stop_event = threading.Event()
+
+    def wait_for_parent():
+        sys.stdin.read()  # returns when the parent closes stdin or exits
+        stop_event.set()
+
+    threading.Thread(target=wait_for_parent, daemon=True).start()
+    try:
+        writer(ring, stop_event, **kwargs)
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches the whole process group, the parent stops us
+    finally:
+        ring.close()
@@ -0,0 +1,10 @@
+# =============================================================================
+#  conftest.py
+#  Lets the tests import the packages of the repository root.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
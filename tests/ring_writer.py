@@ -0,0 +1,29 @@
+# =============================================================================
+#  ring_writer.py
+#  Writer process for the shared ring tests, started by RingWriterProcess.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+
+from signal_processing.shared_ring import run_writer
+
+
+def pattern(first, n, channels):
+    """Timestamps and samples of the samples first to first + n - 1."""
+    index = np.arange(first, first + n)
+    samples = (index[:, np.newaxis] + np.arange(channels)) % 10000
+    return index.astype(np.float64), samples
+
+
+def _write(ring, stop_event, block_sizes):
+    """Writes the pattern in blocks of block_sizes until stopped."""
+    count = 0
+    while not stop_event.is_set():
+        for n in block_sizes:
+            ring.write(*pattern(count, n, ring.channels))
+            count += n
+
+
+if __name__ == "__main__":
+    run_writer(_write)
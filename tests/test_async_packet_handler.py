@@ -0,0 +1,54 @@
+# =============================================================================
+#  test_async_packet_handler.py
+#  asyncio transactions against emulated servos.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import asyncio
+import time
+
+from SCServo import *
+from ServoController.Scs0009Controller import Scs0009Controller
+from tests.test_emulator import sent_packets
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_write_with_ack():
+    controller = Scs0009Controller("emulator://8")
+    bus = controller.async_bus()
+
+    result, error = run(bus.write(3, SCSCL_GOAL_SPEED_L, [0x01, 0x20]))
+
+    assert (result, error) == (COMM_SUCCESS, 0)
+    assert controller.portHandler.servos[3].getWord(SCSCL_GOAL_SPEED_L) == 0x0120
+
+
+def test_write_without_ack_leaves_no_status_packet():
+    controller = Scs0009Controller("emulator://8")
+    bus = controller.async_bus()
+    packets = sent_packets(controller)
+
+    result, error = run(bus.write(3, SCSCL_GOAL_SPEED_L, [0x01, 0x20], ack=False))
+
+    assert (result, error) == (COMM_SUCCESS, 0)
+    assert [packet[PKT_INSTRUCTION] for packet in packets] == [INST_SYNC_WRITE]
+    time.sleep(0.001)  # longer than a status packet takes
+    assert controller.portHandler.ser.in_waiting == 0
+    assert controller.portHandler.servos[3].getWord(SCSCL_GOAL_SPEED_L) == 0x0120
+
+
+def test_read_after_writes_without_ack():
+    controller = Scs0009Controller("emulator://8")
+    bus = controller.async_bus()
+
+    async def write_and_read():
+        for id in range(1, 9):
+            await bus.write(id, SCSCL_GOAL_SPEED_L, [0x00, id], ack=False)
+        return await bus.read(5, SCSCL_GOAL_SPEED_L, 2)
+
+    data, result, error = run(write_and_read())
+
+    assert (data, result, error) == (b"\x00\x05", COMM_SUCCESS, 0)
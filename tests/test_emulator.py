@@ -0,0 +1,206 @@
+# =============================================================================
+#  test_emulator.py
+#  Packet handling, sync reads and the register shadow against emulated servos.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import pytest
+
+from SCServo import *
+from ServoController.Scs0009Controller import Scs0009Controller
+
+
+@pytest.fixture
+def controller():
+    return Scs0009Controller("emulator://8")
+
+
+def sent_packets(controller):
+    """List that collects every packet written to the emulated bus."""
+    serial = controller.portHandler.ser
+    write = serial.write
+    packets = []
+
+    def record(data):
+        packets.append(bytes(data))
+        return write(data)
+
+    serial.write = record
+    return packets
+
+
+def add_noise(controller, noise):
+    """Put noise on the bus in front of every status packet."""
+    serial = controller.portHandler.ser
+    respond = serial._respond
+
+    def noisy(scs_id, error, data=b""):
+        serial.rxchunks.append((serial.bus_free_at, bytes(noise)))
+        serial.bus_free_at += len(noise) * serial.byte_time
+        respond(scs_id, error, data)
+
+    serial._respond = noisy
+
+
+def split_reads(controller, size=1):
+    """Let every read of the port return at most size bytes."""
+    serial = controller.portHandler.ser
+    read = serial.read
+    serial.read = lambda length=1: read(min(length, size))
+
+
+def goal_position(controller, id):
+    return controller.portHandler.servos[id].getWord(SCSCL_GOAL_POSITION_L)
+
+
+def test_status_packets_read_a_byte_at_a_time(controller):
+    split_reads(controller)
+    handler = controller.packetHandler
+
+    model, result, error = handler.ping(3)
+    assert (model, result, error) == (EMULATED_MODEL_NUMBER, COMM_SUCCESS, 0)
+
+    position, result, error = handler.read2ByteTxRx(3, SCSCL_GOAL_POSITION_L)
+    assert (position, result, error) == (512, COMM_SUCCESS, 0)
+
+
+@pytest.mark.parametrize(
+    "noise",
+    [
+        b"\x00\x12\x34",
+        b"\xff",  # lone header byte
+        b"\xff\xff\xff",  # extra header bytes
+        b"\xff\xff\xfe\x04",  # unavailable ID
+        b"\xff\xff\x03\xf0",  # unavailable length
+    ],
+)
+def test_status_packets_after_garbage(controller, noise):
+    add_noise(controller, noise)
+    split_reads(controller, 3)
+
+    position, result, error = controller.packetHandler.read2ByteTxRx(
+        5, SCSCL_GOAL_POSITION_L
+    )
+    assert (position, result, error) == (512, COMM_SUCCESS, 0)
+
+
+def test_no_stale_status_packet_after_corrupt_one(controller):
+    serial = controller.portHandler.ser
+    respond = serial._respond
+    handler = controller.packetHandler
+
+    def corrupt_first(scs_id, error, data=b""):
+        # a status packet with a bad checksum in front of the real one
+        bad = bytearray([0xFF, 0xFF, scs_id, len(data) + 2, error]) + data
+        bad.append(sum(bad[2:]) & 0xFF)
+        serial.rxchunks.append((serial.bus_free_at, bytes(bad)))
+        serial.bus_free_at += len(bad) * serial.byte_time
+        serial._respond = respond
+        respond(scs_id, error, data)
+
+    serial._respond = corrupt_first
+    controller.portHandler.servos[4].setWord(SCSCL_GOAL_SPEED_L, 300)
+
+    _, result, _ = handler.read2ByteTxRx(4, SCSCL_GOAL_POSITION_L)
+    assert result == COMM_RX_CORRUPT
+
+    speed, result, error = handler.read2ByteTxRx(4, SCSCL_GOAL_SPEED_L)
+    assert (speed, result, error) == (300, COMM_SUCCESS, 0)
+
+
+def test_read_telemetry_in_order_of_ids(controller):
+    servo = controller.portHandler.servos[2]
+    servo.position = 300.0
+    servo.setWord(SCSCL_GOAL_POSITION_L, 300)
+
+    telemetry = controller.read_telemetry([4, 2, 7])
+
+    assert telemetry["id"].tolist() == [4, 2, 7]
+    assert telemetry["valid"].all()
+    assert telemetry["position"].tolist() == [512, 300, 512]
+    assert telemetry["voltage"].tolist() == [EMULATED_VOLTAGE] * 3
+    assert telemetry["temperature"].tolist() == [EMULATED_TEMPERATURE] * 3
+
+
+def test_read_telemetry_of_missing_servo(controller):
+    telemetry = controller.read_telemetry([1, 9, 2])
+
+    assert telemetry["valid"].tolist() == [True, False, True]
+    assert telemetry["position"].tolist() == [512, 0, 512]
+
+
+def test_read_telemetry_rejects_duplicate_ids(controller):
+    with pytest.raises(ValueError):
+        controller.read_telemetry([1, 2, 1])
+
+    assert controller.read_telemetry([1, 2])["valid"].all()
+
+
+def test_unchanged_setpoint_is_not_sent(controller):
+    packets = sent_packets(controller)
+
+    controller.move_angle(1, 10)
+    controller.move_angle(1, 10)
+    controller.set_speed(1, 50)
+    controller.set_speed(1, 50)
+
+    assert len(packets) == 2
+    assert goal_position(controller, 1) == controller._to_position(10, 512)
+
+
+def test_position_and_speed_in_one_write(controller):
+    packets = sent_packets(controller)
+
+    with controller.batch():
+        controller.set_speed(2, 50)
+        controller.move_angle(2, 10)
+
+    assert [packet[PKT_INSTRUCTION] for packet in packets] == [INST_WRITE]
+    assert packets[0][PKT_PARAMETER0] == SCSCL_GOAL_POSITION_L
+    assert packets[0][PKT_LENGTH] == 3 + 6  # position, time and speed
+    servo = controller.portHandler.servos[2]
+    assert servo.getWord(SCSCL_GOAL_TIME_L) == 0
+    assert servo.getWord(SCSCL_GOAL_POSITION_L) == controller._to_position(10, 512)
+    assert servo.getWord(SCSCL_GOAL_SPEED_L) == controller._to_servo_speed(50)
+
+
+def test_fire_and_forget_sends_no_acknowledged_writes(controller):
+    packets = sent_packets(controller)
+    controller.set_fire_and_forget(True, verify_interval=0)
+
+    controller.move_angle(1, 10)
+
+    assert [packet[PKT_INSTRUCTION] for packet in packets] == [INST_SYNC_WRITE]
+    assert goal_position(controller, 1) == controller._to_position(10, 512)
+
+
+def test_fire_and_forget_verification(controller):
+    diverged = []
+    controller.set_fire_and_forget(
+        True, verify_interval=2, on_divergence=lambda *args: diverged.append(args)
+    )
+
+    controller.move_angle(1, 10)
+    controller.move_angle(2, 20)
+    assert controller.verify_count == 1
+    assert diverged == []
+
+    # a servo that lost the setpoint, e.g. after a brown out
+    controller.portHandler.servos[1].setWord(SCSCL_GOAL_POSITION_L, 512)
+    controller.move_angle(1, 10)  # suppressed by the shadow
+    assert goal_position(controller, 1) == 512
+
+    assert controller.verify_writes([1, 2]) == 1
+    assert diverged == [(1, controller._to_position(10, 512), 512)]
+    assert controller.divergence_count == 1
+
+    # the cleared shadow lets the setpoint through again
+    controller.move_angle(1, 10)
+    assert goal_position(controller, 1) == controller._to_position(10, 512)
+
+
+def test_fire_and_forget_unanswered_servo_diverges(controller):
+    controller.set_fire_and_forget(True, verify_interval=0)
+
+    assert controller.verify_writes([1, 9]) == 1
+    assert controller.divergence_count == 1
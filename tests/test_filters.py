@@ -0,0 +1,86 @@
+# =============================================================================
+#  test_filters.py
+#  Streaming filter stages and the filter pipeline.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+import pytest
+
+from signal_processing.filters import (
+    Deadband,
+    EmaFilter,
+    FilterPipeline,
+    FilterStage,
+    Hysteresis,
+    MedianFilter,
+    OneEuroFilter,
+    RateLimiter,
+)
+
+
+def recording(n=5000):
+    rng = np.random.default_rng(7)
+    timestamps = np.arange(n) * 0.02
+    values = 50 + 40 * np.sin(timestamps) + rng.normal(0, 5, n)
+    return values, timestamps
+
+
+def updates(stage, values, timestamps):
+    stage.reset()
+    return np.array([stage.update(v, t) for v, t in zip(values, timestamps)])
+
+
+def test_stage_needs_update():
+    with pytest.raises(TypeError):
+        FilterStage()
+
+
+@pytest.mark.parametrize("alpha", [0.001, 0.05, 0.3, 0.9, 1.0])
+def test_ema_process_matches_update(alpha):
+    values, timestamps = recording()
+    expected = updates(EmaFilter(alpha), values, timestamps)
+
+    stage = EmaFilter(alpha)
+    output = stage.process(values, timestamps)
+
+    assert np.allclose(output, expected, rtol=1e-9, atol=1e-9)
+    # the state continues where the recording ended
+    assert stage.update(values[0], 0.0) == pytest.approx(
+        expected[-1] + alpha * (values[0] - expected[-1])
+    )
+
+
+def test_ema_process_short_and_empty():
+    stage = EmaFilter(0.5)
+    assert stage.process([], []).tolist() == []
+    assert stage.process([4.0], [0.0]).tolist() == [4.0]
+    assert stage.process([4.0, 8.0], [0.0, 1.0]).tolist() == [4.0, 6.0]
+
+
+@pytest.mark.parametrize(
+    "stage",
+    [
+        Deadband(10.0, 50.0),
+        MedianFilter(5),
+        OneEuroFilter(1.0, 0.1),
+        Hysteresis(3.0),
+        RateLimiter(100.0),
+    ],
+)
+def test_process_matches_update(stage):
+    values, timestamps = recording(500)
+    expected = updates(stage, values, timestamps)
+
+    assert np.allclose(stage.process(values, timestamps), expected)
+
+
+def test_pipeline_process_matches_update():
+    values, timestamps = recording(500)
+    pipeline = FilterPipeline(EmaFilter(0.3), RateLimiter(100.0), emit_threshold=1.0)
+    expected = [pipeline.update(v, t) for v, t in zip(values, timestamps)]
+
+    output, emit = pipeline.process(values, timestamps)
+
+    assert emit.tolist() == [value is not None for value in expected]
+    assert np.allclose(output[emit], [value for value in expected if value is not None])
@@ -0,0 +1,148 @@
+# =============================================================================
+#  test_frame_decoder.py
+#  Decoding the COBS framed samples of hardware-test/arduinoemitter.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+import pytest
+
+from muscle_sensor.frame_decoder import FrameDecoder, crc16, encode_frame
+
+# Frames of arduinoemitter.ino with NUM_CHANNELS 2 and TEST_PATTERN 1:
+# (sequence, micros(), samples, bytes on the wire)
+EMITTER_FRAMES = [
+    (5, 1000000, [5, 6], bytes.fromhex("02050440420f020502060376bb00")),
+    (0, 0, [0, 1], bytes.fromhex("010101010101010102010308d200")),
+]
+
+
+def test_crc16_check_value():
+    # check value of CRC-16/CCITT-FALSE
+    assert crc16(b"123456789") == 0x29B1
+
+
+@pytest.mark.parametrize("sequence, micros, samples, frame", EMITTER_FRAMES)
+def test_encode_frame_like_the_emitter(sequence, micros, samples, frame):
+    assert encode_frame(sequence, micros, samples) == frame
+
+
+@pytest.mark.parametrize("sequence, micros, samples, frame", EMITTER_FRAMES)
+def test_decode_emitter_frame(sequence, micros, samples, frame):
+    decoder = FrameDecoder(2)
+
+    frames = decoder.feed(b"\x00" + frame)
+
+    assert frames.sequence.tolist() == [sequence]
+    assert frames.timestamps.tolist() == [micros * 1e-6]
+    assert frames.samples.tolist() == [samples]
+    assert decoder.corrupt_frames == 0
+
+
+@pytest.mark.parametrize("size", [1, 5, 14, 1000])
+def test_round_trip(size):
+    rng = np.random.default_rng(1)
+    samples = rng.integers(0, 1024, (200, 3))
+    sequence = (np.arange(200) + 0xFFF0) & 0xFFFF  # wraps to 0
+    micros = (np.arange(200) * 1000 + 0xFFFF0000) & 0xFFFFFFFF  # wraps to 0
+    data = b"\x00" + b"".join(
+        encode_frame(int(s), int(t), row.tolist())
+        for s, t, row in zip(sequence, micros, samples)
+    )
+
+    decoder = FrameDecoder(3)
+    decoded = [
+        decoder.feed(data[index : index + size]) for index in range(0, len(data), size)
+    ]
+
+    assert np.concatenate([f.sequence for f in decoded]).tolist() == sequence.tolist()
+    assert np.concatenate([f.samples for f in decoded]).tolist() == samples.tolist()
+    timestamps = np.concatenate([f.timestamps for f in decoded])
+    assert np.allclose(np.diff(timestamps), 0.001)
+    assert decoder.frames == 200
+    assert decoder.corrupt_frames == 0
+    assert decoder.lost_frames == 0
+
+
+def frames(count, channels=2):
+    return [
+        encode_frame(sequence, sequence * 1000, [sequence + 1] * channels)
+        for sequence in range(count)
+    ]
+
+
+def test_partial_frame_before_sync_is_dropped():
+    decoder = FrameDecoder(2)
+    stream = frames(3)
+
+    decoded = decoder.feed(stream[0][5:] + stream[1] + stream[2])
+
+    assert decoded.sequence.tolist() == [1, 2]
+    assert decoder.corrupt_frames == 0
+
+
+def test_corrupt_crc():
+    decoder = FrameDecoder(2)
+    stream = frames(4)
+    corrupt = bytearray(stream[1])
+    corrupt[3] ^= 0x01  # a data byte, not a COBS code
+    stream[1] = bytes(corrupt)
+
+    decoded = decoder.feed(b"\x00" + b"".join(stream))
+
+    assert decoded.sequence.tolist() == [0, 2, 3]
+    assert decoder.corrupt_frames == 1
+    assert decoder.lost_frames == 1
+
+
+def test_missing_delimiter():
+    decoder = FrameDecoder(2)
+    stream = frames(4)
+    stream[1] = stream[1][:-1]  # runs into the next frame
+
+    decoded = decoder.feed(b"\x00" + b"".join(stream))
+
+    assert decoded.sequence.tolist() == [0, 3]
+    assert decoder.corrupt_frames == 1
+    assert decoder.lost_frames == 2
+
+
+def test_oversize_and_short_frames():
+    decoder = FrameDecoder(2)
+    stream = frames(3)
+    garbage = [bytes(range(1, 40)) + b"\x00", b"\x03\x01\x02\x00"]
+
+    decoded = decoder.feed(
+        b"\x00" + stream[0] + garbage[0] + stream[1] + garbage[1] + stream[2]
+    )
+
+    assert decoded.sequence.tolist() == [0, 1, 2]
+    assert decoder.corrupt_frames == 2
+    assert decoder.lost_frames == 0
+
+
+def test_lost_frames_across_reads():
+    decoder = FrameDecoder(2)
+    stream = frames(6)
+
+    decoder.feed(b"\x00" + stream[0] + stream[1])
+    decoded = decoder.feed(stream[4] + stream[5])
+
+    assert decoded.sequence.tolist() == [4, 5]
+    assert decoder.lost_frames == 2
+
+
+def test_bytes_without_delimiter_are_dropped():
+    decoder = FrameDecoder(2)
+    stream = frames(3)
+    noise = bytes(range(1, 256)) * 40
+
+    decoder.feed(b"\x00" + stream[0])
+    for index in range(0, len(noise), 64):
+        decoder.feed(noise[index : index + 64])
+        assert len(decoder.buffer) <= decoder.max_pending
+    decoded = decoder.feed(b"\x00" + stream[1] + stream[2])
+
+    assert decoded.sequence.tolist() == [1, 2]
+    assert decoder.corrupt_frames == 1
+    assert decoder.lost_frames == 0
@@ -0,0 +1,43 @@
+# =============================================================================
+#  test_gesture_library.py
+#  Gesture playback against emulated servos.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+from SCServo import *
+from ServoController.GestureLibrary import GestureLibrary
+from ServoController.Scs0009Controller import Scs0009Controller
+
+
+def goal_position(controller, id):
+    return controller.portHandler.servos[id].getWord(SCSCL_GOAL_POSITION_L)
+
+
+def test_play_clears_shadow_of_gesture_servos():
+    controller = Scs0009Controller("emulator://8")
+    library = GestureLibrary(controller, {id: 545 for id in range(1, 9)})
+    library.add("bend", {"keyframes": [{"time": 0.0, "targets": {1: 40}}]})
+
+    controller.move_angle(1, 0, 545)
+    home = goal_position(controller, 1)
+
+    library.play("bend")
+    assert goal_position(controller, 1) != home
+
+    # the shadow must not suppress moving back to where it was before the gesture
+    controller.move_angle(1, 0, 545)
+    assert goal_position(controller, 1) == home
+
+
+def test_play_leaves_shadow_of_other_servos():
+    controller = Scs0009Controller("emulator://8")
+    library = GestureLibrary(controller, {id: 545 for id in range(1, 9)})
+    library.add("bend", {"keyframes": [{"time": 0.0, "targets": {1: 40}}]})
+
+    controller.move_angle(1, 0, 545)
+    controller.move_angle(2, 10, 545)
+    library.play("bend")
+
+    shadow = controller.packetHandler.shadow
+    assert not shadow.isKnown(1, SCSCL_GOAL_POSITION_L)
+    assert shadow.isKnown(2, SCSCL_GOAL_POSITION_L)
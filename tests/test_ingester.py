@@ -0,0 +1,68 @@
+# =============================================================================
+#  test_ingester.py
+#  Reading sensor frames from a port into the sample ring.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import time
+
+import serial
+
+from muscle_sensor.frame_decoder import FrameDecoder, encode_frame
+from muscle_sensor.ingester import SensorIngester, read_into_ring
+from signal_processing.sample_ring import SampleRing
+
+
+class FakePort:
+    """Port returning prepared reads, then timing out or raising."""
+
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    @property
+    def in_waiting(self):
+        if not self.reads or isinstance(self.reads[0], Exception):
+            return 0
+        return len(self.reads[0])
+
+    def read(self, size=1):
+        if not self.reads:
+            time.sleep(0.001)
+            return b""
+        data = self.reads.pop(0)
+        if isinstance(data, Exception):
+            raise data
+        return data
+
+
+def stream(count):
+    return b"\x00" + b"".join(
+        encode_frame(sequence, sequence * 1000, [sequence, 2 * sequence])
+        for sequence in range(count)
+    )
+
+
+def test_read_into_ring():
+    error = serial.SerialException("unplugged")
+    port = FakePort([stream(3), error])
+    ring = SampleRing(8, 2)
+
+    assert read_into_ring(port, FrameDecoder(2), ring) == (len(stream(3)), None)
+    assert read_into_ring(port, FrameDecoder(2), ring) == (0, error)
+    assert read_into_ring(port, FrameDecoder(2), ring) == (0, None)
+
+    assert ring.window(3)[1].tolist() == [[0, 0], [1, 2], [2, 4]]
+
+
+def test_sensor_ingester_counts_reads_and_errors():
+    data = stream(4)
+    port = FakePort([data[:20], serial.SerialException("glitch"), data[20:]])
+
+    with SensorIngester(port, channels=2, capacity=16) as ingester:
+        deadline = time.monotonic() + 2.0
+        while ingester.count < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    stats = ingester.get_stats()
+    assert (stats["samples"], stats["reads"], stats["read_errors"]) == (4, 2, 1)
+    assert ingester.window(4)[1][:, 1].tolist() == [0, 2, 4, 6]
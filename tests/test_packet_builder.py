@@ -0,0 +1,80 @@
+# =============================================================================
+#  test_packet_builder.py
+#  Instruction packets built in place into preallocated templates.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import asyncio
+
+from SCServo import *
+from ServoController.Scs0009Controller import Scs0009Controller
+
+
+def checksum_ok(packet):
+    packet = bytes(packet)
+    return packet[-1] == (~sum(packet[2:-1]) & 0xFF)
+
+
+def test_write_packet():
+    builder = PacketBuilder(TXPACKET_MAX_LEN)
+
+    packet = builder.buildWrite(INST_WRITE, 1, 42, [1, 2, 3, 4], 4)
+
+    assert bytes(packet) == bytes.fromhex("ffff0107032a01020304c0")
+
+
+def test_short_data_sizes_the_packet():
+    builder = PacketBuilder(TXPACKET_MAX_LEN)
+    builder.buildWrite(INST_WRITE, 1, 42, [1, 2, 3, 4, 5, 6], 6)
+
+    packet = builder.buildWrite(INST_WRITE, 2, 46, [7], 2)
+
+    assert bytes(packet) == bytes([0xFF, 0xFF, 2, 4, INST_WRITE, 46, 7, packet[-1]])
+    assert checksum_ok(packet)
+
+
+def test_short_param_sizes_the_sync_packet():
+    builder = PacketBuilder(TXPACKET_MAX_LEN)
+    builder.buildSync(INST_SYNC_WRITE, 46, 2, [1, 0, 9, 2, 0, 9], 6)
+
+    packet = builder.buildSync(INST_SYNC_WRITE, 46, 2, [3, 0, 8], 9)
+
+    assert len(packet) == 3 + 8
+    assert bytes(packet[PKT_PARAMETER0 + 2 : -1]) == bytes([3, 0, 8])
+    assert checksum_ok(packet)
+
+
+def test_too_long_packet():
+    builder = PacketBuilder(TXPACKET_MAX_LEN)
+    data = [0] * (TXPACKET_MAX_LEN - 6)
+
+    assert builder.buildWrite(INST_WRITE, 1, 0, data, len(data)) is None
+    assert builder.buildSync(INST_SYNC_WRITE, 0, 1, data, len(data)) is None
+
+
+def test_packets_of_one_kind_share_the_template():
+    builder = PacketBuilder(TXPACKET_MAX_LEN)
+
+    first = builder.buildWrite(INST_WRITE, 1, 42, [1, 2], 2)
+    copy = bytes(first)
+    builder.buildWrite(INST_WRITE, 2, 42, [3, 4], 2)
+
+    assert bytes(first) != copy
+
+
+def test_concurrent_async_writes_send_their_own_packets():
+    controller = Scs0009Controller("emulator://8")
+    bus = controller.async_bus()
+
+    async def write_all():
+        return await asyncio.gather(
+            *(bus.write(id, SCSCL_GOAL_SPEED_L, [0, id]) for id in range(1, 9))
+        )
+
+    results = asyncio.run(write_all())
+
+    assert results == [(COMM_SUCCESS, 0)] * 8
+    servos = controller.portHandler.servos
+    assert [servos[id].getWord(SCSCL_GOAL_SPEED_L) for id in range(1, 9)] == list(
+        range(1, 9)
+    )
@@ -0,0 +1,104 @@
+# =============================================================================
+#  test_packet_parser.py
+#  Status packet parsing from split, noisy and wrapping byte streams.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import pytest
+
+from SCServo import *
+
+
+def status(scs_id, error=0, data=b""):
+    packet = bytearray([0xFF, 0xFF, scs_id, len(data) + 2, error])
+    packet += data
+    packet.append(~sum(packet[2:]) & 0xFF)
+    return bytes(packet)
+
+
+def frames(parser):
+    result = []
+    frame = parser.getFrame()
+    while frame is not None:
+        result.append(frame)
+        frame = parser.getFrame()
+    return result
+
+
+def feed_in_chunks(parser, data, size):
+    for index in range(0, len(data), size):
+        parser.feed(data[index : index + size])
+
+
+@pytest.mark.parametrize("split", range(1, 8))
+def test_header_split_across_reads(split):
+    parser = PacketParser(TXPACKET_MAX_LEN)
+    packet = status(3, 0, b"\x02\x00")
+
+    parser.feed(packet[0:split])
+    assert frames(parser) == []
+    parser.feed(packet[split:])
+
+    assert frames(parser) == [(packet, COMM_SUCCESS)]
+    assert parser.dropped_bytes == 0
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 64])
+def test_false_header_inside_payload(size):
+    parser = PacketParser(TXPACKET_MAX_LEN)
+    packets = [status(1, 0, b"\xff\xff\x01\x02"), status(2, 0, b"\x00\xff\xff")]
+
+    feed_in_chunks(parser, b"".join(packets), size)
+
+    assert frames(parser) == [(packet, COMM_SUCCESS) for packet in packets]
+    assert parser.dropped_bytes == 0
+
+
+@pytest.mark.parametrize("size", [1, 64])
+def test_bad_checksum(size):
+    parser = PacketParser(TXPACKET_MAX_LEN)
+    good = status(1, 0, b"\x02\x00")
+    bad = bytearray(status(2, 0, b"\x02\x00"))
+    bad[-1] ^= 0x55
+
+    feed_in_chunks(parser, bytes(bad) + good, size)
+
+    assert frames(parser) == [(bytes(bad), COMM_RX_CORRUPT), (good, COMM_SUCCESS)]
+    assert parser.corrupt_frames == 1
+
+
+@pytest.mark.parametrize("size", [1, 5, 64])
+def test_garbage_between_packets(size):
+    parser = PacketParser(TXPACKET_MAX_LEN)
+    garbage = b"\x00\xff\x12\xff\xff\xff\xfe\x04\xff\xff\x03\xf0"
+    packets = [status(1, 0, b"\x01"), status(2, ERRBIT_ANGLE)]
+
+    feed_in_chunks(parser, garbage + packets[0] + garbage + packets[1], size)
+
+    assert frames(parser) == [(packet, COMM_SUCCESS) for packet in packets]
+    assert parser.dropped_bytes == 2 * len(garbage)
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 9])
+def test_packet_wrapping_the_ring(size):
+    parser = PacketParser(10, buffer_size=16)
+    assert len(parser.buffer) == 16
+    packets = [status(scs_id, 0, bytes([scs_id] * 3)) for scs_id in range(1, 8)]
+
+    # 9 byte packets start at every offset of the 16 byte ring
+    result = []
+    for packet in packets:
+        feed_in_chunks(parser, packet, size)
+        result += frames(parser)
+
+    assert result == [(packet, COMM_SUCCESS) for packet in packets]
+    assert parser.getPendingLength() == 0
+
+
+def test_packets_fed_in_one_call():
+    parser = PacketParser(TXPACKET_MAX_LEN)
+    packets = [status(scs_id, 0, b"\x02\x00") for scs_id in range(1, 9)]
+
+    parser.feed(b"".join(packets))
+
+    assert frames(parser) == [(packet, COMM_SUCCESS) for packet in packets]
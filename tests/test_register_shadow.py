@@ -0,0 +1,129 @@
+# =============================================================================
+#  test_register_shadow.py
+#  How FlushWrites coalesces staged writes into bus transactions.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import pytest
+
+from SCServo import *
+from ServoController.Scs0009Controller import Scs0009Controller
+from tests.test_emulator import sent_packets
+
+BUS_IDS = list(range(1, 9))
+
+
+@pytest.fixture
+def controller():
+    return Scs0009Controller("emulator://8", servo_ids=BUS_IDS)
+
+
+def transactions(packets):
+    """(instruction, ID, start address) of every packet."""
+    return [
+        (packet[PKT_INSTRUCTION], packet[PKT_ID], packet[PKT_PARAMETER0])
+        for packet in packets
+    ]
+
+
+def speed(controller, id):
+    return controller.portHandler.servos[id].getWord(SCSCL_GOAL_SPEED_L)
+
+
+def test_same_change_on_every_servo_is_broadcast(controller):
+    packets = sent_packets(controller)
+
+    with controller.batch():
+        for id in BUS_IDS:
+            controller.set_speed(id, 30)
+
+    assert transactions(packets) == [(INST_WRITE, BROADCAST_ID, SCSCL_GOAL_SPEED_L)]
+    assert [speed(controller, id) for id in BUS_IDS] == [
+        controller._to_servo_speed(30)
+    ] * len(BUS_IDS)
+
+
+def test_same_change_without_bus_ids_is_sync_write():
+    controller = Scs0009Controller("emulator://8")
+    packets = sent_packets(controller)
+
+    with controller.batch():
+        for id in BUS_IDS:
+            controller.set_speed(id, 30)
+
+    assert transactions(packets) == [
+        (INST_SYNC_WRITE, BROADCAST_ID, SCSCL_GOAL_SPEED_L)
+    ]
+
+
+def test_same_change_on_some_servos_is_sync_write(controller):
+    packets = sent_packets(controller)
+
+    with controller.batch():
+        controller.set_speed(2, 30)
+        controller.set_speed(5, 30)
+
+    assert transactions(packets) == [
+        (INST_SYNC_WRITE, BROADCAST_ID, SCSCL_GOAL_SPEED_L)
+    ]
+    assert speed(controller, 5) == controller._to_servo_speed(30)
+
+
+def test_different_changes_on_several_servos_are_one_sync_write(controller):
+    packets = sent_packets(controller)
+
+    with controller.batch():
+        controller.set_speed(1, 30)
+        controller.set_speed(2, 60)
+        controller.set_speed(3, 90)
+
+    assert transactions(packets) == [
+        (INST_SYNC_WRITE, BROADCAST_ID, SCSCL_GOAL_SPEED_L)
+    ]
+    assert [speed(controller, id) for id in (1, 2, 3)] == [
+        controller._to_servo_speed(value) for value in (30, 60, 90)
+    ]
+
+
+def test_overlapping_changes_are_widened_from_the_shadow(controller):
+    for id in (1, 2):
+        controller.packetHandler.ReadShadow(id)
+    packets = sent_packets(controller)
+
+    # the speed block of servo 2 is widened to the position block of servo 1
+    with controller.batch():
+        controller.move_angle(1, -60)
+        controller.set_speed(1, 30)
+        controller.set_speed(2, 30)
+
+    assert transactions(packets) == [
+        (INST_SYNC_WRITE, BROADCAST_ID, SCSCL_GOAL_POSITION_L)
+    ]
+    assert packets[0][PKT_PARAMETER0 + 1] == 6  # position, time and speed
+    assert speed(controller, 2) == controller._to_servo_speed(30)
+
+
+def test_separate_changes_are_written_per_servo(controller):
+    packets = sent_packets(controller)
+
+    # unknown bytes between the blocks keep them from being merged
+    with controller.batch():
+        controller.move_angle(1, 40)
+        controller.set_speed(2, 30)
+
+    assert transactions(packets) == [
+        (INST_WRITE, 1, SCSCL_GOAL_POSITION_L),
+        (INST_WRITE, 2, SCSCL_GOAL_SPEED_L),
+    ]
+
+
+def test_single_change_without_ack_is_sync_write(controller):
+    controller.set_fire_and_forget(True, verify_interval=0)
+    packets = sent_packets(controller)
+
+    controller.set_speed(4, 30)
+
+    assert transactions(packets) == [
+        (INST_SYNC_WRITE, BROADCAST_ID, SCSCL_GOAL_SPEED_L)
+    ]
+    assert speed(controller, 4) == controller._to_servo_speed(30)
@@ -0,0 +1,92 @@
+# =============================================================================
+#  test_sample_ring.py
+#  Ring buffer of timestamped samples, in local and in shared memory.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import numpy as np
+import pytest
+
+from signal_processing.sample_ring import SampleRing
+from signal_processing.shared_ring import SharedSampleRing
+
+
+def block(start, n, channels=2):
+    timestamps = np.arange(start, start + n, dtype=np.float64)
+    samples = np.stack([np.arange(start, start + n) + c for c in range(channels)], 1)
+    return timestamps, samples
+
+
+@pytest.fixture(params=["local", "shared"])
+def ring(request):
+    if request.param == "local":
+        yield SampleRing(8, 2, np.int32)
+        return
+    ring = SharedSampleRing(None, 8, 2, np.int32)
+    yield ring
+    ring.close()
+
+
+def test_empty(ring):
+    assert len(ring) == 0
+    assert ring.latest() is None
+    assert len(ring.window(4)[0]) == 0
+
+
+def test_window_across_the_wrap(ring):
+    for start in range(0, 30, 3):
+        ring.write(*block(start, 3))
+
+        timestamps, samples = ring.window(8)
+        end = start + 3
+        assert timestamps.tolist() == list(range(max(0, end - 8), end))
+        assert samples[:, 1].tolist() == [t + 1 for t in timestamps.tolist()]
+        assert ring.latest()[0] == end - 1
+
+
+def test_samples_since_counts_missed(ring):
+    count = 0
+    ring.write(*block(0, 5))
+    count, missed, timestamps, _ = ring.samples_since(count)
+    assert (count, missed, timestamps.tolist()) == (5, 0, [0, 1, 2, 3, 4])
+
+    ring.write(*block(5, 11))
+    count, missed, timestamps, _ = ring.samples_since(count)
+    assert (count, missed) == (16, 3)
+    assert timestamps.tolist() == list(range(8, 16))
+
+
+def test_block_larger_than_ring(ring):
+    ring.write(*block(0, 20))
+
+    assert ring.count == 20
+    assert ring.window(8)[0].tolist() == list(range(12, 20))
+
+
+def test_append(ring):
+    for t in range(11):
+        ring.append(float(t), t, -t)
+
+    timestamps, samples = ring.window(3)
+    assert timestamps.tolist() == [8, 9, 10]
+    assert samples.tolist() == [[8, -8], [9, -9], [10, -10]]
+
+
+def test_intact(ring):
+    ring.write(*block(0, 8))
+    start = ring.count - 4
+    assert ring.intact(start)
+
+    ring.write(*block(8, 4))
+    assert ring.intact(start)
+    ring.write(*block(12, 1))
+    assert not ring.intact(start)
+
+
+def test_read_since_copies(ring):
+    ring.write(*block(0, 4))
+    count, missed, timestamps, samples = ring.read_since(0)
+    ring.write(*block(4, 8))
+
+    assert (count, missed) == (4, 0)
+    assert timestamps.tolist() == [0, 1, 2, 3]
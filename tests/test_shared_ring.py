@@ -0,0 +1,89 @@
+# =============================================================================
+#  test_shared_ring.py
+#  A writer process and a reader sharing a ring across many wrap-arounds.
+#  Copyright (c) 2026 Jakob Leander
+#  Licensed under the MIT License.
+# =============================================================================
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from colmi_ring.ring_process import RingProcess
+from signal_processing.shared_ring import RingWriterProcess, SharedSampleRing
+from tests.ring_writer import pattern
+
+TEST_TIME = 1.0  # seconds the reader races the writer
+START_TIMEOUT = 10.0
+
+
+@pytest.fixture
+def writer():
+    ring = SharedSampleRing(None, 64, 3, np.int16)
+    process = RingWriterProcess("tests.ring_writer", ring, block_sizes=[1, 7, 13, 60])
+    process.start()
+    deadline = time.monotonic() + START_TIMEOUT
+    while ring.count < 10 * ring.capacity and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield ring, process
+    process.stop()
+    ring.close()
+
+
+def test_views_that_stay_intact_are_consistent(writer):
+    ring, process = writer
+    assert process.is_alive()
+
+    count = ring.count
+    reads = 0
+    end = time.monotonic() + TEST_TIME
+    while time.monotonic() < end:
+        count, missed, timestamps, samples = ring.samples_since(count)
+        expected = pattern(count - len(timestamps), len(timestamps), ring.channels)
+        consistent = np.array_equal(timestamps, expected[0]) and np.array_equal(
+            samples, expected[1]
+        )
+        if ring.intact(count - len(timestamps)):
+            assert consistent
+            reads += 1
+
+    assert reads > 100
+    assert ring.count > 100 * ring.capacity
+
+
+def test_read_since_copies_are_consistent(writer):
+    ring, process = writer
+
+    count = ring.count
+    end = time.monotonic() + TEST_TIME
+    while time.monotonic() < end:
+        count, missed, timestamps, samples = ring.read_since(count)
+        first = count - len(timestamps)
+        assert timestamps.tolist() == pattern(first, len(timestamps), 3)[0].tolist()
+        assert samples.tolist() == pattern(first, len(timestamps), 3)[1].tolist()
+
+
+def test_ring_process_gets_newest_sample():
+    client = RingProcess(capacity=64)
+    client.process = RingWriterProcess(
+        "tests.ring_writer", client.ring, block_sizes=[1, 7, 13, 60]
+    )
+
+    async def read():
+        samples = []
+        async with client:
+            end = time.monotonic() + TEST_TIME
+            while time.monotonic() < end:
+                samples.append(await client.get())
+        return samples
+
+    samples = asyncio.run(read())
+
+    assert len(samples) > 100
+    for sample in samples:
+        index = int(sample.timestamp)
+        assert [sample.x, sample.y, sample.z] == [
+            (index + channel) % 10000 for channel in range(3)
+        ]
+    assert client.dropped_samples > 0